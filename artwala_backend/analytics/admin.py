@@ -0,0 +1,11 @@
+from django.contrib import admin
+from .models import ArtistDailyStats
+
+@admin.register(ArtistDailyStats)
+class ArtistDailyStatsAdmin(admin.ModelAdmin):
+    list_display = ('artist', 'day', 'units_sold', 'sales_revenue', 'commission_revenue', 'commissions_won', 'views', 'likes')
+    list_filter = ('day',)
+    raw_id_fields = ('artist',)
+    date_hierarchy = 'day'
+    # Maintained by analytics.rollups; editing a row by hand would drift from the events
+    readonly_fields = ('artist', 'day', 'units_sold', 'sales_revenue', 'commission_revenue', 'commissions_won', 'views', 'likes')
@@ -0,0 +1,16 @@
+from django.apps import AppConfig
+
+
+class AnalyticsConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "analytics"
+
+    def ready(self):
+        from django.apps import apps
+        from django.db.models.signals import post_save
+
+        from .rollups import like_added
+
+        # Order, payment and commission figures arrive through the outbox (see OUTBOX_HANDLERS)
+        ProductLike = apps.get_model("products", "ProductLike")
+        post_save.connect(like_added, sender=ProductLike, dispatch_uid="analytics-like-added")
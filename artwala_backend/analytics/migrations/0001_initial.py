@@ -0,0 +1,81 @@
+# Generated by Django 5.2.4 on 2026-10-19 12:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("artists", "0004_commission_reliability"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArtistDailyStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "day",
+                    models.DateField(
+                        help_text="Local date (TIME_ZONE) the figures belong to"
+                    ),
+                ),
+                ("units_sold", models.IntegerField(default=0)),
+                (
+                    "sales_revenue",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                (
+                    "commission_revenue",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        help_text="Completed commission payments, less refunds",
+                        max_digits=12,
+                    ),
+                ),
+                (
+                    "commissions_won",
+                    models.IntegerField(
+                        default=0, help_text="Commission requests the artist accepted"
+                    ),
+                ),
+                (
+                    "views",
+                    models.PositiveIntegerField(
+                        default=0, help_text="Product page views"
+                    ),
+                ),
+                (
+                    "likes",
+                    models.PositiveIntegerField(
+                        default=0, help_text="New likes on the artist's products"
+                    ),
+                ),
+                (
+                    "artist",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_stats",
+                        to="artists.artistprofile",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "artist_daily_stats",
+                "ordering": ["day"],
+                "unique_together": {("artist", "day")},
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+from django.db import models
+
+from artists.models import ArtistProfile
+
+
+class ArtistDailyStats(models.Model):
+    """
+    One artist's sales, commission and engagement figures for one day
+    Maintained incrementally (see analytics.rollups) so dashboards never aggregate orders on read
+    """
+    artist = models.ForeignKey(
+        ArtistProfile,
+        on_delete=models.CASCADE,
+        related_name='daily_stats',
+    )
+    day = models.DateField(help_text="Local date (TIME_ZONE) the figures belong to")
+
+    # Shop sales, booked when an order is confirmed and reversed if it is cancelled
+    # (a day can go negative when cancellations outweigh sales)
+    units_sold = models.IntegerField(default=0)
+    sales_revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    # Commissions
+    commission_revenue = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        help_text="Completed commission payments, less refunds"
+    )
+    commissions_won = models.IntegerField(
+        default=0,
+        help_text="Commission requests the artist accepted"
+    )
+
+    # Engagement
+    views = models.PositiveIntegerField(default=0, help_text="Product page views")
+    likes = models.PositiveIntegerField(default=0, help_text="New likes on the artist's products")
+
+    def __str__(self):
+        return f"{self.artist_id} on {self.day}"
+
+    class Meta:
+        db_table = 'artist_daily_stats'
+        # Also the index behind every time-series read: one artist, a range of days
+        unique_together = ['artist', 'day']
+        ordering = ['day']
@@ -0,0 +1,42 @@
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.utils import timezone
+
+from .tasks import flush_product_views
+
+
+class ViewBuffer:
+    """
+    Product page views counted in process memory and written in batches
+    A view only updates a dict; at most every ANALYTICS_VIEW_FLUSH_INTERVAL seconds the process hands
+    its counts to one background task, so product reads never write to the products or stats tables.
+    Views still buffered when a process exits are lost, which a view count can afford.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = Counter()
+        self.flushed_at = time.monotonic()
+
+    def add(self, product):
+        with self.lock:
+            self.counts[product.pk, product.artist_id, timezone.localdate().isoformat()] += 1
+            due = time.monotonic() - self.flushed_at >= settings.ANALYTICS_VIEW_FLUSH_INTERVAL
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            counts, self.counts = self.counts, Counter()
+            self.flushed_at = time.monotonic()
+        if counts:
+            flush_product_views.enqueue([[*key, views] for key, views in counts.items()])
+
+
+view_buffer = ViewBuffer()
+
+
+def record_product_view(product):
+    view_buffer.add(product)
@@ -0,0 +1,158 @@
+import datetime
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import DecimalField, F, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.utils import timezone
+
+from commissions.models import CommissionRequest
+from products.models import OrderItem, Product
+
+from .models import ArtistDailyStats
+
+# Orders whose sale counts: anything the customer paid for and we haven't cancelled
+BOOKED_ORDER_STATUSES = ('confirmed', 'shipped', 'delivered')
+
+MONEY = DecimalField(max_digits=12, decimal_places=2)
+
+FIGURES = ('units_sold', 'sales_revenue', 'commission_revenue', 'commissions_won', 'views', 'likes')
+INTERVALS = {
+    'day': F('day'),
+    'week': TruncWeek('day'),
+    'month': TruncMonth('day'),
+}
+
+
+def add(artist_id, day, **increments):
+    """
+    Adds to an artist's figures for `day` with one UPDATE, creating the row on the day's first change
+    """
+    expressions = {field: F(field) + amount for field, amount in increments.items()}
+    if ArtistDailyStats.objects.filter(artist_id=artist_id, day=day).update(**expressions):
+        return
+    try:
+        with transaction.atomic():
+            ArtistDailyStats.objects.create(artist_id=artist_id, day=day, **increments)
+    except IntegrityError:
+        # Another writer created the row first; add to theirs
+        ArtistDailyStats.objects.filter(artist_id=artist_id, day=day).update(**expressions)
+
+
+def add_all(changes):
+    for (artist_id, day), increments in changes.items():
+        increments = {field: amount for field, amount in increments.items() if amount}
+        if increments:
+            add(artist_id, day, **increments)
+
+
+def direction(payload, statuses):
+    """
+    +1 when a status change enters `statuses`, -1 when it leaves them, 0 otherwise
+    """
+    return int(payload['to'] in statuses) - int(payload['from'] in statuses)
+
+
+def order_sales(order_ids):
+    """
+    Units and revenue per (order, artist) for the given orders, in one grouped query
+    """
+    rows = (
+        OrderItem.objects.filter(order_id__in=order_ids)
+        .values('order_id', 'product__artist_id')
+        .annotate(units=Sum('quantity'), revenue=Sum(F('price') * F('quantity'), output_field=MONEY))
+        .order_by()
+    )
+    sales = defaultdict(list)
+    for row in rows:
+        sales[str(row['order_id'])].append((row['product__artist_id'], row['units'], row['revenue']))
+    return sales
+
+
+def apply_events(events):
+    """
+    Outbox handler folding a relayed batch into the artists' daily figures
+    Confirmed orders book sales and cancelling them takes the sales back, completed commission payments
+    (less refunds) count as commission revenue and accepted requests as commissions won, each on the
+    day the change happened. Runs in the relay's transaction, so a failed batch adds nothing.
+    """
+    changes = defaultdict(lambda: defaultdict(int))
+    orders, payments = [], []
+    for event in events:
+        if event.event_type == 'order.status_changed':
+            sign = direction(event.payload, BOOKED_ORDER_STATUSES)
+            if sign:
+                orders.append((event, sign))
+        elif event.event_type == 'commission_payment.status_changed':
+            sign = direction(event.payload, ('completed',))
+            if sign:
+                payments.append((event, sign))
+        elif event.event_type == 'commission_request.status_changed':
+            if event.payload['to'] == 'accepted':
+                changes[event.payload['artist_id'], timezone.localdate(event.created_at)]['commissions_won'] += 1
+
+    if orders:
+        sales = order_sales({event.aggregate_id for event, _ in orders})
+        for event, sign in orders:
+            day = timezone.localdate(event.created_at)
+            for artist_id, units, revenue in sales[event.aggregate_id]:
+                changes[artist_id, day]['units_sold'] += sign * units
+                changes[artist_id, day]['sales_revenue'] += sign * revenue
+
+    if payments:
+        artists = dict(
+            CommissionRequest.objects.filter(
+                pk__in={event.payload['commission_request_id'] for event, _ in payments},
+            ).values_list('pk', 'artist_id')
+        )
+        for event, sign in payments:
+            artist_id = artists.get(event.payload['commission_request_id'])
+            if artist_id is not None:
+                day = timezone.localdate(event.created_at)
+                changes[artist_id, day]['commission_revenue'] += sign * Decimal(event.payload['amount'])
+
+    add_all(changes)
+
+
+def like_added(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        artist_id = Product.objects.filter(pk=instance.product_id).values_list('artist_id', flat=True).first()
+        add(artist_id, timezone.localdate(instance.created_at), likes=1)
+
+
+def period_start(day, interval):
+    if interval == 'week':
+        return day - datetime.timedelta(days=day.weekday())
+    if interval == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def next_period(period, interval):
+    if interval == 'week':
+        return period + datetime.timedelta(days=7)
+    if interval == 'month':
+        return (period + datetime.timedelta(days=32)).replace(day=1)
+    return period + datetime.timedelta(days=1)
+
+
+def get_series(artist_id, start, end, interval='day'):
+    """
+    The artist's figures between `start` and `end` (inclusive) summed per day, week or month
+    One query over the (artist, day) index whatever the range; periods without activity come back as zeros
+    """
+    rows = (
+        ArtistDailyStats.objects.filter(artist_id=artist_id, day__range=(start, end))
+        .annotate(period=INTERVALS[interval])
+        .values('period')
+        .annotate(**{field: Sum(field) for field in FIGURES})
+        .order_by('period')
+    )
+    found = {row['period']: row for row in rows}
+    series, period = [], period_start(start, interval)
+    while period <= end:
+        series.append(found.get(period) or {'period': period, **dict.fromkeys(FIGURES, 0)})
+        period = next_period(period, interval)
+    totals = {field: sum(point[field] for point in series) for field in FIGURES}
+    return {'totals': totals, 'series': series}
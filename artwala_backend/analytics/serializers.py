@@ -0,0 +1,20 @@
+from rest_framework import serializers
+
+class ArtistFiguresSerializer(serializers.Serializer):
+    units_sold = serializers.IntegerField()
+    sales_revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+    commission_revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+    commissions_won = serializers.IntegerField()
+    views = serializers.IntegerField()
+    likes = serializers.IntegerField()
+
+class ArtistStatsPointSerializer(ArtistFiguresSerializer):
+    period = serializers.DateField()
+
+class ArtistStatsSerializer(serializers.Serializer):
+    artist = serializers.IntegerField()
+    start = serializers.DateField()
+    end = serializers.DateField()
+    interval = serializers.CharField()
+    totals = ArtistFiguresSerializer()
+    series = ArtistStatsPointSerializer(many=True)
@@ -0,0 +1,25 @@
+from collections import Counter
+
+from django.db.models import F
+from django.utils import timezone
+
+from products.models import Product
+from taskqueue.queue import task
+
+from .rollups import add
+
+
+@task
+def flush_product_views(counts):
+    """
+    Writes buffered page views, given as [product_id, artist_id, day, views] rows, to the products'
+    view counts and the artists' daily figures
+    """
+    now = timezone.now()
+    by_artist_day = Counter()
+    for product_id, artist_id, day, views in counts:
+        # Bumping updated_at changes the product's ETag, so cached copies pick up the new count
+        Product.objects.filter(pk=product_id).update(views_count=F('views_count') + views, updated_at=now)
+        by_artist_day[artist_id, day] += views
+    for (artist_id, day), views in by_artist_day.items():
+        add(artist_id, day, views=views)
@@ -0,0 +1,178 @@
+import datetime
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from artists.models import ArtistProfile
+from commissions.models import CommissionPayment, CommissionRequest
+from outbox.relay import relay_pending
+from products.models import Category, Order, OrderItem, Product, ProductLike
+from .models import ArtistDailyStats
+from .pageviews import view_buffer
+from .rollups import get_series
+
+User = get_user_model()
+
+
+class ArtistRollupTests(TestCase):
+    def setUp(self):
+        self.customer = User.objects.create_user(email='customer@example.com', username='customer', password='pw12345678')
+        self.artists = []
+        for name in ('ana', 'ben'):
+            user = User.objects.create_user(email=f'{name}@example.com', username=name, password='pw12345678')
+            self.artists.append(ArtistProfile.objects.create(user=user, display_name=name.title()))
+        category = Category.objects.create(name='Paintings', slug='paintings')
+        self.products = [
+            Product.objects.create(
+                artist=artist, category=category, title=f'Work {number}', slug=f'work-{number}',
+                description='Oil on canvas', price=Decimal('40.00'), status='active',
+            )
+            for number, artist in enumerate(self.artists)
+        ]
+        self.today = timezone.localdate()
+        view_buffer.counts.clear()
+    
+    def stats(self, artist):
+        return ArtistDailyStats.objects.get(artist=artist, day=self.today)
+    
+    def create_order(self, **items):
+        order = Order.objects.create(
+            user=self.customer, order_number=f'A-{Order.objects.count() + 1}', total_amount=Decimal('0.00'),
+            shipping_address={'city': 'Pune'}, payment_method='upi',
+        )
+        for index, (quantity, price) in items.items():
+            OrderItem.objects.create(order=order, product=self.products[int(index[-1])], quantity=quantity, price=Decimal(price))
+        return order
+    
+    def set_status(self, instance, status):
+        instance.status = status
+        instance.save()
+    
+    def test_confirmed_orders_book_sales_and_cancelling_takes_them_back(self):
+        first = self.create_order(p0=(2, '40.00'), p1=(1, '15.50'))
+        second = self.create_order(p0=(1, '40.00'))
+        relay_pending(batch_size=100)
+        self.assertFalse(ArtistDailyStats.objects.exists())
+    
+        self.set_status(first, 'confirmed')
+        self.set_status(second, 'confirmed')
+        # Moving along the fulfilment path doesn't book the sale twice
+        self.set_status(first, 'shipped')
+        relay_pending(batch_size=100)
+        self.assertEqual((self.stats(self.artists[0]).units_sold, self.stats(self.artists[0]).sales_revenue), (3, Decimal('120.00')))
+        self.assertEqual((self.stats(self.artists[1]).units_sold, self.stats(self.artists[1]).sales_revenue), (1, Decimal('15.50')))
+    
+        self.set_status(second, 'cancelled')
+        relay_pending(batch_size=100)
+        self.assertEqual((self.stats(self.artists[0]).units_sold, self.stats(self.artists[0]).sales_revenue), (2, Decimal('80.00')))
+    
+    def test_commission_payments_and_acceptances(self):
+        commission = CommissionRequest.objects.create(
+            client=self.customer, artist=self.artists[0], title='Portrait', description='Oil portrait',
+            commission_type='portrait', budget_min=Decimal('100.00'), budget_max=Decimal('200.00'),
+            deadline=datetime.date(2030, 1, 1),
+        )
+        self.set_status(commission, 'accepted')
+        payments = [
+            CommissionPayment.objects.create(
+                commission_request=commission, amount=Decimal(amount), payment_method='upi', status=status,
+            )
+            for amount, status in (('60.00', 'completed'), ('40.00', 'pending'))
+        ]
+        self.set_status(payments[1], 'completed')
+        self.set_status(payments[0], 'refunded')
+        relay_pending(batch_size=100)
+    
+        stats = self.stats(self.artists[0])
+        self.assertEqual((stats.commissions_won, stats.commission_revenue), (1, Decimal('40.00')))
+    
+    @override_settings(ANALYTICS_VIEW_FLUSH_INTERVAL=3600, TASKS_EAGER=True)
+    def test_product_views_are_buffered(self):
+        product = self.products[1]
+        url = f'/api/products/products/{product.slug}/'
+        api = APIClient()
+        response = api.get(url)
+        self.assertEqual(response.status_code, 200)
+        # A revalidated copy is still a view, and reading the page writes nothing
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(api.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        self.assertFalse([query for query in queries if not query['sql'].startswith('SELECT')])
+        self.assertFalse(ArtistDailyStats.objects.exists())
+    
+        with self.captureOnCommitCallbacks(execute=True):
+            view_buffer.flush()
+        self.assertEqual(self.stats(self.artists[1]).views, 2)
+        product.refresh_from_db()
+        self.assertEqual(product.views_count, 2)
+        # The flushed count is visible to clients holding the old copy
+        self.assertEqual(api.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+    
+    @override_settings(ANALYTICS_VIEW_FLUSH_INTERVAL=0, TASKS_EAGER=True)
+    def test_due_buffer_flushes_on_the_next_view(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            APIClient().get(f'/api/products/products/{self.products[0].slug}/')
+        self.assertEqual(self.stats(self.artists[0]).views, 1)
+    
+    def test_likes(self):
+        ProductLike.objects.create(user=self.customer, product=self.products[1])
+        self.assertEqual(self.stats(self.artists[1]).likes, 1)
+
+
+class ArtistStatsEndpointTests(TestCase):
+    def setUp(self):
+        self.artist_user = User.objects.create_user(email='artist@example.com', username='artist', password='pw12345678')
+        self.artist = ArtistProfile.objects.create(user=self.artist_user, display_name='Artist')
+        start = datetime.date(2026, 3, 30)
+        for offset, units in ((0, 1), (1, 2), (3, 4), (9, 8)):
+            ArtistDailyStats.objects.create(
+                artist=self.artist, day=start + datetime.timedelta(days=offset), units_sold=units,
+                sales_revenue=Decimal('10.25') * units, views=10 * units,
+            )
+        self.api = APIClient()
+        self.api.force_authenticate(self.artist_user)
+    
+    def test_daily_series_fills_quiet_days(self):
+        with self.assertNumQueries(2):
+            response = self.api.get('/api/analytics/artist-stats/', {'start': '2026-03-31', 'end': '2026-04-03'})
+        data = response.json()
+        self.assertEqual(data['artist'], self.artist.pk)
+        self.assertEqual([point['period'] for point in data['series']], ['2026-03-31', '2026-04-01', '2026-04-02', '2026-04-03'])
+        self.assertEqual([point['units_sold'] for point in data['series']], [2, 0, 4, 0])
+        self.assertEqual(data['totals']['sales_revenue'], '61.50')
+        self.assertEqual(data['totals']['views'], 60)
+    
+    def test_weekly_and_monthly_series(self):
+        params = {'start': '2026-03-30', 'end': '2026-04-12'}
+        weeks = self.api.get('/api/analytics/artist-stats/', {**params, 'interval': 'week'}).json()['series']
+        self.assertEqual([(point['period'], point['units_sold']) for point in weeks], [('2026-03-30', 7), ('2026-04-06', 8)])
+        months = self.api.get('/api/analytics/artist-stats/', {**params, 'interval': 'month'}).json()['series']
+        self.assertEqual([(point['period'], point['units_sold']) for point in months], [('2026-03-01', 3), ('2026-04-01', 12)])
+    
+    def test_range_query_reads_the_artist_day_index(self):
+        rows = ArtistDailyStats.objects.filter(artist=self.artist, day__range=(datetime.date(2026, 4, 1), datetime.date(2026, 4, 30)))
+        plan = rows.explain()
+        self.assertIn('USING INDEX', plan)
+        self.assertNotIn('SCAN', plan)
+        self.assertEqual(get_series(self.artist.pk, datetime.date(2026, 4, 1), datetime.date(2026, 4, 30))['totals']['units_sold'], 12)
+    
+    def test_access(self):
+        customer = APIClient()
+        customer.force_authenticate(User.objects.create_user(email='c@example.com', username='c', password='pw12345678'))
+        self.assertEqual(customer.get('/api/analytics/artist-stats/', {'artist': self.artist.pk}).status_code, 404)
+        self.assertEqual(APIClient().get('/api/analytics/artist-stats/').status_code, 403)
+    
+        staff = APIClient()
+        staff.force_authenticate(User.objects.create_user(email='s@example.com', username='s', password='pw12345678', is_staff=True))
+        response = staff.get('/api/analytics/artist-stats/', {'artist': self.artist.pk, 'start': '2026-04-01', 'end': '2026-04-30'})
+        self.assertEqual(response.json()['totals']['units_sold'], 12)
+        self.assertEqual(staff.get('/api/analytics/artist-stats/', {'artist': 'abc'}).status_code, 400)
+        self.assertEqual(staff.get('/api/analytics/artist-stats/', {'artist': self.artist.pk + 1}).status_code, 404)
+    
+        self.assertEqual(self.api.get('/api/analytics/artist-stats/', {'interval': 'hour'}).status_code, 400)
+        self.assertEqual(self.api.get('/api/analytics/artist-stats/', {'start': '2020-01-01', 'end': '2026-01-01'}).status_code, 400)
+        self.assertEqual(self.api.get('/api/analytics/artist-stats/', {'start': '2026-05-01', 'end': '2026-04-01'}).status_code, 400)
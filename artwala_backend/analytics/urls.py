@@ -0,0 +1,6 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('artist-stats/', views.ArtistStatsView.as_view(), name='artist-stats'),
+]
@@ -0,0 +1,55 @@
+import datetime
+
+from django.conf import settings
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from artists.models import ArtistProfile
+from .rollups import INTERVALS, get_series
+from .serializers import ArtistStatsSerializer
+
+class ArtistStatsView(APIView):
+    """
+    An artist's sales, commission earnings and engagement as a time series:
+    ?start=&end= (ISO dates, default the last 30 days), ?interval=day|week|month
+    Artists see their own figures; staff pick an artist with ?artist=<id>
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def get_artist_id(self, request):
+        if request.user.is_staff and request.query_params.get('artist'):
+            try:
+                artist_id = int(request.query_params['artist'])
+            except ValueError:
+                raise ValidationError({'artist': ['A valid integer is required.']})
+            return get_object_or_404(ArtistProfile, pk=artist_id).pk
+        artist_id = ArtistProfile.objects.filter(user=request.user).values_list('pk', flat=True).first()
+        if artist_id is None:
+            raise NotFound('You do not have an artist profile.')
+        return artist_id
+    
+    def get_range(self, request):
+        try:
+            end = datetime.date.fromisoformat(request.query_params['end']) if request.query_params.get('end') else timezone.localdate()
+            start = datetime.date.fromisoformat(request.query_params['start']) if request.query_params.get('start') else end - datetime.timedelta(days=29)
+        except ValueError:
+            raise ValidationError({'detail': 'start and end must be dates (YYYY-MM-DD).'})
+        if start > end:
+            raise ValidationError({'detail': 'start must not be after end.'})
+        if (end - start).days >= settings.ANALYTICS_MAX_DAYS:
+            raise ValidationError({'detail': f'Ranges are limited to {settings.ANALYTICS_MAX_DAYS} days.'})
+        return start, end
+    
+    def get(self, request):
+        interval = request.query_params.get('interval', 'day')
+        if interval not in INTERVALS:
+            raise ValidationError({'interval': f'Choose one of: {", ".join(INTERVALS)}.'})
+        start, end = self.get_range(request)
+        artist_id = self.get_artist_id(request)
+        stats = get_series(artist_id, start, end, interval)
+        return Response(ArtistStatsSerializer({
+            'artist': artist_id, 'start': start, 'end': end, 'interval': interval, **stats,
+        }).data)
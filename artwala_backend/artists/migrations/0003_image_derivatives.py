@@ -0,0 +1,25 @@
+# Generated by Django 5.2.4 on 2026-10-19 12:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("artists", "0002_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="artistprofile",
+            name="logo_derivatives",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                editable=False,
+                help_text="Resized WebP/AVIF copies of the logo keyed by size and format (generated in the background)",
+            ),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.4 on 2026-10-19 12:50
+
+import datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("artists", "0003_image_derivatives"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="artistprofile",
+            name="approval_time_total",
+            field=models.DurationField(
+                default=datetime.timedelta(0),
+                help_text="Time from submission to client approval, summed over approved milestones",
+            ),
+        ),
+        migrations.AddField(
+            model_name="artistprofile",
+            name="milestones_approved",
+            field=models.PositiveIntegerField(
+                default=0, help_text="Submitted milestones approved by the client"
+            ),
+        ),
+        migrations.AddField(
+            model_name="artistprofile",
+            name="milestones_delivered",
+            field=models.PositiveIntegerField(
+                default=0,
+                help_text="Milestones with a due date the artist has submitted",
+            ),
+        ),
+        migrations.AddField(
+            model_name="artistprofile",
+            name="milestones_on_time",
+            field=models.PositiveIntegerField(
+                default=0,
+                help_text="Delivered milestones submitted on or before their due date",
+            ),
+        ),
+        migrations.AddField(
+            model_name="artistprofile",
+            name="milestones_overdue",
+            field=models.PositiveIntegerField(
+                default=0,
+                help_text="Milestones that passed their due date before being submitted",
+            ),
+        ),
+    ]
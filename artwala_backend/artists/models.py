@@ -1,3 +1,5 @@
+import datetime
+
 from django.db import models
 from django.conf import settings
 from django.utils.text import slugify
@@ -7,6 +9,12 @@ class ArtistProfile(models.Model):
     Artist profile extending the User model
     Contains professional information, portfolio data, and business settings for artists
     """
+    # Counters only ever changed by atomic increments; never written back by a full save()
+    RELIABILITY_FIELDS = (
+        'milestones_delivered', 'milestones_on_time', 'milestones_overdue', 'milestones_approved',
+        'approval_time_total',
+    )
+    
     # Core relationship and identification
     user = models.OneToOneField(
         settings.AUTH_USER_MODEL, 
@@ -36,6 +44,12 @@ class ArtistProfile(models.Model):
         null=True,
         help_text="Artist's brand logo or signature artwork"
     )
+    logo_derivatives = models.JSONField(
+        default=dict, 
+        blank=True,
+        editable=False,
+        help_text="Resized WebP/AVIF copies of the logo keyed by size and format (generated in the background)"
+    )
     
     # Portfolio and work showcase
     portfolio_images = models.JSONField(
@@ -99,6 +113,28 @@ class ArtistProfile(models.Model):
         help_text="Total number of reviews received from customers"
     )
     
+    # Commission reliability, kept up to date incrementally (see commissions.sla)
+    milestones_delivered = models.PositiveIntegerField(
+        default=0,
+        help_text="Milestones with a due date the artist has submitted"
+    )
+    milestones_on_time = models.PositiveIntegerField(
+        default=0,
+        help_text="Delivered milestones submitted on or before their due date"
+    )
+    milestones_overdue = models.PositiveIntegerField(
+        default=0,
+        help_text="Milestones that passed their due date before being submitted"
+    )
+    milestones_approved = models.PositiveIntegerField(
+        default=0,
+        help_text="Submitted milestones approved by the client"
+    )
+    approval_time_total = models.DurationField(
+        default=datetime.timedelta(0),
+        help_text="Time from submission to client approval, summed over approved milestones"
+    )
+    
     # Timestamp tracking
     created_at = models.DateTimeField(
         auto_now_add=True,
@@ -112,8 +148,29 @@ class ArtistProfile(models.Model):
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.display_name)
+        # A full save would write back counters read before concurrent milestone updates
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.RELIABILITY_FIELDS
+            ]
         super().save(*args, **kwargs)
     
+    @property
+    def on_time_rate(self):
+        """
+        Percentage of delivered milestones submitted by their due date (None before the first)
+        """
+        if not self.milestones_delivered:
+            return None
+        return round(100 * self.milestones_on_time / self.milestones_delivered, 1)
+    
+    @property
+    def average_approval_hours(self):
+        if not self.milestones_approved:
+            return None
+        return round(self.approval_time_total.total_seconds() / 3600 / self.milestones_approved, 1)
+    
     def __str__(self):
         return f"{self.display_name} - {self.user.email}"
     
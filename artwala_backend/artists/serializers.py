@@ -1,14 +1,32 @@
 from rest_framework import serializers
+from artwala_backend.fieldsets import SparseFieldsetSerializerMixin
+from assets.serializers import ImageDerivativesField
 from .models import ArtistProfile, ArtistReview
 from users.serializers import UserSerializer
 
-class ArtistProfileSerializer(serializers.ModelSerializer):
+class ArtistProfileSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
+    logo_derivatives = ImageDerivativesField()
+    on_time_rate = serializers.FloatField(read_only=True)
+    average_approval_hours = serializers.FloatField(read_only=True)
     
     class Meta:
         model = ArtistProfile
         fields = '__all__'
-        read_only_fields = ['slug', 'rating', 'total_reviews', 'created_at', 'updated_at']
+        read_only_fields = ['slug', 'rating', 'total_reviews', *ArtistProfile.RELIABILITY_FIELDS, 'created_at', 'updated_at']
+
+class ArtistProfileListSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    """
+    Compact artist card for listing pages
+    Leaves out the statement, education, awards and portfolio shown on the profile page
+    """
+    logo_derivatives = ImageDerivativesField()
+    
+    class Meta:
+        model = ArtistProfile
+        fields = ['id', 'user', 'slug', 'display_name', 'tagline', 'logo', 'logo_derivatives', 'specializations', 
+                 'experience_years', 'commission_available', 'commission_price_range', 
+                 'response_time', 'featured', 'rating', 'total_reviews', 'created_at', 'updated_at']
 
 class ArtistReviewSerializer(serializers.ModelSerializer):
     reviewer = UserSerializer(read_only=True)
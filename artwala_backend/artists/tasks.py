@@ -0,0 +1,23 @@
+from decimal import Decimal
+
+from django.db.models import Avg, Count
+from django.utils import timezone
+
+from taskqueue.queue import task
+
+from .models import ArtistProfile, ArtistReview
+
+
+@task
+def update_review_stats(artist_id):
+    """
+    Recomputes an artist's average rating and review count from their reviews
+    Recomputing (rather than adjusting) makes the task safe to run twice or out of order
+    """
+    stats = ArtistReview.objects.filter(artist_id=artist_id).aggregate(average=Avg('rating'), total=Count('pk'))
+    ArtistProfile.objects.filter(pk=artist_id).update(
+        rating=Decimal(stats['average'] or 0).quantize(Decimal('0.01')),
+        total_reviews=stats['total'],
+        # Bump updated_at so ETags on the profile change
+        updated_at=timezone.now(),
+    )
@@ -1,13 +1,18 @@
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
+from artwala_backend.conditional import ConditionalGetMixin
+from artwala_backend.fieldsets import SparseFieldsetMixin
 from .models import ArtistProfile, ArtistReview
-from .serializers import ArtistProfileSerializer, ArtistReviewSerializer
+from .serializers import ArtistProfileSerializer, ArtistProfileListSerializer, ArtistReviewSerializer
+from .tasks import update_review_stats
 
-class ArtistProfileViewSet(viewsets.ModelViewSet):
+class ArtistProfileViewSet(ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = ArtistProfile.objects.all()
     serializer_class = ArtistProfileSerializer
+    list_serializer_class = ArtistProfileListSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     lookup_field = 'slug'
+    etag_dependencies = ('user',)
 
 class ArtistReviewViewSet(viewsets.ModelViewSet):
     queryset = ArtistReview.objects.all()
@@ -15,4 +20,16 @@ class ArtistReviewViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     
     def perform_create(self, serializer):
-        serializer.save(reviewer=self.request.user)
+        review = serializer.save(reviewer=self.request.user)
+        update_review_stats.enqueue(review.artist_id)
+    
+    def perform_update(self, serializer):
+        previous_artist_id = serializer.instance.artist_id
+        review = serializer.save()
+        update_review_stats.enqueue(review.artist_id)
+        if previous_artist_id != review.artist_id:
+            update_review_stats.enqueue(previous_artist_id)
+    
+    def perform_destroy(self, instance):
+        instance.delete()
+        update_review_stats.enqueue(instance.artist_id)
@@ -0,0 +1,165 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+
+from users.models import TOKEN_CACHED_USER_FIELDS, TOKEN_EVICTING_USER_FIELDS, AuthToken, User
+
+
+class LRUCache:
+    """
+    Bounded, thread-safe least-recently-used map whose entries expire after `timeout` seconds
+    """
+    def __init__(self, size, timeout):
+        self.size = size
+        self.timeout = timeout
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.timeout, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+# Per-process layer; other workers only see an invalidation once their entry expires
+local_tokens = LRUCache(settings.TOKEN_CACHE_SIZE, settings.TOKEN_CACHE_LOCAL_TIMEOUT)
+
+
+def get_token_cache_key(digest):
+    # Tokens are credentials, so only their hash is ever used as a cache key
+    return 'auth-token:' + digest
+
+
+def invalidate_token(digest):
+    cache_key = get_token_cache_key(digest)
+    local_tokens.delete(cache_key)
+    cache.delete(cache_key)
+
+
+def invalidate_tokens(digests):
+    """
+    Evicts many tokens with one round trip to the shared cache
+    """
+    cache_keys = [get_token_cache_key(digest) for digest in digests]
+    for cache_key in cache_keys:
+        local_tokens.delete(cache_key)
+    cache.delete_many(cache_keys)
+
+
+def invalidate_user_tokens(user):
+    invalidate_tokens(AuthToken.objects.filter(user=user).values_list('digest', flat=True))
+
+
+def token_deleted(sender, instance, **kwargs):
+    invalidate_token(instance.digest)
+
+
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    # Only deactivation, password and permission changes evict; routine saves such as the last_login
+    # update on every sign-in leave the cache alone, and the rest of the user is never cached
+    if update_fields is not None and not set(TOKEN_EVICTING_USER_FIELDS) & set(update_fields):
+        return
+    saved, state = instance.__dict__.get('_saved_token_state'), instance.get_token_state()
+    instance._saved_token_state = state
+    if not created and saved != state:
+        invalidate_user_tokens(instance)
+
+
+class CachedUser(SimpleLazyObject):
+    """
+    A token's user as seen through the cache: the pk and TOKEN_CACHED_USER_FIELDS are answered from
+    the cached entry, and anything else loads the user row on first use
+    """
+    is_authenticated = True
+    is_anonymous = False
+
+    def __bool__(self):
+        return True
+
+    def __init__(self, fields):
+        super().__init__(lambda: User._default_manager.get(pk=fields['pk']))
+        self.__dict__['_fields'] = fields
+
+    def __getattr__(self, name):
+        fields = self.__dict__['_fields']
+        if name in fields:
+            return fields[name]
+        if name == 'id':
+            return fields['pk']
+        return super().__getattr__(name)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Authenticates expiring, hashed AuthTokens through an in-process LRU backed by the shared cache
+    Most authenticated requests cost a dictionary lookup instead of a token/user join
+    """
+    model = AuthToken
+
+    def authenticate_credentials(self, key):
+        digest = AuthToken.hash_key(key)
+        cache_key = get_token_cache_key(digest)
+        now = timezone.now()
+        cached = local_tokens.get(cache_key)
+        if cached is None:
+            cached = cache.get(cache_key)
+            if cached is None:
+                cached = self.get_token_user(digest, now)
+                # Never cache a token past its own expiry
+                timeout = min(settings.TOKEN_CACHE_TIMEOUT, (cached[1].expires_at - now).total_seconds())
+                cache.set(cache_key, cached, timeout)
+            local_tokens.set(cache_key, cached)
+
+        fields, token = cached
+        if token.expires_at <= now:
+            invalidate_token(digest)
+            raise AuthenticationFailed(_('Token has expired.'))
+        return CachedUser(fields), token
+
+    def get_token_user(self, digest, now):
+        """
+        Returns (user fields, token) for the cache; never the user itself, whose password hash
+        has no business in a shared cache
+        """
+        user_fields = [f'user__{field}' for field in TOKEN_CACHED_USER_FIELDS]
+        try:
+            token = AuthToken.objects.select_related('user').only(
+                'digest', 'key_prefix', 'device', 'user', 'created_at', 'expires_at', *user_fields,
+            ).get(digest=digest, expires_at__gt=now)
+        except AuthToken.DoesNotExist:
+            raise AuthenticationFailed(_('Invalid token.'))
+        if not token.user.is_active:
+            raise AuthenticationFailed(_('User inactive or deleted.'))
+        fields = {'pk': token.user_id, **{field: getattr(token.user, field) for field in TOKEN_CACHED_USER_FIELDS}}
+        AuthToken._meta.get_field('user').delete_cached_value(token)
+        return fields, token
@@ -0,0 +1,187 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+
+def is_single_valued(model, path):
+    """
+    Whether every step of a lookup path is a foreign key or one-to-one, so joining it never repeats rows
+    """
+    for part in path.split('__'):
+        field = model._meta.get_field(part)
+        if not (field.many_to_one or field.one_to_one):
+            return False
+        model = field.related_model
+    return True
+
+
+def get_loaded_related(instance, path):
+    """
+    Follows a lookup path through relations already loaded on `instance`, by select_related or
+    prefetch_related. Returns (True, [related rows]) when every step was loaded, else (False, None)
+    """
+    rows = [instance]
+    for part in path.split('__'):
+        following = []
+        for row in rows:
+            field = row._meta.get_field(part)
+            if field.many_to_one or field.one_to_one:
+                if not field.is_cached(row):
+                    return False, None
+                related = field.get_cached_value(row)
+                following.extend([related] if related is not None else [])
+                continue
+            prefetched = getattr(row, '_prefetched_objects_cache', {})
+            cache_name = field.get_accessor_name() if field.auto_created else field.name
+            if cache_name not in prefetched:
+                return False, None
+            following.extend(prefetched[cache_name])
+        rows = following
+    return True, rows
+
+
+class ConditionalGetMixin:
+    """
+    ETag/Last-Modified support for ModelViewSet list and retrieve actions
+    Validators are computed from the timestamp column so unchanged data returns 304 without serializing
+    """
+    # Column bumped on every write (auto_now) used to build the validators
+    last_modified_field = 'updated_at'
+    # Lookup paths to the related rows the serializer renders (e.g. 'artist', 'images'); each
+    # related model needs the same timestamp column. Side-loaded ?include= paths are added automatically.
+    etag_dependencies = ()
+
+    def get_etag_dependencies(self):
+        paths = list(self.etag_dependencies)
+        for name in getattr(self, '_include_names', ()):
+            if self.includes[name][0] not in paths:
+                paths.append(self.includes[name][0])
+        return paths
+
+    def get_dependency_aggregates(self, paths=None):
+        """
+        MAX(timestamp) and a distinct row count per related path: an edit moves the first,
+        adding or removing a related row changes the second
+        """
+        aggregates = {}
+        for index, path in enumerate(self.get_etag_dependencies()):
+            if paths is None or path in paths:
+                aggregates[f'related_{index}_count'] = Count(path, distinct=True)
+                aggregates[f'related_{index}_modified'] = Max(f'{path}__{self.last_modified_field}')
+        return aggregates
+
+    def get_loaded_dependency_state(self, instances):
+        """
+        The same state for paths already loaded on `instances` (select_related, prefetch_related),
+        which need no query; returns it with the paths still to aggregate
+        """
+        state, remaining = {}, []
+        for index, path in enumerate(self.get_etag_dependencies()):
+            related = {}
+            for instance in instances:
+                loaded, rows = get_loaded_related(instance, path)
+                if not loaded:
+                    remaining.append(path)
+                    break
+                related.update((row.pk, row) for row in rows)
+            else:
+                state[f'related_{index}_count'] = len(related)
+                state[f'related_{index}_modified'] = max(
+                    (getattr(row, self.last_modified_field) for row in related.values()), default=None,
+                )
+        return state, remaining
+
+    def get_page_dependency_state(self, instances):
+        """
+        The state for a page of rows: loaded paths are read off the rows and the rest are aggregated
+        over just the page's pks. Single-valued paths share one query; each many-valued path gets its
+        own, so its joined rows never multiply another path's
+        """
+        state, remaining = self.get_loaded_dependency_state(instances)
+        model = self.get_queryset().model
+        rows = model._default_manager.filter(pk__in=[instance.pk for instance in instances]).order_by()
+        single = [path for path in remaining if is_single_valued(model, path)]
+        groups = [[path] for path in remaining if path not in single]
+        if single:
+            groups.append(single)
+        for paths in groups:
+            state.update(rows.aggregate(**self.get_dependency_aggregates(paths)))
+        return state
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        instances = list(queryset) if page is None else page
+        # The validator covers just this page: its rows in order with their timestamps, their
+        # related rows, and the total, which moves the page boundaries and links. Loading a page
+        # is cheap; serializing it is what a 304 saves. No Last-Modified here because a delete
+        # never makes the collection "newer".
+        count = self.paginator.page.paginator.count if page is not None else len(instances)
+        etag = self.build_etag(
+            request, 'list', count,
+            *(f'{instance.pk}@{getattr(instance, self.last_modified_field).isoformat()}' for instance in instances),
+            *self.format_state(self.get_page_dependency_state(instances)), request.get_full_path(),
+        )
+        not_modified = self.get_conditional_response(request, etag)
+        if not_modified is not None:
+            return not_modified
+        serializer = self.get_serializer(instances, many=True)
+        response = self.get_paginated_response(serializer.data) if page is not None else Response(serializer.data)
+        return self.set_validators(response, etag)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        last_modified = getattr(instance, self.last_modified_field)
+        state, remaining = self.get_loaded_dependency_state([instance])
+        if remaining:
+            state.update(
+                self.get_queryset().filter(pk=instance.pk).order_by().aggregate(**self.get_dependency_aggregates(remaining))
+            )
+        if state:
+            # Removing a related row moves no timestamp, so only the ETag can tell
+            last_modified = None
+        # The query string carries ?fields= and ?include=, which change the representation
+        etag = self.build_etag(
+            request, 'detail', instance.pk, getattr(instance, self.last_modified_field).isoformat(),
+            *self.format_state(state), request.get_full_path(),
+        )
+        not_modified = self.get_conditional_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        serializer = self.get_serializer(instance)
+        return self.set_validators(Response(serializer.data), etag, last_modified)
+
+    def format_state(self, state):
+        return [value.isoformat() if hasattr(value, 'isoformat') else value for _, value in sorted(state.items())]
+
+    def build_etag(self, request, *parts):
+        """
+        Weak ETag over the model, the requesting user and the given state parts
+        """
+        user_id = request.user.pk if request.user.is_authenticated else ''
+        key = ':'.join(str(part) for part in (self.get_queryset().model._meta.label, user_id, *parts))
+        return 'W/"%s"' % hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()
+
+    def get_conditional_response(self, request, etag, last_modified=None):
+        """
+        Returns a 304 (or 412) response when the client's validators still match, else None
+        """
+        placeholder = self.set_validators(HttpResponse(), etag, last_modified)
+        response = get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=last_modified and int(last_modified.timestamp()),
+            response=placeholder,
+        )
+        return None if response is placeholder else response
+
+    def set_validators(self, response, etag, last_modified=None):
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+        patch_vary_headers(response, ['Authorization', 'Cookie'])
+        return response
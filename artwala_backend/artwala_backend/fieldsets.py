@@ -0,0 +1,97 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+
+class SparseFieldsetSerializerMixin:
+    """
+    Serializer mixin accepting `fields` and `omit` keyword arguments
+    Drops every output field not listed in `fields` and every field listed in `omit`
+    """
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        omit = kwargs.pop('omit', None)
+        super().__init__(*args, **kwargs)
+
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        for name in omit or ():
+            self.fields.pop(name, None)
+
+
+def get_column_loading(serializer, model):
+    """
+    Works out the `.only()` columns and `select_related()` paths a serializer reads
+    Returns None when a field reads something that can't be traced back to a column
+    """
+    only, related = {model._meta.pk.name}, set()
+    for field in serializer.fields.values():
+        # SerializerMethodFields only touch relations in this project
+        if field.source == '*':
+            continue
+
+        parts = field.source.split('.')
+        opts, path = model._meta, []
+        for index, attr in enumerate(parts):
+            try:
+                model_field = opts.get_field(attr)
+            except FieldDoesNotExist:
+                # A method or property: load the whole row it hangs off
+                if not path:
+                    return None
+                break
+            # Reverse and many-to-many relations are prefetched, not selected
+            if not model_field.concrete or model_field.many_to_many:
+                path = []
+                break
+            path.append(attr)
+            if not model_field.is_relation:
+                break
+            # Traversed or nested relations are joined in rather than fetched per row
+            if index < len(parts) - 1 or isinstance(field, serializers.BaseSerializer):
+                related.add('__'.join(path))
+            opts = model_field.related_model._meta
+
+        if path:
+            only.add('__'.join(path))
+    return only, related
+
+
+class SparseFieldsetMixin:
+    """
+    ViewSet mixin adding `?fields=` / `?omit=` to read actions
+    List actions use `list_serializer_class` when set and only load the columns the serializer needs
+    """
+    list_serializer_class = None
+
+    def get_serializer_class(self):
+        if self.action == 'list' and self.list_serializer_class is not None:
+            return self.list_serializer_class
+        return super().get_serializer_class()
+
+    def get_serializer(self, *args, **kwargs):
+        if self.action in ('list', 'retrieve'):
+            kwargs.update(self.get_sparse_fieldset())
+        return super().get_serializer(*args, **kwargs)
+
+    def get_sparse_fieldset(self):
+        """
+        Reads comma separated `fields` and `omit` query parameters
+        """
+        fieldset = {}
+        for param in ('fields', 'omit'):
+            value = self.request.query_params.get(param)
+            if value:
+                fieldset[param] = [name.strip() for name in value.split(',') if name.strip()]
+        return fieldset
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action == 'list':
+            loading = get_column_loading(self.get_serializer(), queryset.model)
+            if loading is not None:
+                only, related = loading
+                if related:
+                    queryset = queryset.select_related(*related)
+                queryset = queryset.only(*only)
+        return queryset
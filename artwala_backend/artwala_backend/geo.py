@@ -0,0 +1,113 @@
+import csv
+import functools
+import math
+import re
+
+from django.conf import settings
+from django.db.models import Q
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def normalize(value):
+    return re.sub(r'\s+', ' ', (value or '').strip()).casefold()
+
+
+@functools.lru_cache(maxsize=1)
+def load_gazetteer():
+    """
+    Reads the offline gazetteer (city,state,country,latitude,longitude) once per process
+    Returns {key: (latitude, longitude)} for (city, state, country), (city, country) and (city,) keys
+    """
+    places = {}
+    with open(settings.GAZETTEER_PATH, newline='', encoding='utf-8') as file:
+        for row in csv.DictReader(file):
+            point = (float(row['latitude']), float(row['longitude']))
+            city, state, country = (normalize(row[field]) for field in ('city', 'state', 'country'))
+            # Earlier rows win, so list the better-known place first when names repeat
+            for key in ((city, state, country), (city, country), (city,)):
+                places.setdefault(key, point)
+    return places
+
+
+def geocode(city, state='', country=''):
+    """
+    Looks a place up in the gazetteer, falling back to less specific keys; returns (lat, lon) or None
+    """
+    places = load_gazetteer()
+    city, state, country = normalize(city), normalize(state), normalize(country)
+    if not city:
+        return None
+    for key in ((city, state, country), (city, country), (city,)):
+        if all(key) and key in places:
+            return places[key]
+    return None
+
+
+def geocode_text(location):
+    """
+    Geocodes free text such as "Pune", "Pune, Maharashtra" or "Andheri, Mumbai, India"
+    Tries each comma-separated part as the city, most specific first
+    """
+    parts = [part.strip() for part in (location or '').split(',') if part.strip()]
+    for index, city in enumerate(parts):
+        rest = parts[index + 1:]
+        point = geocode(city, rest[0] if len(rest) >= 2 else '', rest[-1] if rest else '')
+        if point is not None:
+            return point
+    return None
+
+
+def distance_km(lat1, lon1, lat2, lon2):
+    """
+    Great-circle (haversine) distance in kilometres
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (math.sin((phi2 - phi1) / 2) ** 2
+         + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def bounding_box_filter(latitude, longitude, radius_km):
+    """
+    Q matching every point within `radius_km` (and some corners beyond it) of the given point
+    Written as plain latitude/longitude ranges so it is served by the (latitude, longitude) index
+    """
+    delta_lat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    low_lat, high_lat = latitude - delta_lat, latitude + delta_lat
+    if low_lat <= -90 or high_lat >= 90:
+        # The circle covers a pole, so every longitude is in range
+        return Q(latitude__gte=max(low_lat, -90), latitude__lte=min(high_lat, 90))
+
+    query = Q(latitude__gte=low_lat, latitude__lte=high_lat)
+    spread = math.sin(radius_km / EARTH_RADIUS_KM) / math.cos(math.radians(latitude))
+    if spread >= 1:
+        return query
+    delta_lon = math.degrees(math.asin(spread))
+    low_lon, high_lon = longitude - delta_lon, longitude + delta_lon
+    if low_lon < -180:
+        return query & (Q(longitude__gte=low_lon + 360) | Q(longitude__lte=high_lon))
+    if high_lon > 180:
+        return query & (Q(longitude__gte=low_lon) | Q(longitude__lte=high_lon - 360))
+    return query & Q(longitude__gte=low_lon, longitude__lte=high_lon)
+
+
+def nearest(queryset, latitude, longitude, k, start_radius_km=50):
+    """
+    Returns up to `k` (distance_km, obj) pairs from `queryset` nearest to the point
+    Searches a bounding box that doubles until it holds k rows whose k-th distance fits inside it
+    """
+    radius = start_radius_km
+    queryset = queryset.filter(latitude__isnull=False, longitude__isnull=False)
+    while True:
+        candidates = sorted(
+            ((distance_km(latitude, longitude, obj.latitude, obj.longitude), obj)
+             for obj in queryset.filter(bounding_box_filter(latitude, longitude, radius))),
+            key=lambda pair: pair[0],
+        )
+        # The box contains the whole circle, so anything within `radius` has been seen
+        if len(candidates) >= k and candidates[k - 1][0] <= radius:
+            return candidates[:k]
+        if radius >= math.pi * EARTH_RADIUS_KM:
+            return candidates[:k]
+        radius *= 2
@@ -0,0 +1,76 @@
+from rest_framework.exceptions import ValidationError
+
+
+def get_related_queryset(objects, path, queryset):
+    """
+    Filters `queryset` down to the rows reachable from `objects` through `path`
+    Uses a single batched IN query per include, never one lookup per object
+    """
+    model = type(objects[0])
+    parts = path.split('__')
+    field = model._meta.get_field(parts[0])
+
+    if len(parts) == 1 and field.concrete and (field.many_to_one or field.one_to_one):
+        # Forward foreign key: the ids are already on the loaded rows
+        if not any(field.attname in obj.get_deferred_fields() for obj in objects):
+            ids = {getattr(obj, field.attname) for obj in objects}
+            return queryset.filter(pk__in=ids - {None})
+    elif len(parts) == 1 and field.one_to_many:
+        # Reverse foreign key: filter the children by their parent column
+        return queryset.filter(**{f'{field.field.name}__in': [obj.pk for obj in objects]})
+
+    ids = set(
+        model._default_manager.filter(pk__in=[obj.pk for obj in objects]).values_list(path, flat=True)
+    )
+    return queryset.filter(pk__in=ids - {None})
+
+
+class IncludeMixin:
+    """
+    ViewSet mixin side-loading related objects with `?include=name,...`
+    Included rows are serialized once per response under an `included` key, keyed by include name
+    """
+    # Maps include name -> (lookup path from the primary model, queryset, serializer class)
+    includes = {}
+
+    def get_includes(self):
+        value = self.request.query_params.get('include', '')
+        names = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = [name for name in names if name not in self.includes]
+        if unknown:
+            raise ValidationError({
+                'include': [f"Unsupported include '{name}'. Choose from: {', '.join(self.includes)}." for name in unknown]
+            })
+        return names
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # Validated up front so a bad include fails before any query runs
+        self._include_names = self.get_includes() if self.action in ('list', 'retrieve') else []
+        self._include_objects = []
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if self.action == 'list':
+            self._include_objects = list(page) if page is not None else list(queryset)
+        return page
+
+    def get_object(self):
+        obj = super().get_object()
+        if self.action == 'retrieve':
+            self._include_objects = [obj]
+        return obj
+
+    def get_included(self, objects, names):
+        included = {}
+        for name in names:
+            path, queryset, serializer_class = self.includes[name]
+            related = get_related_queryset(objects, path, queryset.all()) if objects else []
+            included[name] = serializer_class(related, many=True, context=self.get_serializer_context()).data
+        return included
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        names = getattr(self, '_include_names', None)
+        if names and response.status_code == 200 and isinstance(getattr(response, 'data', None), dict):
+            response.data['included'] = self.get_included(self._include_objects, names)
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -0,0 +1,215 @@
+import logging
+import re
+import secrets
+import struct
+import time
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:  # brotli is optional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # zstandard is optional
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Bodies that are already compressed gain nothing from a second pass
+re_incompressible = re.compile(
+    r'^(image/(?!svg)|video/|audio/|font/woff|application/(zip|gzip|x-gzip|zstd|x-bzip2|'
+    r'x-7z-compressed|x-rar-compressed|pdf|octet-stream))',
+    re.IGNORECASE,
+)
+
+# Upper bound of the random gzip file name length, as in django.middleware.gzip
+GZIP_MAX_RANDOM_BYTES = 100
+
+
+class GzipCompressor:
+    """
+    gzip whose header carries a random-length file name, like Django's GZipMiddleware, so the
+    compressed size can't be used to guess secrets in the body byte by byte (BREACH)
+    """
+    def __init__(self):
+        # Raw deflate; the gzip header and trailer are written here
+        self._compressor = zlib.compressobj(6, zlib.DEFLATED, -zlib.MAX_WBITS)
+        self._crc = 0
+        self._size = 0
+        # Magic, deflate, FNAME flag, zero mtime, no extra flags, unknown OS, then the NUL-terminated name
+        self._header = b'\x1f\x8b\x08\x08\x00\x00\x00\x00\x00\xff' + b'a' * secrets.randbelow(GZIP_MAX_RANDOM_BYTES) + b'\x00'
+
+    def _start(self):
+        header, self._header = self._header, b''
+        return header
+
+    def compress(self, data):
+        self._crc = zlib.crc32(data, self._crc)
+        self._size += len(data)
+        return self._start() + self._compressor.compress(data)
+
+    def flush(self):
+        return self._start() + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._start() + self._compressor.flush() + struct.pack('<II', self._crc, self._size & 0xffffffff)
+
+
+class BrotliCompressor:
+    def __init__(self):
+        # Quality 5 keeps most of brotli's ratio gain at gzip-like CPU cost
+        self._compressor = brotli.Compressor(quality=5)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+class ZstdCompressor:
+    def __init__(self):
+        self._compressor = zstandard.ZstdCompressor(level=3).compressobj()
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+# Content codings in server preference order, limited to what is installed
+COMPRESSORS = {
+    coding: compressor
+    for coding, compressor, available in (
+        ('br', BrotliCompressor, brotli is not None),
+        ('zstd', ZstdCompressor, zstandard is not None),
+        ('gzip', GzipCompressor, True),
+    )
+    if available
+}
+
+
+def compress_sequence(sequence, compressor):
+    """
+    Compresses a streamed body chunk by chunk, flushing after each one so clients see data promptly
+    """
+    for chunk in sequence:
+        data = compressor.compress(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def acompress_sequence(sequence, compressor):
+    async for chunk in sequence:
+        data = compressor.compress(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compresses responses with brotli, zstd or gzip depending on the client and installed libraries
+    Skips small bodies, partial content and media types that are already compressed
+    Responses that set cookies or hand out a CSRF token only get padded gzip: brotli and zstd
+    have no header field to pad, which would leave those secrets open to BREACH
+    """
+
+    def process_response(self, request, response):
+        min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', 1024)
+
+        # It's not worth compressing short responses.
+        if not response.streaming and len(response.content) < min_size:
+            return response
+        if response.has_header('Content-Encoding') or response.status_code == 206:
+            return response
+        if re_incompressible.match(response.get('Content-Type', '')):
+            return response
+        if 'no-transform' in response.get('Cache-Control', ''):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        codings = ('gzip',) if self.carries_secrets(request, response) else COMPRESSORS
+        coding = self.negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''), codings)
+        if coding is None:
+            return response
+        compressor = COMPRESSORS[coding]()
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = acompress_sequence(response.streaming_content, compressor)
+            else:
+                response.streaming_content = compress_sequence(response.streaming_content, compressor)
+            # The compressed size isn't known until the stream is consumed.
+            del response.headers['Content-Length']
+        else:
+            start = time.perf_counter()
+            compressed_content = compressor.compress(response.content) + compressor.finish()
+            duration = (time.perf_counter() - start) * 1000
+            # Return the compressed content only if it's actually shorter.
+            if len(compressed_content) >= len(response.content):
+                return response
+            logger.debug(
+                '%s %s: %s %d -> %d bytes (%.0f%% saved) in %.2f ms',
+                request.method, request.path, coding, len(response.content), len(compressed_content),
+                100 * (1 - len(compressed_content) / len(response.content)), duration,
+            )
+            response.headers['Server-Timing'] = ', '.join(filter(None, (
+                response.get('Server-Timing'),
+                f'compress;dur={duration:.2f};desc="{coding} {len(response.content)}>{len(compressed_content)}"',
+            )))
+            response.content = compressed_content
+            response.headers['Content-Length'] = str(len(response.content))
+
+        # Compressed bytes differ from the original, so a strong ETag must become weak.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = coding
+
+        return response
+
+    def carries_secrets(self, request, response):
+        # The CSRF middleware sets its cookie inside this one, so both show up in response.cookies
+        return bool(response.cookies) or request.META.get('CSRF_COOKIE_NEEDS_UPDATE', False)
+
+    def negotiate(self, accept_encoding, codings=COMPRESSORS):
+        """
+        Picks the content coding with the highest q-value among `codings`, breaking ties by server preference
+        """
+        accepted = {}
+        for item in accept_encoding.split(','):
+            coding, _, params = item.partition(';')
+            coding = coding.strip().lower()
+            if not coding:
+                continue
+            quality = 1.0
+            match = re.search(r'q=([0-9.]+)', params)
+            if match:
+                try:
+                    quality = float(match.group(1))
+                except ValueError:
+                    quality = 0.0
+            accepted[coding] = quality
+
+        best, best_quality = None, 0.0
+        for coding in codings:
+            quality = accepted.get(coding, accepted.get('*', 0.0))
+            if quality > best_quality:
+                best, best_quality = coding, quality
+        return best
@@ -48,11 +48,16 @@ INSTALLED_APPS = [
     "chapters",
     "community",
     "commissions",
+    "assets",
+    "taskqueue",
+    "outbox",
+    "analytics",
 ]
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "corsheaders.middleware.CorsMiddleware",
+    "artwala_backend.middleware.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -140,12 +145,46 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication',
-        'rest_framework.authentication.TokenAuthentication',
+        'artwala_backend.authentication.CachedTokenAuthentication',
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'artwala_backend.renderers.ORJSONRenderer',  # orjson when installed, stdlib json otherwise
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'artwala_backend.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20
 }
 
+# Point this at Redis/Memcached in production so every worker shares one cache
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+AUTH_TOKEN_TTL_DAYS = 30  # Lifetime of API tokens issued at login/registration
+
+# Login protection (see users.login and artwala_backend.throttling)
+LOGIN_HASH_WORKERS = 2  # Threads verifying passwords; caps the cores PBKDF2 can take from other traffic
+LOGIN_HASH_QUEUE_SIZE = 16  # Logins allowed to wait for a worker before new ones get a 503
+THROTTLE_BUCKETS = {
+    # scope: (burst capacity, tokens refilled per minute)
+    'login_ip': (20, 10),
+    'login_account': (5, 2),
+}
+BULK_IMPORT_HASH_WORKERS = None  # Processes hashing passwords during bulk imports (None: one per CPU)
+BULK_IMPORT_MAX_REQUEST_ROWS = 50  # Rows POST /api/auth/import/ hashes in the request; larger files get 413
+
+# Token authentication cache (see artwala_backend.authentication)
+TOKEN_CACHE_SIZE = 1024  # Tokens remembered per process
+TOKEN_CACHE_LOCAL_TIMEOUT = 30  # Seconds a process trusts its own copy; bounds revocation delay in other workers
+TOKEN_CACHE_TIMEOUT = 300  # Seconds a token stays in the shared cache
+
 # CORS Settings for React frontend
 CORS_ALLOW_ALL_ORIGINS = True  # Only for development
 CORS_ALLOWED_ORIGINS = [
@@ -154,9 +193,80 @@ CORS_ALLOWED_ORIGINS = [
     "https://shiny-goldfish-97j47gxg4v9jhx95v-3000.app.github.dev",  # Codespaces frontend
 ]
 
+# Response compression (brotli/zstd when installed, gzip otherwise)
+COMPRESSION_MIN_SIZE = 1024  # Bodies smaller than this (in bytes) are sent uncompressed
+
 # Media files (for image uploads)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+MEDIA_SERVE_BACKEND = 'sendfile'  # 'x-accel-redirect' (nginx), 'x-sendfile' (Apache/lighttpd) or 'sendfile' (no proxy)
+MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'  # nginx `internal` location aliased to MEDIA_ROOT
+MEDIA_CACHE_MAX_AGE = 3600  # Seconds browsers may cache media whose name isn't a content hash
+
+# Uploads are stored once per unique content under blobs/ (see assets.storage)
+STORAGES = {
+    "default": {
+        "BACKEND": "assets.storage.ContentAddressedStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+    },
+}
+BLOB_GC_GRACE_HOURS = 24  # Unreferenced blobs are kept this long before collection
+
+# Resumable chunked uploads (see assets.views.UploadSessionViewSet)
+UPLOAD_SESSION_DIR = BASE_DIR / 'upload_sessions'  # Partial files, kept outside MEDIA_ROOT so they're never served
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024  # Largest chunk accepted per PUT
+UPLOAD_MAX_SIZE = 500 * 1024 * 1024  # Largest file a session may declare
+UPLOAD_SESSION_EXPIRY_HOURS = 24  # Unfinished uploads are discarded after this long
+
+# Offline place lookup for chapter and user coordinates (city,state,country,latitude,longitude CSV)
+GAZETTEER_PATH = BASE_DIR / 'artwala_backend' / 'data' / 'gazetteer.csv'
+
+# Event calendar (see chapters.views)
+CALENDAR_MAX_DAYS = 366  # Widest window the calendar API accepts
+CALENDAR_FEED_PAST_DAYS = 90  # How far back .ics feeds include finished events
+CALENDAR_FEED_MAX_AGE = 300  # Seconds calendar clients may reuse a feed before revalidating
+
+# Event reminders and weekly chapter digests (see chapters.notifications)
+EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'  # filebased.EmailBackend writes to EMAIL_FILE_PATH; smtp in production
+EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
+DEFAULT_FROM_EMAIL = 'ARTWALA <no-reply@artwala.in>'
+EVENT_REMINDER_LEAD_HOURS = 24  # How long before an event its attendees are reminded
+DIGEST_DAYS_AHEAD = 7  # Days of upcoming events listed in a weekly digest
+NOTIFICATION_BATCH_SIZE = 500  # Emails sent per backend connection
+NOTIFICATION_MAX_ATTEMPTS = 5  # Sends tried before a notification is marked failed
+NOTIFICATION_CLAIM_TIMEOUT = 15 * 60  # Seconds before rows claimed by a crashed run are sent again
+
+# Background tasks (see taskqueue; run workers with `manage.py run_task_worker`)
+TASKS_EAGER = False  # Run tasks in-process right after commit instead of queueing them (no worker needed)
+TASK_WORKER_CONCURRENCY = 2  # Worker processes started by run_task_worker
+TASK_POLL_INTERVAL = 1.0  # Seconds an idle worker waits before looking for due tasks again
+TASK_MAX_ATTEMPTS = 5  # Default tries per task before it is marked failed
+TASK_RETRY_BACKOFF = 10  # Seconds before the first retry; doubles with every further attempt
+TASK_RETRY_BACKOFF_MAX = 60 * 60  # Longest wait between retries
+TASK_LOCK_TIMEOUT = 30 * 60  # Seconds before a running task whose worker died is retried; keep above the slowest task
+TASK_KEEP_FINISHED_DAYS = 7  # Finished tasks are kept this long for inspection
+
+# Domain event outbox (see outbox; publish with `manage.py relay_outbox --loop`)
+OUTBOX_HANDLERS = ["analytics.rollups.apply_events"]  # Dotted paths of callables given each relayed batch of OutboxEvents, e.g. a search indexer
+OUTBOX_RELAY_INTERVAL = 1.0  # Seconds between relay passes in --loop mode
+OUTBOX_RETENTION_DAYS = 30  # Published events are kept (and replayable) this long
+OUTBOX_FEED_MAX_LIMIT = 1000  # Most events returned per feed page
+
+# Commission inboxes (see commissions.inbox)
+COMMISSION_INBOX_CACHE_TIMEOUT = 300  # Seconds inbox counts are cached; changes made through the app clear them sooner
+
+# Commission payment reconciliation (see commissions.reconciliation; run `manage.py reconcile_commission_payments`)
+COMMISSION_RECONCILIATION_BATCH_SIZE = 1000  # Rows streamed per fetch and mismatches inserted per query
+COMMISSION_RECONCILIATION_KEEP_RUNS = 30  # Past runs (and their mismatches) kept for the finance report
+
+# Milestone deadlines and artist reliability stats (see commissions.sla; run `manage.py scan_milestone_deadlines`)
+MILESTONE_SCAN_BATCH_SIZE = 500  # Overdue milestones flagged (and notified by one task) per transaction
+
+# Artist analytics (see analytics.rollups; daily figures are fed by the outbox relay)
+ANALYTICS_MAX_DAYS = 1096  # Longest range (about three years) one time-series request may cover
+ANALYTICS_VIEW_FLUSH_INTERVAL = 60  # Seconds each process buffers product page views before queueing them in one task
 
 # Custom User Model
 AUTH_USER_MODEL = 'users.User'
@@ -0,0 +1,52 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Token bucket kept in the shared cache: `capacity` requests in a burst, refilled at `rate` per second
+    Subclasses set `scope` (a key in THROTTLE_BUCKETS) and implement get_ident_key()
+    """
+    scope = None
+
+    def get_ident_key(self, request, view):
+        raise NotImplementedError('.get_ident_key() must be overridden')
+
+    def allow_request(self, request, view):
+        ident = self.get_ident_key(request, view)
+        if ident is None:
+            return True
+        capacity, per_minute = settings.THROTTLE_BUCKETS[self.scope]
+        rate = per_minute / 60
+        key = f'throttle:{self.scope}:{ident}'
+        now = time.time()
+
+        # Read-modify-write without a lock: concurrent requests can overshoot by a token or two
+        tokens, updated = cache.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * rate)
+        if tokens < 1:
+            self._wait = (1 - tokens) / rate
+            return False
+        cache.set(key, (tokens - 1, now), int(capacity / rate) + 1)
+        return True
+
+    def wait(self):
+        return getattr(self, '_wait', None)
+
+
+class LoginIPThrottle(TokenBucketThrottle):
+    scope = 'login_ip'
+
+    def get_ident_key(self, request, view):
+        return self.get_ident(request)
+
+
+class LoginAccountThrottle(TokenBucketThrottle):
+    scope = 'login_account'
+
+    def get_ident_key(self, request, view):
+        email = request.data.get('email')
+        return email.strip().lower() if isinstance(email, str) and email.strip() else None
@@ -18,7 +18,7 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
-from django.conf.urls.static import static
+from assets.serving import serve_media
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -28,8 +28,12 @@ urlpatterns = [
     path("api/chapters/", include("chapters.urls")),
     path("api/community/", include("community.urls")),
     path("api/commissions/", include("commissions.urls")),
+    path("api/assets/", include("assets.urls")),
+    path("api/events/", include("outbox.urls")),
+    path("api/analytics/", include("analytics.urls")),
 ]
 
-# Serve media files in development
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+# Serve media files; MEDIA_SERVE_BACKEND hands the transfer to nginx/Apache in production
+urlpatterns += [
+    path(f"{settings.MEDIA_URL.lstrip('/')}<path:path>", serve_media, name="media"),
+]
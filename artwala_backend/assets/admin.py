@@ -0,0 +1,9 @@
+from django.contrib import admin
+from .models import Blob
+
+@admin.register(Blob)
+class BlobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'size', 'ref_count', 'orphaned_at', 'created_at')
+    list_filter = ('orphaned_at',)
+    search_fields = ('digest', 'name')
+    readonly_fields = ('digest', 'name', 'size', 'ref_count', 'orphaned_at', 'created_at')
@@ -0,0 +1,19 @@
+from django.apps import AppConfig
+
+
+class AssetsConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "assets"
+
+    def ready(self):
+        from django.apps import apps
+        from django.db.models.signals import post_delete, post_save
+
+        from .images import connect_signals
+        from .references import BLOB_REFERENCE_FIELDS, instance_deleted, instance_saved
+
+        connect_signals()
+        for label in BLOB_REFERENCE_FIELDS:
+            model = apps.get_model(label)
+            post_save.connect(instance_saved, sender=model, dispatch_uid=f'blob-references-{label}')
+            post_delete.connect(instance_deleted, sender=model, dispatch_uid=f'blob-references-{label}')
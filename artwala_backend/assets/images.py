@@ -0,0 +1,131 @@
+import hashlib
+import io
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+from django.db.models.signals import post_save
+from django.utils import timezone
+from PIL import Image, ImageOps, features
+
+from taskqueue.queue import task
+
+from .references import sync_references
+
+# Image fields that get derivatives, as (model label, field name)
+IMAGE_FIELDS = [
+    ('products.ProductImage', 'image'),
+    ('products.Category', 'image'),
+    ('artists.ArtistProfile', 'logo'),
+    ('users.User', 'profile_image'),
+    ('chapters.Chapter', 'cover_image'),
+]
+
+# Longest edge in pixels for each derivative, largest first
+DERIVATIVE_SIZES = {
+    'full': 1600,
+    'card': 480,
+    'thumbnail': 160,
+}
+
+# Encoder settings per output format; formats Pillow can't encode are skipped
+ENCODER_OPTIONS = {
+    'webp': {'quality': 80, 'method': 4},
+    'avif': {'quality': 60, 'speed': 6},
+}
+
+def get_formats():
+    return [fmt for fmt in ENCODER_OPTIONS if features.check(fmt)]
+
+
+def save_derivative(image, fmt, storage):
+    """
+    Encodes `image` and stores it under a name derived from its content
+    Identical derivatives (e.g. the same photo uploaded twice) are stored once
+    """
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt.upper(), **ENCODER_OPTIONS[fmt])
+    content = buffer.getvalue()
+    digest = hashlib.sha256(content).hexdigest()
+    name = f'derivatives/{digest[:2]}/{digest}.{fmt}'
+    if not storage.exists(name):
+        name = storage.save(name, ContentFile(content))
+    return name
+
+
+def render_derivatives(file):
+    """
+    Builds every size/format derivative of an image file
+    Returns {size: {format: storage name}}
+    """
+    formats = get_formats()
+    largest = max(DERIVATIVE_SIZES.values())
+    with file.open('rb'):
+        image = Image.open(file)
+        # Let JPEG decode at reduced scale when the original is much larger than needed
+        image.draft('RGB', (largest, largest))
+        image = ImageOps.exif_transpose(image)
+        image.load()
+
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'PA') else 'RGB')
+
+    derivatives = {}
+    # Each size is resized from the previous one, which is much cheaper than
+    # resampling the full original every time
+    for size, edge in DERIVATIVE_SIZES.items():
+        image = image.copy()
+        image.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+        derivatives[size] = {fmt: save_derivative(image, fmt, file.storage) for fmt in formats}
+    return derivatives
+
+
+@task(queue='images')
+def generate_derivatives(model_label, pk, field_name, source_name):
+    """
+    Renders and records derivatives for one image field, unless the image changed in the meantime
+    """
+    model = apps.get_model(model_label)
+    instance = model._default_manager.filter(pk=pk).first()
+    if instance is None or getattr(instance, field_name).name != source_name:
+        return
+
+    derivatives = {'source': source_name, **render_derivatives(getattr(instance, field_name))}
+    updates = {f'{field_name}_derivatives': derivatives}
+    # Bump updated_at so ETags on the owning object change
+    if any(field.name == 'updated_at' for field in model._meta.concrete_fields):
+        updates['updated_at'] = timezone.now()
+    if model._default_manager.filter(pk=pk, **{field_name: source_name}).update(**updates):
+        instance.refresh_from_db()
+        sync_references(instance)
+
+
+def schedule_derivatives(instance, field_name):
+    """
+    Queues derivative generation on the task workers once the current transaction commits
+    """
+    generate_derivatives.enqueue(instance._meta.label, instance.pk, field_name, getattr(instance, field_name).name)
+
+
+def image_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    for label, field_name in IMAGE_FIELDS:
+        if sender._meta.label != label:
+            continue
+        file = getattr(instance, field_name)
+        derivatives_field = f'{field_name}_derivatives'
+        derivatives = getattr(instance, derivatives_field)
+        if derivatives.get('source') == (file.name or None):
+            continue
+        # Drop derivatives of a replaced or removed image straight away
+        if derivatives:
+            sender._default_manager.filter(pk=instance.pk).update(**{derivatives_field: {}})
+            setattr(instance, derivatives_field, {})
+            sync_references(instance)
+        if file:
+            schedule_derivatives(instance, field_name)
+
+
+def connect_signals():
+    for label, _ in IMAGE_FIELDS:
+        post_save.connect(image_saved, sender=apps.get_model(label), dispatch_uid=f'image-derivatives-{label}')
@@ -0,0 +1,48 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from assets.models import UploadSession
+from assets.uploads import discard_upload
+
+
+class Command(BaseCommand):
+    help = 'Delete expired upload sessions and their partial files in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Sessions deleted per batch')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        deleted = 0
+        while True:
+            batch = list(
+                UploadSession.objects.filter(status='pending', expires_at__lte=now)
+                .order_by('expires_at')[:options['batch_size']]
+            )
+            if not batch:
+                break
+            for session in batch:
+                discard_upload(session)
+            UploadSession.objects.filter(pk__in=[session.pk for session in batch]).delete()
+            deleted += len(batch)
+
+        # Finished sessions only keep their row for idempotent retries of complete/
+        UploadSession.objects.filter(status='completed', expires_at__lte=now).delete()
+
+        # Partial files whose session row is already gone
+        orphans = 0
+        if os.path.isdir(settings.UPLOAD_SESSION_DIR):
+            names = [name for name in os.listdir(settings.UPLOAD_SESSION_DIR) if name.endswith('.part')]
+            known = {
+                session_id.hex for session_id in
+                UploadSession.objects.filter(pk__in=[name[:-5] for name in names]).values_list('pk', flat=True)
+            }
+            for name in names:
+                if name[:-5] not in known:
+                    os.remove(os.path.join(settings.UPLOAD_SESSION_DIR, name))
+                    orphans += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired upload sessions and {orphans} orphaned files'))
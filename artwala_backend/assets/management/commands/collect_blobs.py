@@ -0,0 +1,100 @@
+import datetime
+import os
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from assets.models import Blob
+from assets.references import BLOB_REFERENCE_FIELDS, sync_references
+from assets.storage import BLOB_DIR, get_blob_name
+
+
+class Command(BaseCommand):
+    help = 'Delete unreferenced content-addressed blobs in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Blobs deleted per batch')
+        parser.add_argument('--grace-hours', type=float, default=getattr(settings, 'BLOB_GC_GRACE_HOURS', 24),
+                            help='Only collect blobs unreferenced (and untouched on disk) for this long')
+        parser.add_argument('--rebuild', action='store_true', help='Rebuild every reference row before collecting')
+        parser.add_argument('--scan', action='store_true', help='Also delete blob files that have no database row')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be deleted without deleting')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - datetime.timedelta(hours=options['grace_hours'])
+
+        if options['rebuild']:
+            for label in BLOB_REFERENCE_FIELDS:
+                for instance in apps.get_model(label)._default_manager.iterator(chunk_size=500):
+                    sync_references(instance)
+            self.stdout.write('References rebuilt')
+
+        deleted = freed = 0
+        last_pk = 0
+        while True:
+            # Keyset pagination keeps every batch an index range scan
+            batch = list(
+                Blob.objects.filter(ref_count=0, orphaned_at__lt=cutoff, pk__gt=last_pk)
+                .order_by('pk').values_list('pk', 'name', 'size')[:options['batch_size']]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1][0]
+
+            if options['dry_run']:
+                # A re-upload of the same bytes touches the file, so skip anything recently written
+                candidates = [row for row in batch if self.is_stale(row[1], cutoff)]
+                deleted += len(candidates)
+                freed += sum(size for _, _, size in candidates)
+                continue
+
+            with transaction.atomic():
+                # Re-uploads and new references update these rows first, so they wait for this
+                # transaction; the files are removed before it commits
+                rows = Blob.objects.select_for_update().filter(pk__in=[pk for pk, _, _ in batch])
+                candidates = [row for row in rows.values_list('pk', 'name', 'size') if self.is_stale(row[1], cutoff)]
+                ids = [pk for pk, _, _ in candidates]
+                # The DELETE re-checks both conditions, so a reference or re-upload since the batch SELECT wins
+                Blob.objects.filter(pk__in=ids, ref_count=0, orphaned_at__lt=cutoff).delete()
+                kept = set(Blob.objects.filter(pk__in=ids).values_list('pk', flat=True))
+                for pk, name, size in candidates:
+                    if pk not in kept:
+                        default_storage.delete(name)
+                        deleted += 1
+                        freed += size
+
+        if options['scan']:
+            deleted += self.scan(cutoff, options['dry_run'])
+
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {deleted} blobs ({freed} bytes tracked)'))
+
+    def is_stale(self, name, cutoff):
+        try:
+            return default_storage.get_modified_time(name) < cutoff
+        except OSError:
+            return True
+
+    def scan(self, cutoff, dry_run):
+        """
+        Removes blob files (and abandoned temporary files) that no Blob row knows about
+        """
+        root = default_storage.path(BLOB_DIR)
+        deleted = 0
+        for directory, _, files in os.walk(root):
+            names = [os.path.relpath(os.path.join(directory, file), default_storage.location).replace('\\', '/')
+                     for file in files]
+            known = set(Blob.objects.filter(name__in=names).values_list('name', flat=True))
+            for name in names:
+                if name in known or not self.is_stale(name, cutoff):
+                    continue
+                if get_blob_name(name) is None and not name.startswith(f'{BLOB_DIR}/tmp/'):
+                    continue
+                if not dry_run:
+                    default_storage.delete(name)
+                deleted += 1
+        return deleted
@@ -0,0 +1,33 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from assets.images import IMAGE_FIELDS, generate_derivatives
+
+
+class Command(BaseCommand):
+    help = 'Render missing or stale WebP/AVIF derivatives for every uploaded image'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Re-render derivatives that are already up to date')
+
+    def handle(self, *args, **options):
+        for label, field_name in IMAGE_FIELDS:
+            model = apps.get_model(label)
+            derivatives_field = f'{field_name}_derivatives'
+            rows = (
+                model._default_manager.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+                .values_list('pk', field_name, derivatives_field)
+            )
+            rendered = failed = 0
+            for pk, name, derivatives in rows.iterator(chunk_size=500):
+                if not options['force'] and derivatives.get('source') == name:
+                    continue
+                try:
+                    generate_derivatives(label, pk, field_name, name)
+                    rendered += 1
+                except Exception as exc:
+                    failed += 1
+                    self.stderr.write(f'{label} {pk} ({name}): {exc}')
+            self.stdout.write(f'{label}.{field_name}: {rendered} rendered, {failed} failed')
+
+        self.stdout.write(self.style.SUCCESS('Image derivatives are up to date'))
@@ -0,0 +1,129 @@
+# Generated by Django 5.2.4 on 2026-10-19 12:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Blob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "digest",
+                    models.CharField(
+                        db_index=True,
+                        help_text="Hex SHA-256 of the file content",
+                        max_length=64,
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(
+                        help_text="Storage name of the file (blobs/ab/cd/<digest>.<ext>)",
+                        max_length=255,
+                        unique=True,
+                    ),
+                ),
+                (
+                    "size",
+                    models.PositiveBigIntegerField(
+                        default=0, help_text="File size in bytes"
+                    ),
+                ),
+                (
+                    "ref_count",
+                    models.PositiveIntegerField(
+                        default=0,
+                        help_text="Number of model fields currently referencing this blob",
+                    ),
+                ),
+                (
+                    "orphaned_at",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="When the last reference went away (null while referenced)",
+                        null=True,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True,
+                        help_text="When this blob was first referenced",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "asset_blobs",
+                "indexes": [
+                    models.Index(
+                        fields=["ref_count", "orphaned_at"], name="asset_blob_gc_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="BlobReference",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "object_id",
+                    models.CharField(
+                        help_text="Primary key of the referencing row", max_length=64
+                    ),
+                ),
+                (
+                    "field",
+                    models.CharField(
+                        help_text="Name of the referencing field", max_length=100
+                    ),
+                ),
+                (
+                    "blob",
+                    models.ForeignKey(
+                        help_text="The referenced blob",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="references",
+                        to="assets.blob",
+                    ),
+                ),
+                (
+                    "content_type",
+                    models.ForeignKey(
+                        help_text="Model of the referencing row",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="contenttypes.contenttype",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "asset_blob_references",
+                "unique_together": {("content_type", "object_id", "field", "blob")},
+            },
+        ),
+    ]
@@ -0,0 +1,121 @@
+# Generated by Django 5.2.4 on 2026-10-19 12:09
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("assets", "0001_initial"),
+        ("products", "0003_image_derivatives"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UploadSession",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        help_text="Unguessable session id used in the upload URL",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "filename",
+                    models.CharField(
+                        help_text="Original file name (its extension is kept on the stored file)",
+                        max_length=255,
+                    ),
+                ),
+                (
+                    "content_type",
+                    models.CharField(
+                        blank=True,
+                        help_text="MIME type reported by the client",
+                        max_length=100,
+                    ),
+                ),
+                (
+                    "size",
+                    models.PositiveBigIntegerField(
+                        help_text="Total file size in bytes"
+                    ),
+                ),
+                (
+                    "checksum",
+                    models.CharField(
+                        help_text="Hex SHA-256 of the whole file, verified on finalize",
+                        max_length=64,
+                    ),
+                ),
+                (
+                    "received",
+                    models.PositiveBigIntegerField(
+                        default=0,
+                        help_text="Bytes written so far; the next chunk starts at this offset",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("pending", "Pending"), ("completed", "Completed")],
+                        default="pending",
+                        help_text="Current state of the upload",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "file_name",
+                    models.CharField(
+                        blank=True,
+                        help_text="Storage name of the finished file (set on finalize)",
+                        max_length=255,
+                    ),
+                ),
+                (
+                    "expires_at",
+                    models.DateTimeField(
+                        help_text="When an unfinished upload is abandoned and its partial file removed"
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "product",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="Product the finished file is attached to as a new image",
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="upload_sessions",
+                        to="products.product",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        help_text="User uploading the file",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="upload_sessions",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "asset_upload_sessions",
+                "indexes": [
+                    models.Index(
+                        fields=["status", "expires_at"], name="asset_upload_expiry_idx"
+                    )
+                ],
+            },
+        ),
+    ]
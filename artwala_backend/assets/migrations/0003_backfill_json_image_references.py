@@ -0,0 +1,58 @@
+from django.core.files.storage import default_storage
+from django.db import migrations
+from django.db.models import Count
+
+from assets.references import get_blob_names
+
+# JSON image lists that were missing from BLOB_REFERENCE_FIELDS
+FIELDS = [
+    ("commissions", "CommissionRequest", "reference_images"),
+    ("commissions", "CommissionProposal", "sample_images"),
+    ("community", "ForumPost", "images"),
+]
+
+
+def _size(name):
+    try:
+        return default_storage.size(name)
+    except OSError:
+        return 0
+
+
+def backfill_references(apps, schema_editor):
+    """
+    Records references already held by these fields so collect_blobs stops treating their blobs as orphans
+    """
+    Blob = apps.get_model("assets", "Blob")
+    BlobReference = apps.get_model("assets", "BlobReference")
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    affected = set()
+    for app_label, model_name, field in FIELDS:
+        model = apps.get_model(app_label, model_name)
+        content_type, _ = ContentType.objects.get_or_create(app_label=app_label, model=model_name.lower())
+        for pk, value in model.objects.exclude(**{field: []}).values_list("pk", field).iterator(chunk_size=500):
+            for name in set(get_blob_names(value)):
+                blob, _ = Blob.objects.get_or_create(
+                    name=name, defaults={"digest": name.split("/")[-1][:64], "size": _size(name)}
+                )
+                BlobReference.objects.get_or_create(
+                    blob=blob, content_type=content_type, object_id=str(pk), field=field
+                )
+                affected.add(blob.pk)
+    counts = Blob.objects.filter(pk__in=affected).annotate(total=Count("references")).values_list("pk", "total")
+    for pk, total in counts:
+        Blob.objects.filter(pk=pk).update(ref_count=total, orphaned_at=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("assets", "0002_upload_sessions"),
+        ("commissions", "0006_milestone_deadlines"),
+        ("community", "0003_related_timestamps"),
+        ("contenttypes", "0002_remove_content_type_name"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_references, migrations.RunPython.noop),
+    ]
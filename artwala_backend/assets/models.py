@@ -0,0 +1,169 @@
+import uuid
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+
+
+class Blob(models.Model):
+    """
+    A single stored file, addressed by the SHA-256 of its content
+    Shared by every model field that references the same bytes and reference counted across them
+    """
+    # Content identity
+    digest = models.CharField(
+        max_length=64,
+        db_index=True,
+        help_text="Hex SHA-256 of the file content"
+    )
+    name = models.CharField(
+        max_length=255,
+        unique=True,
+        help_text="Storage name of the file (blobs/ab/cd/<digest>.<ext>)"
+    )
+    size = models.PositiveBigIntegerField(
+        default=0,
+        help_text="File size in bytes"
+    )
+
+    # Reference tracking for garbage collection
+    ref_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Number of model fields currently referencing this blob"
+    )
+    orphaned_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        help_text="When the last reference went away (null while referenced)"
+    )
+
+    # Timestamp tracking
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        help_text="When this blob was first referenced"
+    )
+
+    def __str__(self):
+        return self.name
+
+    class Meta:
+        db_table = 'asset_blobs'
+        indexes = [
+            # Garbage collection scans unreferenced blobs oldest first
+            models.Index(fields=['ref_count', 'orphaned_at'], name='asset_blob_gc_idx'),
+        ]
+
+
+class BlobReference(models.Model):
+    """
+    One model field holding a blob
+    Lets reference counts be rebuilt exactly when a row is saved or deleted
+    """
+    blob = models.ForeignKey(
+        Blob,
+        on_delete=models.CASCADE,
+        related_name='references',
+        help_text="The referenced blob"
+    )
+    content_type = models.ForeignKey(
+        ContentType,
+        on_delete=models.CASCADE,
+        help_text="Model of the referencing row"
+    )
+    object_id = models.CharField(
+        max_length=64,
+        help_text="Primary key of the referencing row"
+    )
+    field = models.CharField(
+        max_length=100,
+        help_text="Name of the referencing field"
+    )
+
+    class Meta:
+        db_table = 'asset_blob_references'
+        unique_together = ['content_type', 'object_id', 'field', 'blob']
+
+
+class UploadSession(models.Model):
+    """
+    A resumable, chunked upload of one large file
+    Chunks are appended to a partial file on disk until the upload is finalized into storage
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('completed', 'Completed'),
+    ]
+
+    # Identity and ownership
+    id = models.UUIDField(
+        primary_key=True,
+        default=uuid.uuid4,
+        editable=False,
+        help_text="Unguessable session id used in the upload URL"
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='upload_sessions',
+        help_text="User uploading the file"
+    )
+    product = models.ForeignKey(
+        'products.Product',
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+        related_name='upload_sessions',
+        help_text="Product the finished file is attached to as a new image"
+    )
+
+    # Declared file details, checked as chunks arrive and on finalize
+    filename = models.CharField(
+        max_length=255,
+        help_text="Original file name (its extension is kept on the stored file)"
+    )
+    content_type = models.CharField(
+        max_length=100,
+        blank=True,
+        help_text="MIME type reported by the client"
+    )
+    size = models.PositiveBigIntegerField(
+        help_text="Total file size in bytes"
+    )
+    checksum = models.CharField(
+        max_length=64,
+        help_text="Hex SHA-256 of the whole file, verified on finalize"
+    )
+
+    # Progress
+    received = models.PositiveBigIntegerField(
+        default=0,
+        help_text="Bytes written so far; the next chunk starts at this offset"
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pending',
+        help_text="Current state of the upload"
+    )
+    file_name = models.CharField(
+        max_length=255,
+        blank=True,
+        help_text="Storage name of the finished file (set on finalize)"
+    )
+
+    # Timestamp tracking
+    expires_at = models.DateTimeField(
+        help_text="When an unfinished upload is abandoned and its partial file removed"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size})"
+
+    class Meta:
+        db_table = 'asset_upload_sessions'
+        indexes = [
+            # The expiry sweep only looks at unfinished uploads past their deadline
+            models.Index(fields=['status', 'expires_at'], name='asset_upload_expiry_idx'),
+        ]
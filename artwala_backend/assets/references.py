@@ -0,0 +1,121 @@
+from django.contrib.contenttypes.models import ContentType
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.fields.files import FieldFile
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Blob, BlobReference
+from .storage import get_blob_name
+
+# Fields that can hold blobs: file fields, derivative maps and JSON lists of image URLs
+BLOB_REFERENCE_FIELDS = {
+    'products.ProductImage': ['image', 'image_derivatives'],
+    'products.Category': ['image', 'image_derivatives'],
+    'artists.ArtistProfile': ['logo', 'logo_derivatives', 'portfolio_images'],
+    'users.User': ['profile_image', 'profile_image_derivatives'],
+    'chapters.Chapter': ['cover_image', 'cover_image_derivatives'],
+    'chapters.ChapterEvent': ['image'],
+    'commissions.CommissionRequest': ['reference_images'],
+    'commissions.CommissionProposal': ['sample_images'],
+    'commissions.CommissionMilestone': ['progress_images'],
+    'community.ForumPost': ['images'],
+    # Keeps a finished upload alive until its session expires, giving the client time to reference it
+    'assets.UploadSession': ['file_name'],
+}
+
+
+def get_blob_names(value):
+    """
+    Yields the blob names held by a file field value or anywhere inside a JSON value
+    """
+    if isinstance(value, FieldFile):
+        value = value.name
+    if isinstance(value, str):
+        name = get_blob_name(value)
+        if name:
+            yield name
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from get_blob_names(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from get_blob_names(item)
+
+
+def recount(blob_ids):
+    """
+    Recomputes reference counts for the given blobs from the reference table in one UPDATE
+    """
+    references = (
+        BlobReference.objects.filter(blob=OuterRef('pk'))
+        .order_by().values('blob').annotate(total=Count('pk')).values('total')
+    )
+    blobs = Blob.objects.filter(pk__in=blob_ids)
+    blobs.update(ref_count=Coalesce(Subquery(references), 0))
+    blobs.filter(ref_count=0, orphaned_at__isnull=True).update(orphaned_at=timezone.now())
+    blobs.filter(ref_count__gt=0).update(orphaned_at=None)
+
+
+def sync_references(instance, deleted=False):
+    """
+    Brings the reference rows for one model instance in line with its current field values
+    """
+    fields = BLOB_REFERENCE_FIELDS.get(instance._meta.label)
+    if not fields or instance.pk is None:
+        return
+
+    wanted = set()
+    if not deleted:
+        for field in fields:
+            wanted.update((field, name) for name in get_blob_names(getattr(instance, field)))
+
+    content_type = ContentType.objects.get_for_model(instance)
+    with transaction.atomic():
+        current = BlobReference.objects.filter(content_type=content_type, object_id=str(instance.pk))
+        existing = {(field, name): (pk, blob_id) for pk, field, name, blob_id in current.values_list(
+            'pk', 'field', 'blob__name', 'blob_id'
+        )}
+        removed = [existing[key] for key in existing.keys() - wanted]
+        added = wanted - existing.keys()
+        if not removed and not added:
+            return
+
+        affected = {blob_id for _, blob_id in removed}
+        if removed:
+            BlobReference.objects.filter(pk__in=[pk for pk, _ in removed]).delete()
+        if added:
+            names = {name for _, name in added}
+            # Locked so collect_blobs can't delete a blob this instance is about to reference
+            missing = names - set(Blob.objects.select_for_update().filter(name__in=names).values_list('name', flat=True))
+            Blob.objects.bulk_create(
+                [Blob(name=name, digest=name.split('/')[-1][:64], size=_size(name)) for name in missing],
+                ignore_conflicts=True,
+            )
+            blob_ids = dict(Blob.objects.filter(name__in=names).values_list('name', 'pk'))
+            BlobReference.objects.bulk_create(
+                [
+                    BlobReference(blob_id=blob_ids[name], content_type=content_type, object_id=str(instance.pk), field=field)
+                    for field, name in added
+                ],
+                ignore_conflicts=True,
+            )
+            affected.update(blob_ids.values())
+        recount(affected)
+
+
+def _size(name):
+    try:
+        return default_storage.size(name)
+    except OSError:
+        return 0
+
+
+def instance_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        sync_references(instance)
+
+
+def instance_deleted(sender, instance, **kwargs):
+    sync_references(instance, deleted=True)
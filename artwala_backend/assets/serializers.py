@@ -0,0 +1,70 @@
+import re
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from rest_framework import serializers
+
+from products.models import Product
+from .models import UploadSession
+
+
+class ImageDerivativesField(serializers.ReadOnlyField):
+    """
+    Exposes a `*_derivatives` JSON map as URLs grouped by size and format
+    Empty until the background worker has rendered the current image
+    """
+    def to_representation(self, value):
+        request = self.context.get('request')
+        urls = {}
+        for size, formats in (value or {}).items():
+            if size == 'source':
+                continue
+            urls[size] = {}
+            for fmt, name in formats.items():
+                url = default_storage.url(name)
+                urls[size][fmt] = request.build_absolute_uri(url) if request else url
+        return urls
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    product = serializers.SlugRelatedField(
+        slug_field='slug', queryset=Product.objects.select_related('artist'), required=False, allow_null=True
+    )
+    chunk_size = serializers.SerializerMethodField()
+
+    class Meta:
+        model = UploadSession
+        fields = ['id', 'product', 'filename', 'content_type', 'size', 'checksum', 'received', 'status',
+                  'file_name', 'chunk_size', 'expires_at', 'created_at']
+        read_only_fields = ['received', 'status', 'file_name', 'expires_at', 'created_at']
+
+    def get_chunk_size(self, obj):
+        return settings.UPLOAD_CHUNK_SIZE
+
+    def validate_size(self, value):
+        if value < 1:
+            raise serializers.ValidationError('Size must be at least one byte.')
+        if value > settings.UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(f'Uploads are limited to {settings.UPLOAD_MAX_SIZE} bytes.')
+        return value
+
+    def validate_checksum(self, value):
+        value = value.lower()
+        if not re.fullmatch(r'[0-9a-f]{64}', value):
+            raise serializers.ValidationError('Checksum must be a hex SHA-256 digest.')
+        return value
+
+    def validate_product(self, value):
+        # Checked up front so nobody uploads 200 MB only to be refused at the end
+        if value is not None and value.artist.user_id != self.context['request'].user.pk:
+            raise serializers.ValidationError('You can only upload images for your own products.')
+        return value
+
+
+class UploadCompleteSerializer(serializers.Serializer):
+    """
+    Optional details for the product image created when an upload finishes
+    """
+    alt_text = serializers.CharField(max_length=200, required=False, allow_blank=True, default='')
+    is_primary = serializers.BooleanField(required=False, default=False)
+    order = serializers.IntegerField(min_value=0, required=False, default=0)
@@ -0,0 +1,157 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+# Derivative formats some platforms' mime tables still miss
+mimetypes.add_type('image/webp', '.webp')
+mimetypes.add_type('image/avif', '.avif')
+
+# Content-addressed names never change meaning, so browsers and CDNs may keep them forever
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+re_range = re.compile(r'^bytes=(\d*)-(\d*)$')
+# Blobs and image derivatives are named after the SHA-256 of their content
+re_hashed_name = re.compile(r'(?:^|/)([0-9a-f]{64})(\.[a-z0-9]+)?$')
+
+
+class RangeFile:
+    """
+    Read-only view of `length` bytes of an open file starting at `start`
+    Exposes fileno() with the file positioned at `start`, so wsgi.file_wrapper can still sendfile()
+    """
+    def __init__(self, file, start, length):
+        self.file = file
+        self.remaining = length
+        file.seek(start)
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(value, size):
+    """
+    Returns (start, end) for a single satisfiable byte range, None to send the whole file,
+    or raises ValueError when the range can't be satisfied
+    """
+    match = re_range.match(value.replace(' ', ''))
+    # Malformed and multi-range requests get the full body, which RFC 9110 allows
+    if match is None or match.group(1) == match.group(2) == '':
+        return None
+    first, last = match.groups()
+    if first == '':
+        # Suffix range: the final N bytes
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start, end = int(first), min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(value)
+    return start, end
+
+
+def if_range_matches(request, etag, mtime):
+    value = request.headers.get('If-Range')
+    if not value:
+        return True
+    if value.startswith(('"', 'W/')):
+        # Only a strong validator may satisfy If-Range
+        return value == etag
+    modified = parse_http_date_safe(value)
+    return modified is not None and int(mtime) <= modified
+
+
+@require_safe
+def serve_media(request, path):
+    """
+    Serves MEDIA_ROOT in production
+    Hands the transfer to nginx or Apache when MEDIA_SERVE_BACKEND says one is in front, otherwise
+    streams the file with Range support through wsgi.file_wrapper (sendfile under gunicorn)
+    """
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404('Invalid media path')
+    try:
+        stat = os.stat(full_path)
+    except OSError:
+        raise Http404('Media file not found')
+    if not os.path.isfile(full_path):
+        raise Http404('Media file not found')
+
+    hashed = re_hashed_name.search(path)
+    if hashed:
+        etag = '"%s"' % hashed.group(1)
+        cache_control = IMMUTABLE_CACHE_CONTROL
+    else:
+        etag = '"%x-%x"' % (int(stat.st_mtime), stat.st_size)
+        cache_control = f'public, max-age={settings.MEDIA_CACHE_MAX_AGE}'
+    content_type = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+
+    backend = settings.MEDIA_SERVE_BACKEND
+    if backend in ('x-accel-redirect', 'x-sendfile'):
+        # The proxy handles validators and Range itself; it keeps Content-Type and Cache-Control
+        response = HttpResponse(content_type=content_type)
+        if backend == 'x-accel-redirect':
+            response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_REDIRECT_PREFIX + quote(path)
+        else:
+            response['X-Sendfile'] = full_path
+        response['Cache-Control'] = cache_control
+        return response
+
+    response = HttpResponse()
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Cache-Control'] = cache_control
+    response['Accept-Ranges'] = 'bytes'
+    not_modified = get_conditional_response(
+        request, etag=etag, last_modified=int(stat.st_mtime), response=response
+    )
+    if not_modified is not response:
+        return not_modified
+
+    start, end, status = 0, stat.st_size - 1, 200
+    if request.headers.get('Range') and if_range_matches(request, etag, stat.st_mtime):
+        try:
+            byte_range = parse_range(request.headers['Range'], stat.st_size)
+        except ValueError:
+            response.status_code = 416
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+            return response
+        if byte_range is not None:
+            (start, end), status = byte_range, 206
+
+    length = end - start + 1
+    if request.method == 'HEAD':
+        response['Content-Type'] = content_type
+    else:
+        response = FileResponse(
+            RangeFile(open(full_path, 'rb'), start, length),
+            content_type=content_type,
+            status=status,
+            headers={key: value for key, value in response.items() if key != 'Content-Type'},
+        )
+        # FileResponse reads the file 64 KB at a time when no file_wrapper is available
+        response.block_size = 64 * 1024
+    response.status_code = status
+    response['Content-Length'] = str(length)
+    if status == 206:
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+    return response
@@ -0,0 +1,68 @@
+import hashlib
+import os
+import re
+import uuid
+
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Blob
+
+BLOB_DIR = 'blobs'
+
+re_blob_name = re.compile(r'(?:^|/)%s/[0-9a-f]{2}/[0-9a-f]{2}/([0-9a-f]{64})(\.[a-z0-9]+)?$' % BLOB_DIR)
+
+
+def get_blob_name(value):
+    """
+    Returns the canonical blob storage name for a blob name or URL, or None for other files
+    """
+    match = re_blob_name.search(value or '')
+    if match is None:
+        return None
+    digest, extension = match.group(1), match.group(2) or ''
+    return f'{BLOB_DIR}/{digest[:2]}/{digest[2:4]}/{digest}{extension}'
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File storage that names every file after the SHA-256 of its content
+    Identical uploads share one file on disk and the names are safe to cache forever
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # The final name is decided in _save() from the content, never suffixed
+        return name
+
+    def blob_name(self, digest, name):
+        extension = os.path.splitext(name)[1].lower()
+        if not re.fullmatch(r'\.[a-z0-9]{1,10}', extension):
+            extension = ''
+        return f'{BLOB_DIR}/{digest[:2]}/{digest[2:4]}/{digest}{extension}'
+
+    def _save(self, name, content):
+        # Finished resumable uploads arrive already hashed (see assets.uploads)
+        digest = getattr(content, 'sha256', None)
+        if digest is None:
+            hasher = hashlib.sha256()
+            for chunk in content.chunks():
+                hasher.update(chunk if isinstance(chunk, bytes) else chunk.encode())
+            digest = hasher.hexdigest()
+        name = self.blob_name(digest, name)
+
+        with transaction.atomic():
+            # Restarting an unreferenced blob's grace period takes its row lock, so a concurrent
+            # collect_blobs either keeps the file or has already deleted it and it is written again below
+            Blob.objects.filter(name=name, ref_count=0).update(orphaned_at=timezone.now())
+            if self.exists(name):
+                # Refresh the mtime too, for blobs that have no row yet
+                os.utime(self.path(name))
+                return name
+
+        # Write under a unique temporary name, then move into place atomically;
+        # a concurrent upload of the same bytes just replaces an identical file
+        temporary_name = super()._save(f'{BLOB_DIR}/tmp/{uuid.uuid4().hex}', content)
+        os.makedirs(os.path.dirname(self.path(name)), exist_ok=True)
+        os.replace(self.path(temporary_name), self.path(name))
+        return name
@@ -0,0 +1,325 @@
+import datetime
+import hashlib
+import io
+import os
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.http import Http404
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APIClient
+
+from artists.models import ArtistProfile
+from commissions.models import CommissionProposal, CommissionRequest
+from community.models import Forum, ForumPost
+from products.models import Category
+from .images import DERIVATIVE_SIZES, generate_derivatives, get_formats
+from .management.commands.collect_blobs import Command as CollectBlobsCommand
+from .models import Blob, UploadSession
+from .serving import serve_media
+from .uploads import get_partial_path
+
+User = get_user_model()
+
+
+class MediaTestMixin:
+    """
+    Points MEDIA_ROOT and the upload session directory at a throwaway directory
+    """
+    def setUp(self):
+        self.media_dir = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(
+            MEDIA_ROOT=self.media_dir, UPLOAD_SESSION_DIR=os.path.join(self.media_dir, 'upload_sessions'),
+        ))
+        self.user = User.objects.create_user(email='uploader@example.com', username='uploader', password='pw12345678')
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+
+@override_settings(UPLOAD_CHUNK_SIZE=4)
+class UploadTests(MediaTestMixin, TestCase):
+    data = b'0123456789'
+    
+    def start(self, data=None):
+        data = self.data if data is None else data
+        response = self.api.post('/api/assets/uploads/', {
+            'filename': 'notes.txt', 'size': len(data), 'checksum': hashlib.sha256(data).hexdigest(),
+        })
+        self.assertEqual(response.status_code, 201)
+        return f"/api/assets/uploads/{response.json()['id']}/"
+    
+    def put(self, url, start, chunk, **headers):
+        end = start + len(chunk) - 1
+        headers.setdefault('HTTP_CONTENT_RANGE', f'bytes {start}-{end}/{len(self.data)}')
+        return self.api.generic('PUT', url, chunk, content_type='application/octet-stream', **headers)
+    
+    def send_all(self, url):
+        for start in range(0, len(self.data), 4):
+            self.assertEqual(self.put(url, start, self.data[start:start + 4]).status_code, 200)
+    
+    def test_chunked_upload_resumes_and_completes(self):
+        url = self.start()
+        self.assertEqual(self.put(url, 0, b'0123').json()['received'], 4)
+        # A gap is refused and the client resumes from the reported offset
+        response = self.put(url, 8, b'89')
+        self.assertEqual((response.status_code, response.json()['received']), (409, 4))
+        self.assertEqual(self.api.get(url).json()['received'], 4)
+        # A resent chunk is accepted without moving the offset backwards
+        self.assertEqual(self.put(url, 0, b'0123').json()['received'], 4)
+        self.assertEqual(self.put(url, 4, b'4567').json()['received'], 8)
+        self.assertEqual(self.put(url, 8, b'89').json()['received'], 10)
+    
+        response = self.api.post(f'{url}complete/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'completed')
+        with open(os.path.join(self.media_dir, response.json()['file_name']), 'rb') as stored:
+            self.assertEqual(stored.read(), self.data)
+        # complete/ is safe to retry
+        self.assertEqual(self.api.post(f'{url}complete/').json()['file_name'], response.json()['file_name'])
+    
+    def test_bad_chunks_are_refused(self):
+        url = self.start()
+        self.assertEqual(self.put(url, 0, b'01234').status_code, 413)
+        self.assertEqual(self.put(url, 0, b'0123', HTTP_CONTENT_RANGE='bytes 0-3/11').status_code, 416)
+        self.assertEqual(self.put(url, 0, b'0123', HTTP_CONTENT_RANGE='0-3').status_code, 400)
+        self.assertEqual(self.put(url, 0, b'0123', HTTP_CONTENT_DIGEST='sha-256=:AAAA:').status_code, 400)
+        self.assertEqual(self.put(url, 0, b'0123', CONTENT_LENGTH='four').status_code, 400)
+        self.assertEqual(self.put(url, 0, b'0123', CONTENT_LENGTH='3').status_code, 400)
+        self.assertEqual(self.api.get(url).json()['received'], 0)
+    
+    def test_checksum_mismatch_restarts_the_upload(self):
+        url = self.start(self.data[::-1])
+        self.send_all(url)
+        response = self.api.post(f'{url}complete/')
+        self.assertEqual((response.status_code, response.json()['received']), (422, 0))
+    
+    def test_incomplete_upload_cannot_complete(self):
+        url = self.start()
+        self.put(url, 0, b'0123')
+        self.assertEqual(self.api.post(f'{url}complete/').status_code, 409)
+    
+    def test_chunk_racing_complete_is_a_conflict(self):
+        url = self.start()
+        self.send_all(url)
+        session = UploadSession.objects.get()
+        # complete/ finished between this chunk loading the session and opening the partial file
+        os.remove(get_partial_path(session))
+        response = self.put(url, 0, b'0123')
+        self.assertEqual((response.status_code, response.json()['received']), (409, 10))
+    
+    def test_sessions_belong_to_their_uploader(self):
+        url = self.start()
+        other = APIClient()
+        other.force_authenticate(User.objects.create_user(email='o@example.com', username='o', password='pw12345678'))
+        self.assertEqual(other.get(url).status_code, 404)
+        self.assertEqual(self.api.delete(url).status_code, 204)
+        self.assertFalse(UploadSession.objects.exists())
+
+
+class BlobCollectionTests(MediaTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.long_ago = timezone.now() - datetime.timedelta(days=7)
+        self.name = self.orphan(b'dusk')
+    
+    def orphan(self, content):
+        """
+        Stores `content` as a blob nothing has referenced for a week
+        """
+        name = default_storage.save('upload.txt', ContentFile(content))
+        os.utime(default_storage.path(name), (self.long_ago.timestamp(), self.long_ago.timestamp()))
+        Blob.objects.create(name=name, digest=name.split('/')[-1][:64], size=len(content), orphaned_at=self.long_ago)
+        return name
+    
+    def collect(self):
+        call_command('collect_blobs', stdout=StringIO())
+    
+    def collect_while(self, action):
+        """
+        Runs collect_blobs with `action` landing just after it checked the file's age
+        """
+        def is_stale(command, name, cutoff):
+            stale = original(command, name, cutoff)
+            action()
+            return stale
+        original = CollectBlobsCommand.is_stale
+        with mock.patch.object(CollectBlobsCommand, 'is_stale', autospec=True, side_effect=is_stale):
+            self.collect()
+    
+    def test_stale_unreferenced_blobs_are_collected(self):
+        fresh = default_storage.save('dawn.txt', ContentFile(b'dawn'))
+        Blob.objects.create(name=fresh, digest=fresh.split('/')[-1][:64], size=4, orphaned_at=timezone.now())
+        call_command('collect_blobs', '--dry-run', stdout=StringIO())
+        self.assertTrue(default_storage.exists(self.name))
+    
+        self.collect()
+        self.assertFalse(Blob.objects.filter(name=self.name).exists())
+        self.assertFalse(default_storage.exists(self.name))
+        # Still inside its grace period
+        self.assertTrue(default_storage.exists(fresh))
+    
+    def test_referenced_blobs_are_kept(self):
+        Category.objects.create(name='Paintings', slug='paintings', image=self.name)
+        self.collect()
+        self.assertEqual(Blob.objects.get(name=self.name).ref_count, 1)
+        self.assertTrue(default_storage.exists(self.name))
+    
+    def test_blobs_in_json_image_lists_are_kept(self):
+        author = User.objects.create_user(email='author@example.com', username='author', password='pw12345678')
+        artist = ArtistProfile.objects.create(user=author, display_name='Artist')
+        sample, attachment = self.orphan(b'sample'), self.orphan(b'attachment')
+        commission = CommissionRequest.objects.create(
+            client=self.user, artist=artist, title='Portrait', description='Oil portrait', commission_type='portrait',
+            budget_min=Decimal('100.00'), budget_max=Decimal('200.00'), deadline=datetime.date(2030, 1, 1),
+            reference_images=[default_storage.url(self.name)],
+        )
+        CommissionProposal.objects.create(
+            commission_request=commission, proposed_price=Decimal('150.00'), estimated_completion_time=14,
+            proposal_description='Plan', terms_and_conditions='Terms', sample_images=[default_storage.url(sample)],
+        )
+        forum = Forum.objects.create(name='Techniques', slug='techniques', description='How-tos')
+        ForumPost.objects.create(
+            forum=forum, author=author, title='Glazing', slug='glazing', content='Thin layers',
+            images=[default_storage.url(attachment)],
+        )
+        self.collect()
+        for name in (self.name, sample, attachment):
+            self.assertEqual(Blob.objects.get(name=name).ref_count, 1)
+            self.assertTrue(default_storage.exists(name))
+    
+    def test_reupload_during_collection_keeps_the_file(self):
+        self.collect_while(lambda: default_storage.save('dusk-again.txt', ContentFile(b'dusk')))
+        self.assertTrue(Blob.objects.filter(name=self.name).exists())
+        self.assertTrue(default_storage.exists(self.name))
+    
+    def test_reference_added_during_collection_keeps_the_file(self):
+        self.collect_while(lambda: Category.objects.create(name='Paintings', slug='paintings', image=self.name))
+        self.assertEqual(Blob.objects.get(name=self.name).ref_count, 1)
+        self.assertTrue(default_storage.exists(self.name))
+
+
+@override_settings(TASKS_EAGER=True)
+class ImageDerivativeTests(MediaTestMixin, TestCase):
+    def upload(self, color='teal'):
+        buffer = io.BytesIO()
+        Image.new('RGB', (2000, 1000), color).save(buffer, format='PNG')
+        return default_storage.save('category_images/paintings.png', ContentFile(buffer.getvalue()))
+    
+    def create(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Category.objects.create(name='Paintings', slug='paintings', image=self.upload())
+    
+    def derivatives(self, category):
+        category.refresh_from_db()
+        return category.image_derivatives
+    
+    def test_every_size_and_format_is_rendered_after_commit(self):
+        category = self.create()
+        derivatives = self.derivatives(category)
+        self.assertEqual(derivatives['source'], category.image.name)
+        for size, edge in DERIVATIVE_SIZES.items():
+            self.assertEqual(set(derivatives[size]), set(get_formats()))
+            with Image.open(default_storage.path(derivatives[size]['webp'])) as image:
+                self.assertEqual(image.size, (edge, edge // 2))
+        self.assertEqual(Blob.objects.get(name=derivatives['card']['webp']).ref_count, 1)
+    
+        data = APIClient().get('/api/products/categories/paintings/').json()
+        self.assertTrue(data['image_derivatives']['thumbnail']['webp'].endswith(derivatives['thumbnail']['webp']))
+        self.assertNotIn('source', data['image_derivatives'])
+    
+    def test_replaced_images_drop_their_derivatives_at_once(self):
+        category = self.create()
+        old_name, old_card = category.image.name, self.derivatives(category)['card']['webp']
+        category.image = self.upload('orange')
+        with self.captureOnCommitCallbacks() as callbacks:
+            category.save()
+        self.assertEqual(self.derivatives(category), {})
+        self.assertEqual(Blob.objects.get(name=old_card).ref_count, 0)
+    
+        # A job still queued for the old image renders nothing
+        generate_derivatives('products.Category', category.pk, 'image', old_name)
+        self.assertEqual(self.derivatives(category), {})
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.derivatives(category)['source'], category.image.name)
+    
+    def test_command_renders_missing_derivatives(self):
+        category = self.create()
+        Category.objects.filter(pk=category.pk).update(image_derivatives={})
+        for args, rendered in (((), 1), ((), 0), (('--force',), 1)):
+            stdout = StringIO()
+            call_command('generate_image_derivatives', *args, stdout=stdout)
+            self.assertIn(f'products.Category.image: {rendered} rendered, 0 failed', stdout.getvalue())
+        self.assertEqual(self.derivatives(category)['source'], category.image.name)
+
+
+class MediaServingTests(MediaTestMixin, TestCase):
+    data = b'0123456789'
+    
+    def setUp(self):
+        super().setUp()
+        os.makedirs(os.path.join(self.media_dir, 'notes'))
+        with open(os.path.join(self.media_dir, 'notes', 'field notes.txt'), 'wb') as file:
+            file.write(self.data)
+        self.url = '/media/notes/field%20notes.txt'
+    
+    def body(self, response):
+        return b''.join(response.streaming_content)
+    
+    def test_files_are_served_with_validators(self):
+        response = self.client.get(self.url)
+        self.assertEqual((response.status_code, self.body(response)), (200, self.data))
+        self.assertEqual((response['Content-Type'], response['Content-Length']), ('text/plain', '10'))
+        self.assertEqual((response['Cache-Control'], response['Accept-Ranges']), ('public, max-age=3600', 'bytes'))
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304)
+    
+        head = self.client.head(self.url)
+        self.assertEqual((head.status_code, head['Content-Length'], head.content), (200, '10', b''))
+        self.assertEqual(self.client.post(self.url).status_code, 405)
+    
+    def test_content_addressed_files_are_immutable(self):
+        name = default_storage.save('dusk.txt', ContentFile(b'dusk'))
+        response = self.client.get(f'/media/{name}')
+        self.assertEqual(self.body(response), b'dusk')
+        self.assertEqual(response['ETag'], '"%s"' % hashlib.sha256(b'dusk').hexdigest())
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+    
+    def test_ranges(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=2-5')
+        self.assertEqual((response.status_code, self.body(response)), (206, b'2345'))
+        self.assertEqual((response['Content-Range'], response['Content-Length']), ('bytes 2-5/10', '4'))
+        self.assertEqual(self.body(self.client.get(self.url, HTTP_RANGE='bytes=-3')), b'789')
+        self.assertEqual(self.body(self.client.get(self.url, HTTP_RANGE='bytes=7-')), b'789')
+        self.assertEqual(self.body(self.client.get(self.url, HTTP_RANGE='bytes=0-1,4-5')), self.data)
+    
+        refused = self.client.get(self.url, HTTP_RANGE='bytes=10-')
+        self.assertEqual((refused.status_code, refused['Content-Range']), (416, 'bytes */10'))
+        # A changed file is sent whole rather than spliced onto the client's stale copy
+        stale = self.client.get(self.url, HTTP_RANGE='bytes=2-5', HTTP_IF_RANGE='"stale"')
+        self.assertEqual((stale.status_code, self.body(stale)), (200, self.data))
+        etag = self.client.get(self.url)['ETag']
+        self.assertEqual(self.client.get(self.url, HTTP_RANGE='bytes=2-5', HTTP_IF_RANGE=etag).status_code, 206)
+    
+    def test_missing_and_outside_paths(self):
+        self.assertEqual(self.client.get('/media/notes/missing.txt').status_code, 404)
+        self.assertEqual(self.client.get('/media/notes/').status_code, 404)
+        with self.assertRaises(Http404):
+            serve_media(RequestFactory().get('/media/'), '../settings.py')
+    
+    def test_proxy_backends_only_get_headers(self):
+        with override_settings(MEDIA_SERVE_BACKEND='x-accel-redirect'):
+            response = self.client.get(self.url)
+        self.assertEqual((response['X-Accel-Redirect'], response.content), ('/protected-media/notes/field%20notes.txt', b''))
+        self.assertEqual((response['Content-Type'], response['Cache-Control']), ('text/plain', 'public, max-age=3600'))
+        with override_settings(MEDIA_SERVE_BACKEND='x-sendfile'):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Sendfile'], os.path.join(self.media_dir, 'notes', 'field notes.txt'))
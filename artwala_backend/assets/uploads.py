@@ -0,0 +1,137 @@
+import base64
+import binascii
+import hashlib
+import os
+import re
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+
+# Read size when streaming request bodies and files; bounds per-request memory
+BUFFER_SIZE = 64 * 1024
+
+re_content_range = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+re_content_digest = re.compile(r'(?:^|,)\s*sha-256=:([A-Za-z0-9+/=]+):')
+
+
+class UploadError(Exception):
+    def __init__(self, message, status):
+        super().__init__(message)
+        self.status = status
+
+
+class PartialFile(File):
+    """
+    A finished upload handed to storage by path, so it is moved into place rather than copied
+    Carries the verified digest so content-addressed storage doesn't hash the file again
+    """
+    def __init__(self, path, sha256):
+        super().__init__(open(path, 'rb'), name=os.path.basename(path))
+        self.path = path
+        self.sha256 = sha256
+
+    def temporary_file_path(self):
+        return self.path
+
+
+def get_partial_path(session):
+    return os.path.join(settings.UPLOAD_SESSION_DIR, f'{session.pk.hex}.part')
+
+
+def parse_content_range(value):
+    """
+    Parses `Content-Range: bytes <start>-<end>/<total>` into (start, end, total)
+    """
+    match = re_content_range.match((value or '').strip())
+    if match is None:
+        raise UploadError('Content-Range must look like "bytes <start>-<end>/<total>".', 400)
+    start, end, total = (int(group) for group in match.groups())
+    if end < start:
+        raise UploadError('Content-Range end is before its start.', 400)
+    return start, end, total
+
+
+def parse_content_digest(value):
+    """
+    Returns the raw SHA-256 from an RFC 9530 `Content-Digest` header, or None when absent
+    """
+    if not value:
+        return None
+    match = re_content_digest.search(value)
+    if match is None:
+        raise UploadError('Content-Digest must include a sha-256 digest.', 400)
+    try:
+        return base64.b64decode(match.group(1), validate=True)
+    except binascii.Error:
+        raise UploadError('Content-Digest sha-256 value is not valid base64.', 400)
+
+
+def create_partial_file(session):
+    os.makedirs(settings.UPLOAD_SESSION_DIR, exist_ok=True)
+    open(get_partial_path(session), 'wb').close()
+
+
+def write_chunk(session, stream, start, length, digest=None):
+    """
+    Streams `length` bytes from `stream` into the partial file at `start`
+    Only one buffer is held in memory; a digest mismatch leaves the session offset untouched
+    """
+    try:
+        partial = open(get_partial_path(session), 'r+b')
+    except FileNotFoundError:
+        # complete/ or DELETE removed the partial file after this request loaded the session
+        raise UploadError('This upload is no longer accepting chunks.', 409)
+    hasher = hashlib.sha256()
+    written = 0
+    with partial:
+        partial.seek(start)
+        while written < length:
+            data = stream.read(min(BUFFER_SIZE, length - written))
+            if not data:
+                break
+            hasher.update(data)
+            partial.write(data)
+            written += len(data)
+    if written != length:
+        raise UploadError(f'Chunk ended after {written} of {length} bytes.', 400)
+    if digest is not None and hasher.digest() != digest:
+        raise UploadError('Chunk does not match its Content-Digest.', 400)
+
+
+def file_sha256(path):
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for data in iter(lambda: file.read(BUFFER_SIZE), b''):
+            hasher.update(data)
+    return hasher.hexdigest()
+
+
+def finalize_upload(session):
+    """
+    Verifies the assembled file against the declared checksum and moves it into storage
+    Returns the storage name of the stored file
+    """
+    path = get_partial_path(session)
+    # Chunks may have been resent with different bytes, so the whole file is checked
+    digest = file_sha256(path)
+    if digest != session.checksum:
+        raise UploadError('Uploaded data does not match the declared checksum.', 422)
+    content = PartialFile(path, digest)
+    try:
+        return default_storage.save(session.filename, content)
+    finally:
+        content.close()
+
+
+def reset_upload(session):
+    create_partial_file(session)
+    session.received = 0
+    session.save(update_fields=['received', 'updated_at'])
+
+
+def discard_upload(session):
+    try:
+        os.remove(get_partial_path(session))
+    except FileNotFoundError:
+        pass
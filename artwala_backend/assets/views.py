@@ -0,0 +1,127 @@
+import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image, UnidentifiedImageError
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from products.models import ProductImage
+from products.serializers import ProductImageSerializer
+from .models import UploadSession
+from .serializers import UploadCompleteSerializer, UploadSessionSerializer
+from .uploads import (
+    UploadError, create_partial_file, discard_upload, finalize_upload, get_partial_path, parse_content_digest,
+    parse_content_range, reset_upload, write_chunk,
+)
+
+
+class UploadSessionViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin, mixins.DestroyModelMixin,
+                           viewsets.GenericViewSet):
+    """
+    Resumable chunked uploads
+    POST creates a session, PUT with Content-Range appends a chunk, GET reports the offset to resume
+    from, POST complete/ verifies the checksum and stores the file, DELETE abandons the upload
+    """
+    serializer_class = UploadSessionSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return UploadSession.objects.filter(user=self.request.user, expires_at__gt=timezone.now())
+
+    def perform_create(self, serializer):
+        expires_at = timezone.now() + datetime.timedelta(hours=settings.UPLOAD_SESSION_EXPIRY_HOURS)
+        session = serializer.save(user=self.request.user, expires_at=expires_at)
+        create_partial_file(session)
+
+    def update(self, request, *args, **kwargs):
+        """
+        Writes one chunk straight from the request stream; request.data is never touched so
+        Django doesn't buffer the body
+        """
+        session = self.get_object()
+        if session.status != 'pending':
+            return Response({'detail': 'This upload is already complete.'}, status=status.HTTP_409_CONFLICT)
+        try:
+            start, end, total = parse_content_range(request.headers.get('Content-Range'))
+            digest = parse_content_digest(request.headers.get('Content-Digest'))
+            length = end - start + 1
+            if total != session.size or end >= session.size:
+                raise UploadError(f'Content-Range must fall within the declared size of {session.size} bytes.', 416)
+            if length > settings.UPLOAD_CHUNK_SIZE:
+                raise UploadError(f'Chunks are limited to {settings.UPLOAD_CHUNK_SIZE} bytes.', 413)
+            try:
+                content_length = int(request.headers.get('Content-Length') or 0)
+            except ValueError:
+                raise UploadError('Content-Length must be an integer.', 400)
+            if content_length != length:
+                raise UploadError('Content-Length must match the Content-Range.', 400)
+            # Resent chunks (start below the offset) overwrite in place; gaps are refused
+            if start > session.received:
+                raise UploadError(f'Next chunk must start at byte {session.received}.', 409)
+            write_chunk(session, request.stream, start, length, digest)
+        except UploadError as error:
+            return Response(
+                {'detail': str(error), 'received': session.received},
+                status=error.status,
+            )
+
+        # Conditional update so concurrent or replayed chunks never move the offset backwards
+        UploadSession.objects.filter(pk=session.pk, received__lt=end + 1).update(
+            received=end + 1, updated_at=timezone.now()
+        )
+        session.refresh_from_db()
+        return Response(self.get_serializer(session).data)
+
+    @action(detail=True, methods=['post'])
+    def complete(self, request, pk=None):
+        """
+        Verifies the assembled file and moves it into storage, attaching it to the session's product
+        """
+        details = UploadCompleteSerializer(data=request.data)
+        details.is_valid(raise_exception=True)
+
+        with transaction.atomic():
+            # Locked so a retried complete/ waits for the first one instead of racing it for the file
+            session = self.get_queryset().select_for_update().get(pk=self.get_object().pk)
+            if session.status == 'completed':
+                return Response(self.get_serializer(session).data)
+            if session.received != session.size:
+                return Response(
+                    {'detail': f'Only {session.received} of {session.size} bytes have been received.'},
+                    status=status.HTTP_409_CONFLICT,
+                )
+
+            try:
+                if session.product_id is not None:
+                    try:
+                        # Reads the header only; the pixels stay on disk
+                        with Image.open(get_partial_path(session)):
+                            pass
+                    except (UnidentifiedImageError, OSError):
+                        raise UploadError('Uploaded file is not a supported image.', 400)
+                file_name = finalize_upload(session)
+            except UploadError as error:
+                # The data is unusable, so the client starts over from byte 0
+                reset_upload(session)
+                return Response({'detail': str(error), 'received': session.received}, status=error.status)
+            discard_upload(session)
+
+            session.status = 'completed'
+            session.file_name = file_name
+            session.save(update_fields=['status', 'file_name', 'updated_at'])
+
+            data = self.get_serializer(session).data
+            if session.product_id is not None:
+                image = ProductImage.objects.create(
+                    product_id=session.product_id, image=file_name, **details.validated_data
+                )
+                data['product_image'] = ProductImageSerializer(image, context=self.get_serializer_context()).data
+        return Response(data)
+
+    def perform_destroy(self, instance):
+        discard_upload(instance)
+        instance.delete()
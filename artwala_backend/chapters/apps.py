@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class ChaptersConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "chapters"
+
+    def ready(self):
+        from django.db.models.signals import post_delete
+
+        from .registration import registration_deleted
+
+        # Keep ChapterEvent.participants_count in step however a registration is removed
+        post_delete.connect(
+            registration_deleted, sender=self.get_model("EventRegistration"), dispatch_uid="event-registration-deleted"
+        )
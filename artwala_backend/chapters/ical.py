@@ -0,0 +1,67 @@
+import datetime
+
+CRLF = '\r\n'
+
+
+def escape_text(value):
+    """
+    Escapes a TEXT value per RFC 5545 section 3.3.11
+    """
+    return (
+        (value or '').replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n').replace('\r', '\\n')
+    )
+
+
+def fold_line(line):
+    """
+    Folds a content line into chunks of at most 75 octets, never splitting a UTF-8 character
+    """
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + CRLF
+    parts, start, limit = [], 0, 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        # Back off to a character boundary (continuation bytes look like 0b10xxxxxx)
+        while end < len(encoded) and encoded[end] & 0xC0 == 0x80:
+            end -= 1
+        parts.append(encoded[start:end].decode())
+        start, limit = end, 74  # continuation lines start with a space
+    return (CRLF + ' ').join(parts) + CRLF
+
+
+def format_datetime(value):
+    return value.astimezone(datetime.timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def iter_event(event, domain):
+    yield 'BEGIN:VEVENT'
+    yield f'UID:chapter-event-{event.pk}@{domain}'
+    yield f'DTSTAMP:{format_datetime(event.updated_at)}'
+    yield f'LAST-MODIFIED:{format_datetime(event.updated_at)}'
+    yield f'DTSTART:{format_datetime(event.start_date)}'
+    yield f'DTEND:{format_datetime(event.end_date)}'
+    yield f'SUMMARY:{escape_text(event.title)}'
+    yield f'DESCRIPTION:{escape_text(event.description)}'
+    yield f'LOCATION:{escape_text(event.location)}'
+    yield f'CATEGORIES:{escape_text(event.get_event_type_display())}'
+    yield 'END:VEVENT'
+
+
+def iter_calendar(name, events, domain):
+    """
+    Yields an iCalendar document line by line so it can be streamed while `events` is still being read
+    """
+    for line in (
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//ARTWALA//Chapter Events//EN',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{escape_text(name)}',
+    ):
+        yield fold_line(line)
+    for event in events:
+        yield ''.join(fold_line(line) for line in iter_event(event, domain))
+    yield fold_line('END:VCALENDAR')
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from artwala_backend.geo import geocode, geocode_text
+from chapters.models import Chapter
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Fill in chapter and user coordinates from the offline gazetteer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows updated per query')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        chapters, located_chapters = [], 0
+        for chapter in Chapter.objects.only('pk', 'city', 'state', 'country').iterator(chunk_size=batch_size):
+            chapter.latitude, chapter.longitude = geocode(chapter.city, chapter.state, chapter.country) or (None, None)
+            located_chapters += chapter.latitude is not None
+            chapters.append(chapter)
+        Chapter.objects.bulk_update(chapters, ['latitude', 'longitude'], batch_size=batch_size)
+
+        users, located = [], 0
+        for user in User.objects.only('pk', 'location').iterator(chunk_size=batch_size):
+            user.latitude, user.longitude = geocode_text(user.location) or (None, None)
+            located += user.latitude is not None
+            users.append(user)
+            if len(users) == batch_size:
+                User.objects.bulk_update(users, ['latitude', 'longitude'])
+                users = []
+        User.objects.bulk_update(users, ['latitude', 'longitude'])
+
+        self.stdout.write(self.style.SUCCESS(f'Geocoded {located_chapters} chapters and {located} users'))
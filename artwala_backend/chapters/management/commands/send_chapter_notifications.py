@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from chapters.notifications import dispatch_pending, queue_chapter_digests, queue_event_reminders
+
+
+class Command(BaseCommand):
+    help = 'Queue due event reminders and weekly chapter digests, then send everything pending (run from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.NOTIFICATION_BATCH_SIZE,
+            help='Rows inserted per query and emails sent per backend connection',
+        )
+        parser.add_argument('--queue-only', action='store_true', help='Queue due emails without sending them')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        now = timezone.now()
+
+        reminders = queue_event_reminders(now, batch_size)
+        digests = queue_chapter_digests(now, batch_size)
+        self.stdout.write(f'Queued {reminders} reminders and {digests} digest emails')
+        if options['queue_only']:
+            return
+
+        sent, failed = dispatch_pending(batch_size, now)
+        self.stdout.write(self.style.SUCCESS(f'Sent {sent} emails, {failed} failed'))
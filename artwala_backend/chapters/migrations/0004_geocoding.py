@@ -0,0 +1,39 @@
+# Generated by Django 5.2.4 on 2026-10-19 12:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chapters", "0003_image_derivatives"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="chapter",
+            name="latitude",
+            field=models.FloatField(
+                blank=True,
+                help_text="Latitude of the city, filled in from the offline gazetteer",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="chapter",
+            name="longitude",
+            field=models.FloatField(
+                blank=True,
+                help_text="Longitude of the city, filled in from the offline gazetteer",
+                null=True,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="chapter",
+            index=models.Index(
+                fields=["is_active", "latitude", "longitude"], name="chapter_geo_idx"
+            ),
+        ),
+    ]
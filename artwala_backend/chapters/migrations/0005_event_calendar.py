@@ -0,0 +1,27 @@
+# Generated by Django 5.2.4 on 2026-10-19 12:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chapters", "0004_geocoding"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="chapterevent",
+            index=models.Index(
+                fields=["is_public", "end_date", "start_date"],
+                name="event_calendar_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="chapterevent",
+            index=models.Index(
+                fields=["chapter", "is_public", "end_date"],
+                name="event_chapter_calendar_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.4 on 2026-10-19 12:25
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_participants(apps, schema_editor):
+    """
+    Seeds the place counter from the registrations that exist today, all of which are confirmed
+    """
+    ChapterEvent = apps.get_model("chapters", "ChapterEvent")
+    EventRegistration = apps.get_model("chapters", "EventRegistration")
+    confirmed = (
+        EventRegistration.objects.filter(event=OuterRef("pk"))
+        .order_by()
+        .values("event")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    ChapterEvent.objects.update(participants_count=Coalesce(Subquery(confirmed), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chapters", "0005_event_calendar"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="chapterevent",
+            name="participants_count",
+            field=models.PositiveIntegerField(
+                default=0,
+                editable=False,
+                help_text="Confirmed registrations; only ever changed by conditional UPDATEs in chapters.registration",
+            ),
+        ),
+        migrations.AddField(
+            model_name="eventregistration",
+            name="status",
+            field=models.CharField(
+                choices=[("confirmed", "Confirmed"), ("waitlisted", "Waitlisted")],
+                default="confirmed",
+                help_text="Whether this registration holds a place or is waiting for one",
+                max_length=20,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="eventregistration",
+            index=models.Index(
+                fields=["event", "status", "registered_at"],
+                name="event_registration_queue_idx",
+            ),
+        ),
+        migrations.RunPython(count_participants, migrations.RunPython.noop),
+    ]
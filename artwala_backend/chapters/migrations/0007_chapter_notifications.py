@@ -0,0 +1,186 @@
+# Generated by Django 5.2.4 on 2026-10-19 12:29
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chapters", "0006_event_registration"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ChapterNotification",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("reminder", "Event reminder"),
+                            ("digest", "Weekly digest"),
+                        ],
+                        help_text="Which email this is",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "week",
+                    models.DateField(
+                        blank=True,
+                        help_text="Monday of the digest week (digests only)",
+                        null=True,
+                    ),
+                ),
+                (
+                    "key",
+                    models.CharField(
+                        help_text="Kind, subject and recipient; a second queueing of the same email is ignored",
+                        max_length=100,
+                        unique=True,
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("sending", "Sending"),
+                            ("sent", "Sent"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        help_text="Delivery progress",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "attempts",
+                    models.PositiveSmallIntegerField(
+                        default=0, help_text="Sends tried so far"
+                    ),
+                ),
+                (
+                    "last_error",
+                    models.TextField(
+                        blank=True,
+                        help_text="Error from the most recent failed attempt",
+                    ),
+                ),
+                (
+                    "claimed_at",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="When a dispatcher run took this row; stale claims are retried",
+                        null=True,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, help_text="When the email was queued"
+                    ),
+                ),
+                (
+                    "sent_at",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="When the email backend accepted the message",
+                        null=True,
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "chapter_notifications",
+            },
+        ),
+        migrations.AddField(
+            model_name="chapter",
+            name="digest_week",
+            field=models.DateField(
+                blank=True,
+                editable=False,
+                help_text="Monday of the last week whose member digest was queued",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="chapterevent",
+            name="reminders_queued_at",
+            field=models.DateTimeField(
+                blank=True,
+                editable=False,
+                help_text="When reminders went out to registered attendees (null until the event is close enough)",
+                null=True,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="chapter",
+            index=models.Index(
+                fields=["is_active", "digest_week"], name="chapter_digest_due_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="chapterevent",
+            index=models.Index(
+                fields=["reminders_queued_at", "start_date"],
+                name="event_reminder_due_idx",
+            ),
+        ),
+        migrations.AddField(
+            model_name="chapternotification",
+            name="chapter",
+            field=models.ForeignKey(
+                help_text="Chapter the email is about",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="notifications",
+                to="chapters.chapter",
+            ),
+        ),
+        migrations.AddField(
+            model_name="chapternotification",
+            name="event",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="Event being reminded about (reminders only)",
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="notifications",
+                to="chapters.chapterevent",
+            ),
+        ),
+        migrations.AddField(
+            model_name="chapternotification",
+            name="user",
+            field=models.ForeignKey(
+                help_text="Recipient",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="chapter_notifications",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="chapternotification",
+            index=models.Index(
+                fields=["status", "id"], name="notification_dispatch_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="chapternotification",
+            index=models.Index(
+                fields=["status", "claimed_at"], name="notification_claim_idx"
+            ),
+        ),
+    ]
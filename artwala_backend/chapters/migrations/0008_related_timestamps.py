@@ -0,0 +1,21 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chapters", "0007_chapter_notifications"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="chaptermembership",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True,
+                help_text="Last time the membership changed (feeds chapter ETags)",
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chapters", "0008_related_timestamps"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="chapterevent",
+            name="event_reminder_due_idx",
+        ),
+        migrations.AddIndex(
+            model_name="chapterevent",
+            index=models.Index(fields=["start_date"], name="event_reminder_due_idx"),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from django.conf import settings
 from artists.models import ArtistProfile
+from artwala_backend.geo import geocode
 
 class Chapter(models.Model):
     """
@@ -31,6 +32,16 @@ class Chapter(models.Model):
         default='India',
         help_text="Country where chapter operates"
     )
+    latitude = models.FloatField(
+        blank=True,
+        null=True,
+        help_text="Latitude of the city, filled in from the offline gazetteer"
+    )
+    longitude = models.FloatField(
+        blank=True,
+        null=True,
+        help_text="Longitude of the city, filled in from the offline gazetteer"
+    )
     
     # Chapter details and presentation
     description = models.TextField(
@@ -42,6 +53,12 @@ class Chapter(models.Model):
         null=True,
         help_text="Header image representing the chapter and local art scene"
     )
+    cover_image_derivatives = models.JSONField(
+        default=dict, 
+        blank=True,
+        editable=False,
+        help_text="Resized WebP/AVIF copies of the cover image keyed by size and format (generated in the background)"
+    )
     
     # Management and administration
     admin = models.ForeignKey(
@@ -80,6 +97,22 @@ class Chapter(models.Model):
         auto_now=True,
         help_text="Last time chapter information was modified"
     )
+    digest_week = models.DateField(
+        blank=True,
+        null=True,
+        editable=False,
+        help_text="Monday of the last week whose member digest was queued"
+    )
+    
+    def save(self, *args, **kwargs):
+        # Coordinates follow the city; one missing from the gazetteer clears them instead of leaving
+        # the previous city's point behind
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'city', 'state', 'country'} & set(update_fields):
+            self.latitude, self.longitude = geocode(self.city, self.state, self.country) or (None, None)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'latitude', 'longitude'}
+        super().save(*args, **kwargs)
     
     def __str__(self):
         return f"{self.name} - {self.city}"
@@ -88,6 +121,12 @@ class Chapter(models.Model):
         db_table = 'chapters'
         verbose_name = 'Chapter'
         verbose_name_plural = 'Chapters'
+        indexes = [
+            # Bounding-box scans for the nearest-chapter lookup
+            models.Index(fields=['is_active', 'latitude', 'longitude'], name='chapter_geo_idx'),
+            # Chapters whose weekly digest hasn't been queued yet
+            models.Index(fields=['is_active', 'digest_week'], name='chapter_digest_due_idx'),
+        ]
 
 class ChapterMembership(models.Model):
     """
@@ -117,6 +156,17 @@ class ChapterMembership(models.Model):
         default=True,
         help_text="Whether membership is currently active (not suspended or left)"
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        help_text="Last time the membership changed (feeds chapter ETags)"
+    )
+    
+    def __str__(self):
+        return f"{self.artist.display_name} - {self.chapter.name}"
+    
+    class Meta:
+        db_table = 'chapter_memberships'
+        unique_together = ['chapter', 'artist']
 
 class ChapterEvent(models.Model):
     """
@@ -174,6 +224,11 @@ class ChapterEvent(models.Model):
         null=True,
         help_text="Maximum number of attendees (null for unlimited)"
     )
+    participants_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Confirmed registrations; only ever changed by conditional UPDATEs in chapters.registration"
+    )
     registration_fee = models.DecimalField(
         max_digits=8, 
         decimal_places=2, 
@@ -209,6 +264,46 @@ class ChapterEvent(models.Model):
         auto_now=True,
         help_text="Last time event details were modified"
     )
+    reminders_queued_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        editable=False,
+        help_text="When reminders went out to registered attendees (null until the event is close enough)"
+    )
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'start_date' in field_names:
+            instance._saved_start_date = instance.start_date
+        return instance
+    
+    def save(self, *args, **kwargs):
+        # A full save would write back a stale participants_count read before concurrent registrations
+        # (or undo the reminder scheduler's mark)
+        update_fields = kwargs.get('update_fields')
+        if not self._state.adding and update_fields is None:
+            update_fields = kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in ('participants_count', 'reminders_queued_at')
+            ]
+        # A rescheduled event is reminded again ahead of its new start
+        if not self._state.adding and 'start_date' in update_fields:
+            if '_saved_start_date' in self.__dict__:
+                old_start = self._saved_start_date
+            else:
+                old_start = type(self)._default_manager.filter(pk=self.pk).values_list('start_date', flat=True).first()
+            if old_start != self.start_date:
+                self.reminders_queued_at = None
+                kwargs['update_fields'] = {*update_fields, 'reminders_queued_at'}
+        super().save(*args, **kwargs)
+        self._saved_start_date = self.start_date
+    
+    @property
+    def spots_left(self):
+        if self.max_participants is None:
+            return None
+        return max(self.max_participants - self.participants_count, 0)
     
     def __str__(self):
         return f"{self.title} - {self.chapter.name}"
@@ -216,6 +311,13 @@ class ChapterEvent(models.Model):
     class Meta:
         db_table = 'chapter_events'
         unique_together = ['chapter', 'slug']
+        indexes = [
+            # Calendar windows: events that end after the window opens, across chapters or per chapter
+            models.Index(fields=['is_public', 'end_date', 'start_date'], name='event_calendar_idx'),
+            models.Index(fields=['chapter', 'is_public', 'end_date'], name='event_chapter_calendar_idx'),
+            # Events starting within the reminder lead time; they stay due until they start
+            models.Index(fields=['start_date'], name='event_reminder_due_idx'),
+        ]
 
 class EventRegistration(models.Model):
     """
@@ -244,3 +346,120 @@ class EventRegistration(models.Model):
         default=False,
         help_text="Whether user actually attended the event (updated post-event)"
     )
+    
+    # Capacity
+    STATUS_CHOICES = [
+        ('confirmed', 'Confirmed'),     # Holds one of the event's places
+        ('waitlisted', 'Waitlisted'),   # Promoted in registration order as places free up
+    ]
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='confirmed',
+        help_text="Whether this registration holds a place or is waiting for one"
+    )
+    
+    def __str__(self):
+        return f"{self.user.email} - {self.event.title}"
+    
+    class Meta:
+        db_table = 'event_registrations'
+        unique_together = ['event', 'user']
+        indexes = [
+            # Waitlist head for promotion, in registration order
+            models.Index(fields=['event', 'status', 'registered_at'], name='event_registration_queue_idx'),
+        ]
+
+class ChapterNotification(models.Model):
+    """
+    One email owed to one member: an event reminder or a weekly chapter digest
+    Rows are the delivery state, so rerunning the scheduler never sends anything twice
+    """
+    KIND_CHOICES = [
+        ('reminder', 'Event reminder'),
+        ('digest', 'Weekly digest'),
+    ]
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),     # Queued, not yet handed to the email backend
+        ('sending', 'Sending'),     # Claimed by a dispatcher run
+        ('sent', 'Sent'),           # Accepted by the email backend
+        ('failed', 'Failed'),       # Gave up after NOTIFICATION_MAX_ATTEMPTS
+    ]
+    
+    # What and for whom
+    kind = models.CharField(
+        max_length=20,
+        choices=KIND_CHOICES,
+        help_text="Which email this is"
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='chapter_notifications',
+        help_text="Recipient"
+    )
+    chapter = models.ForeignKey(
+        Chapter,
+        on_delete=models.CASCADE,
+        related_name='notifications',
+        help_text="Chapter the email is about"
+    )
+    event = models.ForeignKey(
+        ChapterEvent,
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+        related_name='notifications',
+        help_text="Event being reminded about (reminders only)"
+    )
+    week = models.DateField(
+        blank=True,
+        null=True,
+        help_text="Monday of the digest week (digests only)"
+    )
+    key = models.CharField(
+        max_length=100,
+        unique=True,
+        help_text="Kind, subject and recipient; a second queueing of the same email is ignored"
+    )
+    
+    # Delivery state
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pending',
+        help_text="Delivery progress"
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        help_text="Sends tried so far"
+    )
+    last_error = models.TextField(
+        blank=True,
+        help_text="Error from the most recent failed attempt"
+    )
+    claimed_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        help_text="When a dispatcher run took this row; stale claims are retried"
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        help_text="When the email was queued"
+    )
+    sent_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        help_text="When the email backend accepted the message"
+    )
+    
+    def __str__(self):
+        return f"{self.get_kind_display()} for {self.user.email} ({self.status})"
+    
+    class Meta:
+        db_table = 'chapter_notifications'
+        indexes = [
+            # Dispatcher scans: pending rows in queue order, and stale claims
+            models.Index(fields=['status', 'id'], name='notification_dispatch_idx'),
+            models.Index(fields=['status', 'claimed_at'], name='notification_claim_idx'),
+        ]
@@ -0,0 +1,218 @@
+import datetime
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F, Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import Chapter, ChapterEvent, ChapterMembership, ChapterNotification, EventRegistration
+
+
+def week_start(now):
+    today = timezone.localdate(now)
+    return today - datetime.timedelta(days=today.weekday())
+
+
+def insert_new(batch):
+    """
+    Inserts the notifications whose key isn't queued yet and returns how many that was
+    ignore_conflicts still covers a concurrent run inserting the same key in between
+    """
+    if not batch:
+        return 0
+    queued = set(ChapterNotification.objects.filter(key__in=[item.key for item in batch]).values_list('key', flat=True))
+    new = [item for item in batch if item.key not in queued]
+    ChapterNotification.objects.bulk_create(new, ignore_conflicts=True)
+    return len(new)
+
+
+def queue(notifications, batch_size):
+    """
+    Inserts notifications in batches; ones already queued (same key) are skipped, which makes reruns safe
+    Returns the number of notifications actually added
+    """
+    batch, total = [], 0
+    for notification in notifications:
+        batch.append(notification)
+        if len(batch) == batch_size:
+            total += insert_new(batch)
+            batch = []
+    return total + insert_new(batch)
+
+
+def reminders_due(now):
+    """
+    Events starting within EVENT_REMINDER_LEAD_HOURS, read as a range scan of event_reminder_due_idx
+    """
+    return ChapterEvent.objects.filter(
+        start_date__gt=now,
+        start_date__lte=now + datetime.timedelta(hours=settings.EVENT_REMINDER_LEAD_HOURS),
+    ).only('pk', 'chapter_id', 'start_date', 'reminders_queued_at')
+
+
+def queue_event_reminders(now, batch_size):
+    """
+    Queues a reminder per confirmed attendee of every event starting within EVENT_REMINDER_LEAD_HOURS
+    Events stay due until they start, so attendees confirmed after the first run (late registrations,
+    promotions from the waitlist) are reminded by the next one
+    """
+    total = 0
+    for event in reminders_due(now):
+        # Keyed by start time, so attendees of a rescheduled event are reminded again
+        prefix = f'reminder:{event.pk}:{event.start_date:%Y%m%d%H%M}:'
+        reminded = ChapterNotification.objects.filter(event=event, kind='reminder', key__startswith=prefix).values('user_id')
+        attendees = (
+            EventRegistration.objects.filter(event=event, status='confirmed').exclude(user_id__in=reminded)
+            .order_by().values_list('user_id', flat=True)
+        )
+        total += queue((
+            ChapterNotification(
+                kind='reminder', user_id=user_id, chapter_id=event.chapter_id, event=event,
+                key=f'{prefix}{user_id}',
+            )
+            for user_id in attendees.iterator(chunk_size=batch_size)
+        ), batch_size)
+        if event.reminders_queued_at is None:
+            ChapterEvent.objects.filter(pk=event.pk).update(reminders_queued_at=now, updated_at=now)
+    return total
+
+
+def queue_chapter_digests(now, batch_size):
+    """
+    Queues this week's digest for every member of each active chapter with public events coming up
+    """
+    week = week_start(now)
+    due = Chapter.objects.filter(Q(digest_week__isnull=True) | Q(digest_week__lt=week), is_active=True).only('pk')
+    total = 0
+    for chapter in due:
+        if upcoming_events(chapter, now).exists():
+            members = ChapterMembership.objects.filter(
+                chapter=chapter, is_active=True, artist__user__is_active=True
+            ).order_by().values_list('artist__user_id', flat=True)
+            total += queue((
+                ChapterNotification(
+                    kind='digest', user_id=user_id, chapter=chapter, week=week,
+                    key=f'digest:{chapter.pk}:{week.isoformat()}:{user_id}',
+                )
+                for user_id in members.iterator(chunk_size=batch_size)
+            ), batch_size)
+        Chapter.objects.filter(pk=chapter.pk).update(digest_week=week)
+    return total
+
+
+def upcoming_events(chapter, now):
+    return ChapterEvent.objects.filter(
+        chapter=chapter, is_public=True, start_date__gt=now,
+        start_date__lte=now + datetime.timedelta(days=settings.DIGEST_DAYS_AHEAD),
+    ).order_by('start_date', 'pk')
+
+
+class Renderer:
+    """
+    Renders each distinct email once per run; recipients of the same event or digest share the body
+    """
+    def __init__(self, now):
+        self.now = now
+        self.rendered = {}
+
+    def render(self, notification):
+        if notification.kind == 'reminder':
+            key = ('reminder', notification.event_id)
+        else:
+            key = ('digest', notification.chapter_id)
+        if key not in self.rendered:
+            self.rendered[key] = getattr(self, f'render_{notification.kind}')(notification)
+        return self.rendered[key]
+
+    def render_reminder(self, notification):
+        event = ChapterEvent.objects.select_related('chapter').get(pk=notification.event_id)
+        body = render_to_string('chapters/email/event_reminder.txt', {
+            'event': event, 'timezone': settings.TIME_ZONE,
+        })
+        return f'Reminder: {event.title}', body
+
+    def render_digest(self, notification):
+        chapter = Chapter.objects.get(pk=notification.chapter_id)
+        body = render_to_string('chapters/email/chapter_digest.txt', {
+            'chapter': chapter,
+            'events': list(upcoming_events(chapter, self.now)),
+            'days': settings.DIGEST_DAYS_AHEAD,
+        })
+        return f'This week at {chapter.name}', body
+
+
+def release_stale_claims(now):
+    # Rows claimed by a run that died mid-batch; they may go out twice, but never zero times
+    timeout = datetime.timedelta(seconds=settings.NOTIFICATION_CLAIM_TIMEOUT)
+    return ChapterNotification.objects.filter(status='sending', claimed_at__lt=now - timeout).update(
+        status='pending', claimed_at=None
+    )
+
+
+def claim_batch(after, batch_size, now):
+    with transaction.atomic():
+        batch = list(
+            ChapterNotification.objects.select_for_update(skip_locked=True, of=('self',))
+            .filter(status='pending', pk__gt=after)
+            .select_related('user')
+            .order_by('pk')[:batch_size]
+        )
+        ChapterNotification.objects.filter(pk__in=[notification.pk for notification in batch]).update(
+            status='sending', claimed_at=now
+        )
+    return batch
+
+
+def send_batch(batch, connection, renderer):
+    """
+    Sends one claimed batch over a single backend connection and records the outcome of each message
+    """
+    sent, failures = [], []
+    with connection:
+        for notification in batch:
+            subject, body = renderer.render(notification)
+            user = notification.user
+            message = EmailMessage(
+                subject, f'Hi {user.first_name or user.username},\n\n{body}',
+                to=[user.email], connection=connection,
+            )
+            try:
+                message.send()
+            except Exception as error:
+                failures.append((notification, error))
+            else:
+                sent.append(notification.pk)
+
+    ChapterNotification.objects.filter(pk__in=sent).update(
+        status='sent', sent_at=timezone.now(), attempts=F('attempts') + 1
+    )
+    for notification, error in failures:
+        attempts = notification.attempts + 1
+        ChapterNotification.objects.filter(pk=notification.pk).update(
+            status='failed' if attempts >= settings.NOTIFICATION_MAX_ATTEMPTS else 'pending',
+            attempts=attempts, last_error=str(error), claimed_at=None,
+        )
+    return len(sent), len(failures)
+
+
+def dispatch_pending(batch_size, now=None, connection=None):
+    """
+    Sends every pending notification through the configured EMAIL_BACKEND; returns (sent, failed) counts
+    Each row is claimed before sending, so concurrent runs split the queue instead of duplicating it
+    """
+    now = now or timezone.now()
+    release_stale_claims(now)
+    connection = connection or get_connection()
+    renderer = Renderer(now)
+    sent = failed = after = 0
+    while True:
+        batch = claim_batch(after, batch_size, now)
+        if not batch:
+            return sent, failed
+        # Failures go back to pending for the next run rather than being retried in a tight loop
+        after = batch[-1].pk
+        batch_sent, batch_failed = send_batch(batch, connection, renderer)
+        sent += batch_sent
+        failed += batch_failed
@@ -0,0 +1,88 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from .models import ChapterEvent, ChapterMembership, EventRegistration
+
+
+def claim_place(event_id):
+    """
+    Takes one place on the event if any is left, in a single conditional UPDATE
+    Concurrent claims queue on the event row and re-check the condition, so the count never passes capacity
+    """
+    return ChapterEvent.objects.filter(
+        Q(max_participants__isnull=True) | Q(participants_count__lt=F('max_participants')),
+        pk=event_id,
+    ).update(participants_count=F('participants_count') + 1, updated_at=timezone.now()) == 1
+
+
+def release_place(event_id):
+    ChapterEvent.objects.filter(pk=event_id, participants_count__gt=0).update(
+        participants_count=F('participants_count') - 1, updated_at=timezone.now(),
+    )
+
+
+def promote_waitlist(event_id):
+    """
+    Moves waitlisted registrations into free places, oldest first; returns the promoted registrations
+    """
+    promoted = []
+    while True:
+        with transaction.atomic():
+            head = EventRegistration.objects.select_for_update(skip_locked=True).filter(
+                event_id=event_id, status='waitlisted'
+            ).order_by('registered_at', 'pk').first()
+            if head is None or not claim_place(event_id):
+                return promoted
+            EventRegistration.objects.filter(pk=head.pk).update(status='confirmed')
+        head.status = 'confirmed'
+        promoted.append(head)
+
+
+def register(event, user):
+    """
+    Registers a user for an event, confirmed while places last and waitlisted after that
+    """
+    if event.end_date <= timezone.now():
+        raise ValidationError({'event': ['This event has already ended.']})
+    if not event.is_public and not ChapterMembership.objects.filter(
+        chapter_id=event.chapter_id, artist__user=user, is_active=True
+    ).exists():
+        raise ValidationError({'event': ['This event is open to chapter members only.']})
+    # Cheap check first so repeated clicks don't queue on the event row
+    if EventRegistration.objects.filter(event=event, user=user).exists():
+        raise ValidationError({'event': ['You are already registered for this event.']})
+
+    try:
+        with transaction.atomic():
+            status = 'confirmed' if claim_place(event.pk) else 'waitlisted'
+            registration = EventRegistration.objects.create(event=event, user=user, status=status)
+    except IntegrityError:
+        raise ValidationError({'event': ['You are already registered for this event.']})
+
+    if status == 'waitlisted':
+        # A place released while this row was still uncommitted would otherwise stay empty
+        if any(promoted.pk == registration.pk for promoted in promote_waitlist(event.pk)):
+            registration.status = 'confirmed'
+        else:
+            registration.refresh_from_db(fields=['status'])
+    return registration
+
+
+def cancel(registration):
+    """
+    Cancels a registration; a confirmed place goes to the head of the waitlist
+    """
+    with transaction.atomic():
+        # Lock the row so a concurrent promotion can't change its status under us
+        locked = EventRegistration.objects.select_for_update().filter(pk=registration.pk).first()
+        if locked is not None:
+            locked.delete()
+
+
+def registration_deleted(sender, instance, **kwargs):
+    # Connected to post_delete so cascades (e.g. deleting the user) give their place back too
+    if instance.status == 'confirmed':
+        release_place(instance.event_id)
+        transaction.on_commit(lambda: promote_waitlist(instance.event_id))
@@ -1,17 +1,43 @@
+from django.db.models import Q
 from rest_framework import serializers
+from artwala_backend.fieldsets import SparseFieldsetSerializerMixin
+from assets.serializers import ImageDerivativesField
 from .models import Chapter, ChapterMembership, ChapterEvent, EventRegistration
 
-class ChapterSerializer(serializers.ModelSerializer):
+class ChapterSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     admin_name = serializers.CharField(source='admin.get_full_name', read_only=True)
     members_count = serializers.SerializerMethodField()
+    cover_image_derivatives = ImageDerivativesField()
     
     class Meta:
         model = Chapter
         fields = '__all__'
     
     def get_members_count(self, obj):
+        # Views that list many chapters annotate the count instead of querying per row
+        if hasattr(obj, 'active_members_count'):
+            return obj.active_members_count
         return obj.memberships.filter(is_active=True).count()
 
+class ChapterListSerializer(ChapterSerializer):
+    """
+    Compact chapter card for listing pages
+    Leaves out the description and contact details shown on the chapter page
+    """
+    class Meta:
+        model = Chapter
+        fields = ['id', 'name', 'slug', 'city', 'state', 'country', 'latitude', 'longitude', 'cover_image', 
+                 'cover_image_derivatives', 'admin', 'admin_name', 'members_count', 'is_active', 'created_at', 'updated_at']
+
+class NearestChapterSerializer(ChapterListSerializer):
+    distance_km = serializers.SerializerMethodField()
+    
+    class Meta(ChapterListSerializer.Meta):
+        fields = ChapterListSerializer.Meta.fields + ['distance_km']
+    
+    def get_distance_km(self, obj):
+        return round(self.context['distances'][obj.pk], 1)
+
 class ChapterMembershipSerializer(serializers.ModelSerializer):
     chapter_name = serializers.CharField(source='chapter.name', read_only=True)
     artist_name = serializers.CharField(source='artist.display_name', read_only=True)
@@ -23,19 +49,39 @@ class ChapterMembershipSerializer(serializers.ModelSerializer):
 class ChapterEventSerializer(serializers.ModelSerializer):
     chapter_name = serializers.CharField(source='chapter.name', read_only=True)
     created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
-    registrations_count = serializers.SerializerMethodField()
+    registrations_count = serializers.IntegerField(source='participants_count', read_only=True)
+    spots_left = serializers.IntegerField(read_only=True)
     
     class Meta:
         model = ChapterEvent
         fields = '__all__'
+
+class ChapterEventCalendarSerializer(serializers.ModelSerializer):
+    """
+    Compact event entry for calendar views
+    """
+    chapter_slug = serializers.CharField(source='chapter.slug', read_only=True)
+    chapter_name = serializers.CharField(source='chapter.name', read_only=True)
     
-    def get_registrations_count(self, obj):
-        return obj.registrations.count()
+    class Meta:
+        model = ChapterEvent
+        fields = ['id', 'slug', 'title', 'event_type', 'start_date', 'end_date', 'location', 'chapter', 
+                 'chapter_slug', 'chapter_name']
 
 class EventRegistrationSerializer(serializers.ModelSerializer):
     event_title = serializers.CharField(source='event.title', read_only=True)
     user_name = serializers.CharField(source='user.get_full_name', read_only=True)
+    waitlist_position = serializers.SerializerMethodField()
     
     class Meta:
         model = EventRegistration
         fields = '__all__'
+        read_only_fields = ['user', 'status', 'attended']
+    
+    def get_waitlist_position(self, obj):
+        if obj.status != 'waitlisted':
+            return None
+        return EventRegistration.objects.filter(
+            Q(registered_at__lt=obj.registered_at) | Q(registered_at=obj.registered_at, pk__lt=obj.pk),
+            event_id=obj.event_id, status='waitlisted',
+        ).count() + 1
@@ -1,3 +1,349 @@
-from django.test import TestCase
+import datetime
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+from django.db import connections
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from artists.models import ArtistProfile
+from .models import Chapter, ChapterEvent, ChapterMembership, ChapterNotification, EventRegistration
+from .notifications import dispatch_pending, queue, queue_chapter_digests, queue_event_reminders, reminders_due
+from .registration import cancel, register
+
+User = get_user_model()
+
+
+def create_event(max_participants, **kwargs):
+    admin = User.objects.create_user(email='admin@example.com', username='admin', password='pw12345678')
+    chapter = Chapter.objects.create(
+        name='Pune Chapter', slug='pune', city='Pune', state='Maharashtra', description='Artists in Pune', admin=admin,
+    )
+    start = timezone.now() + datetime.timedelta(days=7)
+    return ChapterEvent.objects.create(
+        chapter=chapter, title='Ink Wash Workshop', slug='ink-wash', description='Bring brushes', event_type='workshop',
+        start_date=start, end_date=start + datetime.timedelta(hours=3), location='Studio 4',
+        max_participants=max_participants, created_by=admin, **kwargs,
+    )
+
+
+def create_users(count):
+    User.objects.bulk_create(
+        User(email=f'user{i}@example.com', username=f'user{i}', password='!') for i in range(count)
+    )
+    return list(User.objects.filter(username__startswith='user').order_by('pk'))
+
+
+class EventRegistrationTests(TestCase):
+    def setUp(self):
+        self.event = create_event(max_participants=2)
+        self.users = create_users(4)
+    
+    def test_registrations_past_capacity_are_waitlisted(self):
+        statuses = [register(self.event, user).status for user in self.users]
+        self.assertEqual(statuses, ['confirmed', 'confirmed', 'waitlisted', 'waitlisted'])
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.participants_count, 2)
+        self.assertEqual(self.event.spots_left, 0)
+    
+    def test_cancelling_promotes_the_oldest_waitlisted(self):
+        first, _, waiting, last = [register(self.event, user) for user in self.users]
+        with self.captureOnCommitCallbacks(execute=True):
+            cancel(first)
+        waiting.refresh_from_db()
+        last.refresh_from_db()
+        self.assertEqual((waiting.status, last.status), ('confirmed', 'waitlisted'))
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.participants_count, 2)
+    
+    def test_cancelling_a_waitlisted_registration_keeps_the_count(self):
+        registrations = [register(self.event, user) for user in self.users]
+        cancel(registrations[2])
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.participants_count, 2)
+        self.assertEqual(EventRegistration.objects.filter(status='waitlisted').count(), 1)
+    
+    def test_raising_capacity_promotes_from_the_waitlist(self):
+        for user in self.users:
+            register(self.event, user)
+        client = APIClient()
+        client.force_authenticate(self.event.created_by)
+        response = client.patch(f'/api/chapters/events/{self.event.slug}/', {'max_participants': 3}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(EventRegistration.objects.filter(status='confirmed').count(), 3)
+    
+    def test_event_edits_do_not_overwrite_the_counter(self):
+        stale = ChapterEvent.objects.get(pk=self.event.pk)
+        register(self.event, self.users[0])
+        stale.title = 'Ink Wash Masterclass'
+        stale.save()
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.participants_count, 1)
+    
+    def test_registration_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.users[0])
+        response = client.post('/api/chapters/registrations/', {'event': self.event.pk}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['status'], 'confirmed')
+        self.assertEqual(response.data['user'], self.users[0].pk)
+        response = client.post('/api/chapters/registrations/', {'event': self.event.pk}, format='json')
+        self.assertEqual(response.status_code, 400)
+        
+        registration = EventRegistration.objects.get(user=self.users[0])
+        response = client.delete(f'/api/chapters/registrations/{registration.pk}/')
+        self.assertEqual(response.status_code, 204)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.participants_count, 0)
+    
+    def test_waitlist_position(self):
+        for user in self.users:
+            register(self.event, user)
+        client = APIClient()
+        client.force_authenticate(self.users[3])
+        response = client.get('/api/chapters/registrations/')
+        self.assertEqual(response.data['results'][0]['waitlist_position'], 2)
+
+
+class NotificationTests(TestCase):
+    def setUp(self):
+        self.event = create_event(max_participants=None)
+        self.users = create_users(3)
+    
+    def test_reminders_are_queued_and_sent_once(self):
+        for user in self.users:
+            register(self.event, user)
+        now = self.event.start_date - datetime.timedelta(hours=2)
+        self.assertEqual(queue_event_reminders(now, batch_size=2), 3)
+        self.assertEqual(queue_event_reminders(now, batch_size=2), 0)
+        self.assertEqual(dispatch_pending(batch_size=2, now=now), (3, 0))
+        self.assertEqual(dispatch_pending(batch_size=2, now=now), (0, 0))
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(mail.outbox[0].subject, 'Reminder: Ink Wash Workshop')
+        self.assertFalse(ChapterNotification.objects.exclude(status='sent').exists())
+    
+    def test_later_registrations_are_reminded_on_the_next_run(self):
+        register(self.event, self.users[0])
+        now = self.event.start_date - datetime.timedelta(hours=3)
+        self.assertEqual(queue_event_reminders(now, batch_size=100), 1)
+        register(self.event, self.users[1])
+        register(self.event, self.users[2])
+        self.assertEqual(queue_event_reminders(now + datetime.timedelta(hours=1), batch_size=100), 2)
+        self.assertEqual(queue_event_reminders(now + datetime.timedelta(hours=2), batch_size=100), 0)
+        self.assertEqual(dispatch_pending(batch_size=100, now=now), (3, 0))
+        # Nothing is queued once the event has started
+        register(self.event, User.objects.create_user(email='late@example.com', username='late', password='pw12345678'))
+        self.assertEqual(queue_event_reminders(self.event.start_date, batch_size=100), 0)
+    
+    def test_rescheduled_events_are_reminded_again(self):
+        register(self.event, self.users[0])
+        now = self.event.start_date - datetime.timedelta(hours=2)
+        self.assertEqual(queue_event_reminders(now, batch_size=100), 1)
+        event = ChapterEvent.objects.get(pk=self.event.pk)
+        event.title = 'Ink Wash Workshop II'
+        event.save()
+        event.refresh_from_db()
+        self.assertEqual(event.reminders_queued_at, now)
+    
+        event.start_date += datetime.timedelta(days=7)
+        event.end_date += datetime.timedelta(days=7)
+        event.save()
+        event.refresh_from_db()
+        self.assertIsNone(event.reminders_queued_at)
+        later = event.start_date - datetime.timedelta(hours=2)
+        self.assertEqual(queue_event_reminders(later, batch_size=100), 1)
+        self.assertEqual(queue_event_reminders(later, batch_size=100), 0)
+    
+    def test_queue_counts_only_new_rows(self):
+        def reminders(users):
+            return (
+                ChapterNotification(kind='reminder', user=user, chapter=self.event.chapter, event=self.event, key=f'reminder:{self.event.pk}:{user.pk}')
+                for user in users
+            )
+        self.assertEqual(queue(reminders(self.users[:2]), batch_size=2), 2)
+        self.assertEqual(queue(reminders(self.users), batch_size=2), 1)
+        self.assertEqual(ChapterNotification.objects.count(), 3)
+    
+    def test_reminders_wait_for_the_lead_time(self):
+        register(self.event, self.users[0])
+        self.assertEqual(queue_event_reminders(self.event.start_date - datetime.timedelta(days=3), 100), 0)
+    
+    def test_due_events_are_read_from_the_start_date_index(self):
+        plan = reminders_due(timezone.now()).explain()
+        self.assertIn('USING INDEX event_reminder_due_idx', plan)
+        self.assertNotIn('SCAN', plan)
+    
+    def test_weekly_digest_goes_to_members_once_a_week(self):
+        for user in self.users:
+            artist = ArtistProfile.objects.create(user=user, display_name=user.username)
+            ChapterMembership.objects.create(chapter=self.event.chapter, artist=artist)
+        now = self.event.start_date - datetime.timedelta(days=2)
+        self.assertEqual(queue_chapter_digests(now, batch_size=100), 3)
+        self.assertEqual(queue_chapter_digests(now + datetime.timedelta(hours=1), batch_size=100), 0)
+        dispatch_pending(batch_size=100, now=now)
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), sorted(user.email for user in self.users))
+        self.assertIn('Ink Wash Workshop', mail.outbox[0].body)
+
+class EventCalendarTests(TestCase):
+    def setUp(self):
+        self.event = create_event(max_participants=None)
+        self.private = ChapterEvent.objects.create(
+            chapter=self.event.chapter, title='Committee Meeting', slug='committee', description='Members only',
+            event_type='meetup', start_date=self.event.start_date, end_date=self.event.end_date,
+            location='Studio 4', created_by=self.event.created_by, is_public=False,
+        )
+        self.api = APIClient()
+    
+    def calendar(self, **params):
+        return self.api.get('/api/chapters/events/calendar/', params)
+    
+    def test_window_returns_overlapping_public_events(self):
+        day = timezone.localdate(self.event.start_date)
+        response = self.calendar(start=day.isoformat(), end=(day + datetime.timedelta(days=1)).isoformat())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['slug'] for row in response.json()['results']], ['ink-wash'])
+        # A window ending before the event starts misses it
+        response = self.calendar(start='2020-01-01', end='2020-01-31')
+        self.assertEqual(response.json()['results'], [])
+    
+    def test_invalid_windows_are_rejected(self):
+        for params in (
+            {'start': '2024-02-30', 'end': '2024-03-05'},
+            {'start': '2024-03-01T25:00:00', 'end': '2024-03-05'},
+            {'start': 'soon', 'end': '2024-03-05'},
+            {'start': '2024-03-05', 'end': '2024-03-01'},
+            {'start': '2020-01-01', 'end': '2024-01-01'},
+        ):
+            self.assertEqual(self.calendar(**params).status_code, 400, params)
+    
+    def test_ical_feed(self):
+        url = '/api/chapters/chapters/pune/calendar.ics'
+        response = self.api.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        body = b''.join(response.streaming_content).decode()
+        self.assertIn('SUMMARY:Ink Wash Workshop', body)
+        self.assertNotIn('Committee Meeting', body)
+        self.assertEqual(self.api.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        # Editing an event changes the feed
+        self.event.title = 'Ink Wash Masterclass'
+        self.event.save()
+        self.assertEqual(self.api.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+        self.assertEqual(self.api.get('/api/chapters/chapters/nowhere/calendar.ics').status_code, 404)
+
+
+class GeocodingTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(email='admin@example.com', username='admin', password='pw12345678')
+        self.chapters = {
+            city: Chapter.objects.create(
+                name=f'{city} Chapter', slug=city.lower(), city=city, state='Maharashtra', description='Artists', admin=self.admin,
+            )
+            for city in ('Mumbai', 'Pune', 'Nashik')
+        }
+    
+    def test_chapter_coordinates_follow_the_city(self):
+        chapter = self.chapters['Pune']
+        self.assertEqual((chapter.latitude, chapter.longitude), (18.5204, 73.8567))
+        chapter.city = 'Atlantis'
+        chapter.save()
+        chapter.refresh_from_db()
+        self.assertEqual((chapter.latitude, chapter.longitude), (None, None))
+        chapter.city = 'Nashik'
+        chapter.save(update_fields=['city'])
+        chapter.refresh_from_db()
+        self.assertEqual((chapter.latitude, chapter.longitude), (19.9975, 73.7898))
+    
+    def test_user_coordinates_follow_the_location(self):
+        user = User.objects.create_user(email='u@example.com', username='u', password='pw12345678', location='Kothrud, Pune')
+        self.assertEqual((user.latitude, user.longitude), (18.5204, 73.8567))
+        user.location = 'Atlantis'
+        user.save(update_fields=['location'])
+        user.refresh_from_db()
+        self.assertEqual((user.latitude, user.longitude), (None, None))
+    
+    def test_geocode_locations_command_clears_stale_points(self):
+        Chapter.objects.filter(slug='pune').update(city='Atlantis')
+        Chapter.objects.filter(slug='nashik').update(latitude=None, longitude=None)
+        call_command('geocode_locations', stdout=StringIO())
+        points = dict(Chapter.objects.values_list('slug', 'latitude'))
+        self.assertEqual(points, {'mumbai': 19.0760, 'pune': None, 'nashik': 19.9975})
+    
+    def test_nearest_chapters(self):
+        api = APIClient()
+        response = api.get('/api/chapters/chapters/nearest/', {'location': 'Pune', 'k': 2})
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([chapter['slug'] for chapter in results], ['pune', 'mumbai'])
+        self.assertLess(results[0]['distance_km'], results[1]['distance_km'])
+    
+        # A chapter moved somewhere the gazetteer doesn't know drops out instead of keeping its old point
+        self.chapters['Pune'].city = 'Atlantis'
+        self.chapters['Pune'].save()
+        response = api.get('/api/chapters/chapters/nearest/', {'lat': 18.5204, 'lon': 73.8567, 'k': 5})
+        self.assertEqual([chapter['slug'] for chapter in response.json()['results']], ['mumbai', 'nashik'])
+    
+        for params in ({'location': 'Atlantis'}, {'lat': 'north', 'lon': 73}, {'lat': 91, 'lon': 73}, {'location': 'Pune', 'k': 'few'}, {}):
+            self.assertEqual(api.get('/api/chapters/chapters/nearest/', params).status_code, 400, params)
+
+
+class ConcurrentRegistrationTests(TransactionTestCase):
+    """
+    Registers thousands of users at once from a thread pool, each thread on its own connection
+    In-memory SQLite fails concurrent writers instead of making them wait, so this class swaps the
+    default database for an on-disk one whose writers queue on the lock like separate processes
+    """
+    capacity = 50
+    registrations = 2000
+    
+    @classmethod
+    def setUpClass(cls):
+        directory = cls.enterClassContext(tempfile.TemporaryDirectory())
+        settings_dict = connections.settings['default']
+        cls.saved_settings = {key: settings_dict[key] for key in ('NAME', 'OPTIONS')}
+        cls.saved_connection = connections['default']
+        # Threads open their connections from this dict; IMMEDIATE takes the write lock at BEGIN so a
+        # read that upgrades to a write waits on the timeout instead of failing with "database is locked"
+        settings_dict.update(
+            NAME=os.path.join(directory, 'registrations.sqlite3'),
+            OPTIONS={**settings_dict['OPTIONS'], 'transaction_mode': 'IMMEDIATE', 'timeout': 20},
+        )
+        connections['default'] = connections.create_connection('default')
+        call_command('migrate', verbosity=0, interactive=False, run_syncdb=True)
+        super().setUpClass()
+    
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections['default'].close()
+        connections.settings['default'].update(cls.saved_settings)
+        connections['default'] = cls.saved_connection
+    
+    def test_burst_never_overbooks(self):
+        event = create_event(max_participants=self.capacity)
+        users = create_users(self.registrations)
+        start = threading.Barrier(16)
+        
+        def register_all(batch):
+            start.wait()
+            try:
+                return [register(event, user).status for user in batch]
+            finally:
+                connections.close_all()
+        
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            statuses = [status for batch in executor.map(register_all, [users[i::16] for i in range(16)])
+                        for status in batch]
+        
+        self.assertEqual(statuses.count('confirmed'), self.capacity)
+        self.assertEqual(statuses.count('waitlisted'), self.registrations - self.capacity)
+        event.refresh_from_db()
+        self.assertEqual(event.participants_count, self.capacity)
+        self.assertEqual(EventRegistration.objects.filter(event=event, status='confirmed').count(), self.capacity)
@@ -6,7 +6,9 @@ router = DefaultRouter()
 router.register(r'chapters', views.ChapterViewSet)
 router.register(r'events', views.ChapterEventViewSet)
 router.register(r'memberships', views.ChapterMembershipViewSet)
+router.register(r'registrations', views.EventRegistrationViewSet, basename='eventregistration')
 
 urlpatterns = [
+    path('chapters/<slug:slug>/calendar.ics', views.chapter_calendar_feed, name='chapter-calendar-feed'),
     path('', include(router.urls)),
 ]
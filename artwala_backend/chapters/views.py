@@ -1,21 +1,188 @@
-from rest_framework import viewsets
+import datetime
+import hashlib
+
+from django.conf import settings
+from django.db.models import Count, Max, Q
+from django.http import HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+from rest_framework import mixins, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
-from .models import Chapter, ChapterEvent, ChapterMembership
-from .serializers import ChapterSerializer, ChapterEventSerializer, ChapterMembershipSerializer
+from rest_framework.response import Response
+from artwala_backend.conditional import ConditionalGetMixin
+from artwala_backend.fieldsets import SparseFieldsetMixin
+from artwala_backend.geo import geocode_text, nearest
+from .ical import iter_calendar
+from .models import Chapter, ChapterEvent, ChapterMembership, EventRegistration
+from .registration import cancel, promote_waitlist, register
+from .serializers import (
+    ChapterSerializer, ChapterListSerializer, ChapterEventSerializer, ChapterMembershipSerializer, NearestChapterSerializer,
+    ChapterEventCalendarSerializer, EventRegistrationSerializer,
+)
 
-class ChapterViewSet(viewsets.ModelViewSet):
+class ChapterViewSet(ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = Chapter.objects.all()
     serializer_class = ChapterSerializer
+    list_serializer_class = ChapterListSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     lookup_field = 'slug'
+    etag_dependencies = ('admin', 'memberships')
+    
+    @action(detail=False)
+    def nearest(self, request):
+        """
+        The k nearest active chapters to ?lat=&lon=, a ?location= place name, or the user's own location
+        """
+        latitude, longitude = self.get_origin(request)
+        try:
+            k = min(max(int(request.query_params.get('k', 5)), 1), 50)
+        except ValueError:
+            raise ValidationError({'k': ['A valid integer is required.']})
+        
+        # Search on coordinates alone, then load the k winners with their member counts in one query
+        found = nearest(Chapter.objects.filter(is_active=True).only('pk', 'latitude', 'longitude'), latitude, longitude, k)
+        distances = {chapter.pk: distance for distance, chapter in found}
+        chapters = Chapter.objects.filter(pk__in=distances).select_related('admin').annotate(
+            active_members_count=Count('memberships', filter=Q(memberships__is_active=True))
+        )
+        chapters = sorted(chapters, key=lambda chapter: distances[chapter.pk])
+        serializer = NearestChapterSerializer(
+            chapters, many=True, context={**self.get_serializer_context(), 'distances': distances}
+        )
+        return Response({
+            'origin': {'latitude': latitude, 'longitude': longitude},
+            'results': serializer.data,
+        })
+    
+    def get_origin(self, request):
+        params = request.query_params
+        if 'lat' in params or 'lon' in params:
+            try:
+                latitude, longitude = float(params['lat']), float(params['lon'])
+            except (KeyError, ValueError):
+                raise ValidationError({'detail': 'lat and lon must both be numbers.'})
+            if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+                raise ValidationError({'detail': 'lat or lon is out of range.'})
+            return latitude, longitude
+        if params.get('location'):
+            point = geocode_text(params['location'])
+            if point is None:
+                raise ValidationError({'location': ['Unknown place.']})
+            return point
+        if request.user.is_authenticated and request.user.latitude is not None:
+            return request.user.latitude, request.user.longitude
+        raise ValidationError({'detail': 'Pass lat and lon or a location, or set a location on your profile.'})
 
-class ChapterEventViewSet(viewsets.ModelViewSet):
-    queryset = ChapterEvent.objects.all()
+class ChapterEventViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+    queryset = ChapterEvent.objects.select_related('chapter', 'created_by').order_by('start_date', 'pk')
     serializer_class = ChapterEventSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     lookup_field = 'slug'
+    etag_dependencies = ('chapter', 'created_by')
+    
+    def perform_update(self, serializer):
+        event = serializer.save()
+        # A raised capacity is filled from the waitlist straight away
+        promote_waitlist(event.pk)
+    
+    @action(detail=False)
+    def calendar(self, request):
+        """
+        Public events overlapping ?start= to ?end= (at most CALENDAR_MAX_DAYS apart), optionally for one ?chapter=
+        """
+        start, end = parse_window(request.query_params)
+        events = ChapterEvent.objects.filter(is_public=True, end_date__gt=start, start_date__lt=end)
+        if request.query_params.get('chapter'):
+            events = events.filter(chapter__slug=request.query_params['chapter'])
+        events = events.select_related('chapter').order_by('start_date', 'pk')
+        serializer = ChapterEventCalendarSerializer(events, many=True, context=self.get_serializer_context())
+        return Response({'start': start, 'end': end, 'results': serializer.data})
+
+def parse_window(params):
+    window = {}
+    for name in ('start', 'end'):
+        value = params.get(name, '')
+        try:
+            parsed = parse_datetime(value)
+            if parsed is None:
+                date = parse_date(value)
+                parsed = date and datetime.datetime.combine(date, datetime.time.min)
+        except ValueError:
+            # Well formed but impossible, e.g. 2024-02-30
+            parsed = None
+        if parsed is None:
+            raise ValidationError({name: ['Enter an ISO 8601 date or datetime.']})
+        window[name] = timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+    if window['end'] <= window['start']:
+        raise ValidationError({'end': ['End must be after start.']})
+    if window['end'] - window['start'] > datetime.timedelta(days=settings.CALENDAR_MAX_DAYS):
+        raise ValidationError({'end': [f'The window can span at most {settings.CALENDAR_MAX_DAYS} days.']})
+    return window['start'], window['end']
+
+@require_safe
+def chapter_calendar_feed(request, slug):
+    """
+    Streams a chapter's public events as an iCalendar feed
+    The ETag comes from one indexed aggregate, so polling clients mostly get a bodiless 304
+    """
+    chapter = get_object_or_404(Chapter.objects.only('pk', 'name', 'updated_at'), slug=slug)
+    since = timezone.now() - datetime.timedelta(days=settings.CALENDAR_FEED_PAST_DAYS)
+    events = ChapterEvent.objects.filter(chapter=chapter, is_public=True, end_date__gte=since)
+    
+    state = events.order_by().aggregate(count=Count('pk'), last_modified=Max('updated_at'))
+    key = ':'.join(str(part) for part in (
+        chapter.pk, chapter.name, state['count'], state['last_modified'] and state['last_modified'].isoformat(),
+    ))
+    etag = '"%s"' % hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()
+    last_modified = max(filter(None, (chapter.updated_at, state['last_modified'])))
+    
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(last_modified.timestamp()),
+        'Cache-Control': f'public, max-age={settings.CALENDAR_FEED_MAX_AGE}',
+    }
+    response = HttpResponse(headers=headers)
+    not_modified = get_conditional_response(
+        request, etag=etag, last_modified=int(last_modified.timestamp()), response=response,
+    )
+    if not_modified is not response:
+        return not_modified
+    
+    rows = events.only(
+        'pk', 'title', 'description', 'event_type', 'start_date', 'end_date', 'location', 'updated_at',
+    ).order_by('start_date', 'pk').iterator(chunk_size=200)
+    return StreamingHttpResponse(
+        iter_calendar(chapter.name, rows, request.get_host().split(':')[0]),
+        content_type='text/calendar; charset=utf-8',
+        headers={**headers, 'Content-Disposition': f'inline; filename="{slug}.ics"'},
+    )
 
 class ChapterMembershipViewSet(viewsets.ModelViewSet):
     queryset = ChapterMembership.objects.all()
     serializer_class = ChapterMembershipSerializer
     permission_classes = [IsAuthenticated]
+
+class EventRegistrationViewSet(mixins.CreateModelMixin, mixins.ListModelMixin, mixins.RetrieveModelMixin,
+                               mixins.DestroyModelMixin, viewsets.GenericViewSet):
+    """
+    The signed-in user's event registrations; deleting one cancels it and frees the place
+    """
+    serializer_class = EventRegistrationSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        return EventRegistration.objects.filter(user=self.request.user).select_related(
+            'event', 'user'
+        ).order_by('-registered_at', '-pk')
+    
+    def perform_create(self, serializer):
+        serializer.instance = register(serializer.validated_data['event'], self.request.user)
+    
+    def perform_destroy(self, instance):
+        cancel(instance)
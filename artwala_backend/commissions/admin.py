@@ -1,3 +1,58 @@
 from django.contrib import admin
+from .models import CommissionRequest, CommissionMilestone, CommissionPayment, ReconciliationRun, PaymentMismatch
+from .workflow import bulk_transition_requests
 
-# Register your models here.
+@admin.register(CommissionRequest)
+class CommissionRequestAdmin(admin.ModelAdmin):
+    list_display = ('title', 'client', 'artist', 'commission_type', 'status', 'created_at', 'updated_at')
+    list_filter = ('status', 'commission_type', 'created_at')
+    search_fields = ('title', 'client__email', 'artist__display_name')
+    raw_id_fields = ('client', 'artist')
+    # Status moves through the workflow actions, which also record the change in the outbox
+    readonly_fields = ('status', 'created_at', 'updated_at')
+    actions = ['cancel', 'reject']
+    
+    @admin.action(description='Cancel selected commissions')
+    def cancel(self, request, queryset):
+        changed = bulk_transition_requests(queryset, 'cancel')
+        self.message_user(request, f'{changed} commissions cancelled.')
+    
+    @admin.action(description='Reject selected commissions')
+    def reject(self, request, queryset):
+        changed = bulk_transition_requests(queryset, 'reject')
+        self.message_user(request, f'{changed} commissions rejected.')
+
+@admin.register(CommissionMilestone)
+class CommissionMilestoneAdmin(admin.ModelAdmin):
+    list_display = ('title', 'commission_request', 'order', 'status', 'due_date', 'overdue_at')
+    list_filter = ('status',)
+    raw_id_fields = ('commission_request',)
+    readonly_fields = ('status', 'completed_at', 'approved_at', 'overdue_at', 'created_at', 'updated_at')
+
+@admin.register(CommissionPayment)
+class CommissionPaymentAdmin(admin.ModelAdmin):
+    list_display = ('commission_request', 'milestone', 'amount', 'payment_method', 'status', 'paid_at', 'created_at')
+    list_filter = ('status', 'payment_method')
+    search_fields = ('transaction_id', 'commission_request__title')
+    raw_id_fields = ('commission_request', 'milestone')
+    # The ledger is append-only: amounts are never edited and payments never deleted
+    readonly_fields = ('commission_request', 'milestone', 'amount', 'created_at')
+    
+    def get_readonly_fields(self, request, obj=None):
+        return self.readonly_fields if obj is not None else ('created_at',)
+    
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+class PaymentMismatchInline(admin.TabularInline):
+    model = PaymentMismatch
+    fields = ('commission_request', 'milestone', 'kind', 'expected', 'actual')
+    readonly_fields = fields
+    can_delete = False
+    extra = 0
+
+@admin.register(ReconciliationRun)
+class ReconciliationRunAdmin(admin.ModelAdmin):
+    list_display = ('started_at', 'finished_at', 'contracts_checked', 'contract_value', 'paid', 'mismatches_found')
+    readonly_fields = ('started_at', 'finished_at', 'contracts_checked', 'contract_value', 'paid', 'mismatches_found')
+    inlines = [PaymentMismatchInline]
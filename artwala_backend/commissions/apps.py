@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class CommissionsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "commissions"
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+
+        from .inbox import commission_changed
+
+        # Keep the cached inbox counts of both parties in step with their requests
+        post_save.connect(commission_changed, sender=self.get_model("CommissionRequest"), dispatch_uid="commission-inbox-saved")
+        post_delete.connect(commission_changed, sender=self.get_model("CommissionRequest"), dispatch_uid="commission-inbox-deleted")
@@ -0,0 +1,94 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+
+from artists.models import ArtistProfile
+
+from .models import CommissionMilestone, CommissionRequest
+
+ROLES = ('client', 'artist')
+# Requests waiting on the artist to respond; 'submitted' ones haven't been opened yet
+ARTIST_PENDING = ('submitted', 'under_review')
+# Finished work waiting on the client to confirm delivery
+CLIENT_PENDING = ('completed',)
+
+
+def participant_filter(user, role=None, prefix=''):
+    """
+    Q for commission rows `user` takes part in; `prefix` reaches a request from a related model
+    Filtering on one role lets the (client|artist, status, created_at) index do all the work
+    """
+    client = Q(**{f'{prefix}client': user})
+    artist = Q(**{f'{prefix}artist__user': user})
+    if role == 'client':
+        return client
+    if role == 'artist':
+        return artist
+    return client | artist
+
+
+def inbox(user, role=None, statuses=None):
+    """
+    Commission requests `user` sent (role='client'), received (role='artist') or either
+    Staff see every request unless they ask for one of their roles
+    """
+    queryset = CommissionRequest.objects.all()
+    if role or not user.is_staff:
+        queryset = queryset.filter(participant_filter(user, role))
+    if statuses:
+        queryset = queryset.filter(status__in=statuses)
+    return queryset
+
+
+def get_summary_cache_key(user_id):
+    return f'commission-inbox:{user_id}'
+
+
+def get_summary(user):
+    """
+    Per-status counts of the user's sent and received requests, plus what awaits them
+
+    `unread` counts received requests nobody has opened (still submitted); `pending` counts
+    everything waiting on this user: requests to answer, milestones to approve, deliveries to confirm
+    """
+    cache_key = get_summary_cache_key(user.pk)
+    summary = cache.get(cache_key)
+    if summary is None:
+        summary = {}
+        for role in ROLES:
+            rows = (
+                CommissionRequest.objects.filter(participant_filter(user, role))
+                .order_by().values('status').annotate(count=Count('pk'))
+            )
+            summary[role] = {row['status']: row['count'] for row in rows}
+        milestones_to_approve = CommissionMilestone.objects.filter(
+            commission_request__client=user, status='completed',
+        ).count()
+        summary['unread'] = summary['artist'].get('submitted', 0)
+        summary['pending'] = milestones_to_approve + sum(
+            summary['artist'].get(status, 0) for status in ARTIST_PENDING
+        ) + sum(summary['client'].get(status, 0) for status in CLIENT_PENDING)
+        cache.set(cache_key, summary, settings.COMMISSION_INBOX_CACHE_TIMEOUT)
+    return summary
+
+
+def invalidate_summaries(commissions):
+    """
+    Drops the cached summaries of both parties to each commission (instances or values with
+    client_id/artist_id); call after changing their status outside save()
+    """
+    commissions = list(commissions)
+    artist_users = dict(
+        ArtistProfile.objects.filter(pk__in={commission.artist_id for commission in commissions})
+        .values_list('pk', 'user_id')
+    )
+    user_ids = {commission.client_id for commission in commissions}
+    user_ids.update(artist_users[commission.artist_id] for commission in commissions if commission.artist_id in artist_users)
+    keys = [get_summary_cache_key(user_id) for user_id in user_ids]
+    # After commit, so a concurrent read can't cache the counts from before the change
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def commission_changed(sender, instance, **kwargs):
+    invalidate_summaries([instance])
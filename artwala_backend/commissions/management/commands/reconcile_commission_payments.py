@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from commissions.reconciliation import reconcile
+
+
+class Command(BaseCommand):
+    help = 'Check payments on every open commission contract and record mismatches for the finance report (run from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.COMMISSION_RECONCILIATION_BATCH_SIZE,
+            help='Rows streamed per fetch and mismatches inserted per query',
+        )
+
+    def handle(self, *args, **options):
+        run = reconcile(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Checked {run.contracts_checked} contracts, found {run.mismatches_found} mismatches'
+        ))
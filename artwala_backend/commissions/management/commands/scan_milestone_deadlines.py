@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from commissions.sla import mark_overdue
+
+
+class Command(BaseCommand):
+    help = 'Flag milestones past their due date, count them against the artist and queue notices (run from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.MILESTONE_SCAN_BATCH_SIZE,
+            help='Milestones flagged per transaction',
+        )
+
+    def handle(self, *args, **options):
+        flagged = mark_overdue(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Flagged {flagged} overdue milestones'))
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-19 12:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("commissions", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="commissionrequest",
+            index=models.Index(
+                fields=["status", "updated_at"], name="commission_stale_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.4 on 2026-10-19 12:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("commissions", "0003_commission_workflow"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="commissionrequest",
+            index=models.Index(
+                fields=["artist", "status", "created_at"],
+                name="commission_artist_inbox_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="commissionrequest",
+            index=models.Index(
+                fields=["client", "status", "created_at"],
+                name="commission_client_inbox_idx",
+            ),
+        ),
+    ]
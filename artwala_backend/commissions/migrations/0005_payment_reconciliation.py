@@ -0,0 +1,137 @@
+# Generated by Django 5.2.4 on 2026-10-19 12:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("commissions", "0004_commission_inbox"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReconciliationRun",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("started_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "finished_at",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="Unset while the run is in progress or if it crashed",
+                        null=True,
+                    ),
+                ),
+                ("contracts_checked", models.PositiveIntegerField(default=0)),
+                (
+                    "contract_value",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        help_text="Sum of final prices",
+                        max_digits=14,
+                    ),
+                ),
+                (
+                    "paid",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        help_text="Sum of completed payments",
+                        max_digits=14,
+                    ),
+                ),
+                ("mismatches_found", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "db_table": "commission_reconciliation_runs",
+                "ordering": ["-started_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="PaymentMismatch",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            (
+                                "milestone_split",
+                                "Milestone payment percentages do not total 100",
+                            ),
+                            (
+                                "milestone_amount",
+                                "Payments for a milestone differ from its share of the price",
+                            ),
+                            ("overpaid", "Payments exceed the contract price"),
+                            ("underpaid", "Completed commission not fully paid"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "expected",
+                    models.DecimalField(
+                        decimal_places=2,
+                        help_text="Amount (or percentage total, for milestone_split) the contract calls for",
+                        max_digits=12,
+                    ),
+                ),
+                ("actual", models.DecimalField(decimal_places=2, max_digits=12)),
+                (
+                    "commission_request",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="payment_mismatches",
+                        to="commissions.commissionrequest",
+                    ),
+                ),
+                (
+                    "milestone",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="commissions.commissionmilestone",
+                    ),
+                ),
+                (
+                    "run",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="mismatches",
+                        to="commissions.reconciliationrun",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "commission_payment_mismatches",
+                "ordering": ["commission_request_id", "kind"],
+                "indexes": [
+                    models.Index(
+                        fields=["run", "kind", "commission_request"],
+                        name="payment_mismatch_report_idx",
+                    )
+                ],
+            },
+        ),
+    ]
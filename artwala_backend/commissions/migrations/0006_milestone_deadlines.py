@@ -0,0 +1,32 @@
+# Generated by Django 5.2.4 on 2026-10-19 12:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("commissions", "0005_payment_reconciliation"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="commissionmilestone",
+            name="overdue_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="When the deadline scanner found this milestone past its due date",
+                null=True,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="commissionmilestone",
+            index=models.Index(
+                condition=models.Q(
+                    ("completed_at__isnull", True), ("overdue_at__isnull", True)
+                ),
+                fields=["due_date"],
+                name="milestone_deadline_scan_idx",
+            ),
+        ),
+    ]
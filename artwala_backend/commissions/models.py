@@ -1,12 +1,16 @@
 from django.db import models
 from django.conf import settings
 from artists.models import ArtistProfile
+from outbox.events import StatusEventsMixin
 
-class CommissionRequest(models.Model):
+class CommissionRequest(StatusEventsMixin, models.Model):
     """
     Custom artwork requests from clients to artists
     Initiates the commission workflow and contains all project requirements
     """
+    outbox_topic = 'commission_request'
+    outbox_snapshot_fields = ('client_id', 'artist_id', 'title')
+    
     # Request lifecycle status tracking
     STATUS_CHOICES = [
         ('submitted', 'Submitted'),         # Client has posted the request
@@ -113,6 +117,13 @@ class CommissionRequest(models.Model):
     class Meta:
         db_table = 'commission_requests'
         ordering = ['-created_at']
+        indexes = [
+            # Stale-commission sweeps: requests stuck in a status since before a cutoff
+            models.Index(fields=['status', 'updated_at'], name='commission_stale_idx'),
+            # Inboxes: one party's requests, optionally in one status, newest first
+            models.Index(fields=['artist', 'status', 'created_at'], name='commission_artist_inbox_idx'),
+            models.Index(fields=['client', 'status', 'created_at'], name='commission_client_inbox_idx'),
+        ]
 
 class CommissionProposal(models.Model):
     """
@@ -166,6 +177,12 @@ class CommissionProposal(models.Model):
         auto_now=True,
         help_text="Last time proposal was modified"
     )
+    
+    def __str__(self):
+        return f"Proposal for {self.commission_request.title}"
+    
+    class Meta:
+        db_table = 'commission_proposals'
 
 class CommissionContract(models.Model):
     """
@@ -228,11 +245,14 @@ class CommissionContract(models.Model):
     class Meta:
         db_table = 'commission_contracts'
 
-class CommissionMilestone(models.Model):
+class CommissionMilestone(StatusEventsMixin, models.Model):
     """
     Project progress tracking milestones for commissions
     Breaks down commission work into manageable stages with deliverables
     """
+    outbox_topic = 'commission_milestone'
+    outbox_snapshot_fields = ('commission_request_id', 'order', 'title')
+    
     # Milestone status options
     STATUS_CHOICES = [
         ('pending', 'Pending'),         # Not yet started
@@ -284,17 +304,35 @@ class CommissionMilestone(models.Model):
     due_date = models.DateField(blank=True, null=True)
     completed_at = models.DateTimeField(blank=True, null=True)
     approved_at = models.DateTimeField(blank=True, null=True)
+    overdue_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        help_text="When the deadline scanner found this milestone past its due date"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'commission_milestones'
         ordering = ['order']
+        indexes = [
+            # Deadline scanner: only milestones neither delivered nor flagged yet are indexed, so the
+            # scan stays small however much milestone history builds up. (IS NULL conditions only:
+            # SQLite can't match an index condition with literals against a query's bound parameters.)
+            models.Index(
+                fields=['due_date'],
+                name='milestone_deadline_scan_idx',
+                condition=models.Q(completed_at__isnull=True, overdue_at__isnull=True),
+            ),
+        ]
 
-class CommissionPayment(models.Model):
+class CommissionPayment(StatusEventsMixin, models.Model):
     """
     Commission payments
     """
+    outbox_topic = 'commission_payment'
+    outbox_snapshot_fields = ('commission_request_id', 'milestone_id', 'amount')
+    
     PAYMENT_STATUS_CHOICES = [
         ('pending', 'Pending'),
         ('processing', 'Processing'),
@@ -328,3 +366,75 @@ class CommissionReview(models.Model):
     
     class Meta:
         db_table = 'commission_reviews'
+
+class ReconciliationRun(models.Model):
+    """
+    One pass of the payment reconciliation job over every open contract
+    Keeps the totals finance reports on and owns the mismatches found
+    """
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        help_text="Unset while the run is in progress or if it crashed"
+    )
+    
+    # Totals over the open contracts checked
+    contracts_checked = models.PositiveIntegerField(default=0)
+    contract_value = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        help_text="Sum of final prices"
+    )
+    paid = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        help_text="Sum of completed payments"
+    )
+    mismatches_found = models.PositiveIntegerField(default=0)
+    
+    def __str__(self):
+        return f"Reconciliation {self.started_at:%Y-%m-%d %H:%M}"
+    
+    @property
+    def outstanding(self):
+        return self.contract_value - self.paid
+    
+    class Meta:
+        db_table = 'commission_reconciliation_runs'
+        ordering = ['-started_at']
+
+class PaymentMismatch(models.Model):
+    """
+    A contract whose payments don't add up, as found by one reconciliation run
+    """
+    KIND_CHOICES = [
+        ('milestone_split', 'Milestone payment percentages do not total 100'),
+        ('milestone_amount', 'Payments for a milestone differ from its share of the price'),
+        ('overpaid', 'Payments exceed the contract price'),
+        ('underpaid', 'Completed commission not fully paid'),
+    ]
+    
+    run = models.ForeignKey(ReconciliationRun, on_delete=models.CASCADE, related_name='mismatches')
+    commission_request = models.ForeignKey(CommissionRequest, on_delete=models.CASCADE, related_name='payment_mismatches')
+    milestone = models.ForeignKey(CommissionMilestone, on_delete=models.CASCADE, blank=True, null=True)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    expected = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        help_text="Amount (or percentage total, for milestone_split) the contract calls for"
+    )
+    actual = models.DecimalField(max_digits=12, decimal_places=2)
+    
+    def __str__(self):
+        return f"{self.get_kind_display()} on commission {self.commission_request_id}"
+    
+    class Meta:
+        db_table = 'commission_payment_mismatches'
+        ordering = ['commission_request_id', 'kind']
+        indexes = [
+            # Report pages: one run's mismatches, optionally of one kind
+            models.Index(fields=['run', 'kind', 'commission_request'], name='payment_mismatch_report_idx'),
+        ]
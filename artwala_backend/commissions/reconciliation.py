@@ -0,0 +1,153 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import Count, DecimalField, F, OuterRef, PositiveIntegerField, Q, Subquery, Sum, Value
+from django.db.models.functions import Abs, Coalesce
+from django.utils import timezone
+
+from .models import CommissionContract, CommissionMilestone, CommissionPayment, PaymentMismatch, ReconciliationRun
+
+# Commissions whose money is still moving; rejected, cancelled and delivered ones are settled
+OPEN_STATUSES = ('accepted', 'in_progress', 'completed')
+
+MONEY = DecimalField(max_digits=14, decimal_places=2)
+CENT = Decimal('0.01')
+
+
+def subquery_sum(queryset, group_by, field, output_field=MONEY, default=Decimal('0.00')):
+    """
+    Correlated SUM(field) over `queryset` (filtered on an OuterRef), `default` when it has no rows
+    """
+    total = Subquery(
+        queryset.order_by().values(group_by).annotate(total=Sum(field)).values('total'),
+        output_field=output_field,
+    )
+    return total if default is None else Coalesce(total, Value(default, output_field=output_field))
+
+
+def paid_towards(**filters):
+    return CommissionPayment.objects.filter(status='completed', **filters)
+
+
+def open_contracts():
+    """
+    Contracts of open commissions, with their milestones' payment percentage total (null without
+    milestones) and the completed payments made against them
+    """
+    return CommissionContract.objects.filter(commission_request__status__in=OPEN_STATUSES).annotate(
+        milestone_share=subquery_sum(
+            CommissionMilestone.objects.filter(commission_request=OuterRef('commission_request')),
+            'commission_request', 'payment_percentage', PositiveIntegerField(), default=None,
+        ),
+        paid=subquery_sum(paid_towards(commission_request=OuterRef('commission_request')), 'commission_request', 'amount'),
+    )
+
+
+def contract_mismatches():
+    """
+    One row per open contract that fails a contract-level check; the database does the sums
+    """
+    return open_contracts().filter(
+        (Q(milestone_share__isnull=False) & ~Q(milestone_share=100))
+        | Q(paid__gt=F('final_price'))
+        | Q(commission_request__status='completed', paid__lt=F('final_price'))
+    ).values('commission_request_id', 'commission_request__status', 'final_price', 'milestone_share', 'paid')
+
+
+def milestone_mismatches():
+    """
+    Milestones whose completed payments differ from their share of the contract price by more than
+    half a cent; compared as paid * 100 vs price * percentage so no backend does integer division
+    """
+    return CommissionMilestone.objects.filter(
+        commission_request__status__in=OPEN_STATUSES, commission_request__contract__isnull=False,
+    ).annotate(
+        paid=subquery_sum(paid_towards(milestone=OuterRef('pk')), 'milestone', 'amount'),
+        final_price=F('commission_request__contract__final_price'),
+    ).filter(paid__gt=0).annotate(
+        difference=Abs(F('paid') * 100 - F('final_price') * F('payment_percentage')),
+    ).filter(difference__gt=Decimal('0.5')).order_by().values(
+        'pk', 'commission_request_id', 'final_price', 'payment_percentage', 'paid',
+    )
+
+
+def iter_mismatches(run, batch_size):
+    for row in contract_mismatches().iterator(chunk_size=batch_size):
+        commission_id = row['commission_request_id']
+        if row['milestone_share'] is not None and row['milestone_share'] != 100:
+            yield PaymentMismatch(
+                run=run, commission_request_id=commission_id, kind='milestone_split',
+                expected=100, actual=row['milestone_share'],
+            )
+        if row['paid'] > row['final_price']:
+            kind = 'overpaid'
+        elif row['commission_request__status'] == 'completed' and row['paid'] < row['final_price']:
+            kind = 'underpaid'
+        else:
+            continue
+        yield PaymentMismatch(
+            run=run, commission_request_id=commission_id, kind=kind, expected=row['final_price'], actual=row['paid'],
+        )
+
+    for row in milestone_mismatches().iterator(chunk_size=batch_size):
+        yield PaymentMismatch(
+            run=run, commission_request_id=row['commission_request_id'], milestone_id=row['pk'],
+            kind='milestone_amount', actual=row['paid'],
+            expected=(row['final_price'] * row['payment_percentage'] / 100).quantize(CENT),
+        )
+
+
+def reconcile(batch_size=1000):
+    """
+    Checks every open contract's payments and records what doesn't add up as a new ReconciliationRun
+    Runs a handful of aggregate queries however many contracts there are, streaming the results
+    """
+    run = ReconciliationRun.objects.create()
+    totals = CommissionContract.objects.filter(commission_request__status__in=OPEN_STATUSES).aggregate(
+        contracts=Count('pk'), value=Sum('final_price'),
+    )
+    totals.update(paid_towards(
+        commission_request__status__in=OPEN_STATUSES, commission_request__contract__isnull=False,
+    ).aggregate(paid=Sum('amount')))
+
+    found, batch = 0, []
+    for mismatch in iter_mismatches(run, batch_size):
+        batch.append(mismatch)
+        if len(batch) == batch_size:
+            PaymentMismatch.objects.bulk_create(batch)
+            found += len(batch)
+            batch = []
+    PaymentMismatch.objects.bulk_create(batch)
+    found += len(batch)
+
+    run.contracts_checked = totals['contracts']
+    run.contract_value = totals['value'] or 0
+    run.paid = totals['paid'] or 0
+    run.mismatches_found = found
+    run.finished_at = timezone.now()
+    run.save()
+
+    # Older runs (and their mismatches) are only history
+    keep = ReconciliationRun.objects.values_list('pk', flat=True)[:settings.COMMISSION_RECONCILIATION_KEEP_RUNS]
+    ReconciliationRun.objects.exclude(pk__in=list(keep)).delete()
+    return run
+
+
+def get_ledger(commission):
+    """
+    A commission's payments in the order they were made, with the running total actually received
+    Payments are never edited away: a refund changes the payment's status, and the balance follows
+    """
+    price = getattr(getattr(commission, 'contract', None), 'final_price', None)
+    entries = list(commission.payments.select_related('milestone').order_by('created_at', 'pk'))
+    balance = Decimal('0.00')
+    for payment in entries:
+        if payment.status == 'completed':
+            balance += payment.amount
+        payment.balance = balance
+    return {
+        'final_price': price,
+        'paid': balance,
+        'outstanding': None if price is None else price - balance,
+        'entries': entries,
+    }
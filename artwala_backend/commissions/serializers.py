@@ -1,51 +1,137 @@
 from rest_framework import serializers
-from .models import CommissionRequest, CommissionProposal, CommissionContract, CommissionMilestone, CommissionPayment, CommissionReview
+from artwala_backend.fieldsets import SparseFieldsetSerializerMixin
+from .models import CommissionRequest, CommissionProposal, CommissionContract, CommissionMilestone, CommissionPayment, CommissionReview, ReconciliationRun, PaymentMismatch
 
-class CommissionRequestSerializer(serializers.ModelSerializer):
+class CommissionRequestSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     client_name = serializers.CharField(source='client.get_full_name', read_only=True)
-    proposals_count = serializers.SerializerMethodField()
+    artist_name = serializers.CharField(source='artist.display_name', read_only=True)
+    # A request has at most one proposal (one-to-one)
+    has_proposal = serializers.SerializerMethodField()
     
     class Meta:
         model = CommissionRequest
         fields = '__all__'
+        # Status changes only through the transition endpoint; the client is whoever sent the request
+        read_only_fields = ['client', 'status']
     
-    def get_proposals_count(self, obj):
-        return obj.proposals.count()
+    def get_has_proposal(self, obj):
+        return hasattr(obj, 'proposal')
+
+class CommissionRequestListSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    """
+    Compact commission summary for request listings
+    Leaves out the brief, requirements and reference images shown on the request page
+    """
+    client_name = serializers.CharField(source='client.get_full_name', read_only=True)
+    
+    class Meta:
+        model = CommissionRequest
+        fields = ['id', 'client', 'client_name', 'artist', 'title', 'commission_type', 
+                 'budget_min', 'budget_max', 'deadline', 'status', 'created_at', 'updated_at']
 
 class CommissionProposalSerializer(serializers.ModelSerializer):
-    artist_name = serializers.CharField(source='artist.display_name', read_only=True)
-    request_title = serializers.CharField(source='request.title', read_only=True)
+    artist_name = serializers.CharField(source='commission_request.artist.display_name', read_only=True)
+    request_title = serializers.CharField(source='commission_request.title', read_only=True)
     
     class Meta:
         model = CommissionProposal
         fields = '__all__'
 
 class CommissionContractSerializer(serializers.ModelSerializer):
-    client_name = serializers.CharField(source='client.get_full_name', read_only=True)
-    artist_name = serializers.CharField(source='artist.display_name', read_only=True)
+    client_name = serializers.CharField(source='commission_request.client.get_full_name', read_only=True)
+    artist_name = serializers.CharField(source='commission_request.artist.display_name', read_only=True)
+    request_title = serializers.CharField(source='commission_request.title', read_only=True)
     
     class Meta:
         model = CommissionContract
         fields = '__all__'
+        # Each party signs for themselves through the sign/ action
+        read_only_fields = ['client_signed', 'artist_signed', 'client_signed_at', 'artist_signed_at']
+    
+    def update(self, instance, validated_data):
+        # A signature covers the terms as signed, so any edit needs both parties to sign again
+        if any(getattr(instance, field) != value for field, value in validated_data.items()):
+            validated_data.update(client_signed=False, artist_signed=False, client_signed_at=None, artist_signed_at=None)
+        return super().update(instance, validated_data)
 
 class CommissionMilestoneSerializer(serializers.ModelSerializer):
-    contract_title = serializers.CharField(source='contract.title', read_only=True)
+    request_title = serializers.CharField(source='commission_request.title', read_only=True)
     
     class Meta:
         model = CommissionMilestone
         fields = '__all__'
+        read_only_fields = ['status', 'completed_at', 'approved_at', 'overdue_at']
 
 class CommissionPaymentSerializer(serializers.ModelSerializer):
-    contract_title = serializers.CharField(source='contract.title', read_only=True)
+    request_title = serializers.CharField(source='commission_request.title', read_only=True)
+    milestone_title = serializers.CharField(source='milestone.title', read_only=True, default=None)
     
     class Meta:
         model = CommissionPayment
         fields = '__all__'
 
+class CommissionLedgerEntrySerializer(serializers.ModelSerializer):
+    milestone_title = serializers.CharField(source='milestone.title', read_only=True, default=None)
+    # Completed payments received up to and including this one
+    balance = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+    
+    class Meta:
+        model = CommissionPayment
+        fields = ['id', 'milestone', 'milestone_title', 'amount', 'payment_method', 'transaction_id',
+                 'status', 'paid_at', 'created_at', 'balance']
+
+class CommissionLedgerSerializer(serializers.Serializer):
+    final_price = serializers.DecimalField(max_digits=10, decimal_places=2, allow_null=True)
+    paid = serializers.DecimalField(max_digits=12, decimal_places=2)
+    outstanding = serializers.DecimalField(max_digits=12, decimal_places=2, allow_null=True)
+    entries = CommissionLedgerEntrySerializer(many=True)
+
 class CommissionReviewSerializer(serializers.ModelSerializer):
-    client_name = serializers.CharField(source='client.get_full_name', read_only=True)
-    artist_name = serializers.CharField(source='artist.display_name', read_only=True)
+    client_name = serializers.CharField(source='commission_request.client.get_full_name', read_only=True)
+    artist_name = serializers.CharField(source='commission_request.artist.display_name', read_only=True)
     
     class Meta:
         model = CommissionReview
         fields = '__all__'
+
+class ReconciliationRunSerializer(serializers.ModelSerializer):
+    outstanding = serializers.DecimalField(max_digits=14, decimal_places=2, read_only=True)
+    
+    class Meta:
+        model = ReconciliationRun
+        fields = '__all__'
+
+class MismatchTotalSerializer(serializers.Serializer):
+    kind = serializers.CharField()
+    count = serializers.IntegerField()
+    expected = serializers.DecimalField(max_digits=14, decimal_places=2)
+    actual = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+class PaymentMismatchSerializer(serializers.ModelSerializer):
+    request_title = serializers.CharField(source='commission_request.title', read_only=True)
+    milestone_title = serializers.CharField(source='milestone.title', read_only=True, default=None)
+    description = serializers.CharField(source='get_kind_display', read_only=True)
+    
+    class Meta:
+        model = PaymentMismatch
+        fields = ['id', 'commission_request', 'request_title', 'milestone', 'milestone_title',
+                 'kind', 'description', 'expected', 'actual']
+
+class TransitionSerializer(serializers.Serializer):
+    transition = serializers.CharField()
+    # Sent to the artist with a revision request
+    feedback = serializers.CharField(required=False, allow_blank=True, default='')
+
+class BulkTransitionSerializer(serializers.Serializer):
+    """
+    Staff close-out of many commissions at once
+    Targets the listed ids, the commissions untouched for older_than_days, or both combined
+    """
+    transition = serializers.ChoiceField(choices=['review', 'reject', 'cancel'])
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, max_length=10000)
+    older_than_days = serializers.IntegerField(required=False, min_value=1)
+    
+    def validate(self, attrs):
+        if not attrs.get('ids') and not attrs.get('older_than_days'):
+            raise serializers.ValidationError('Give ids, older_than_days, or both.')
+        return attrs
@@ -0,0 +1,73 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from artists.models import ArtistProfile
+
+from .models import CommissionMilestone
+from .tasks import notify_overdue_milestones
+
+
+def bump(artist_id, **increments):
+    """
+    Adds to an artist's reliability counters in one UPDATE; concurrent bumps never lose a count
+    """
+    ArtistProfile.objects.filter(pk=artist_id).update(
+        # Bumping updated_at changes the profile's ETag, so cached copies pick up the new stats
+        updated_at=timezone.now(),
+        **{field: F(field) + amount for field, amount in increments.items()},
+    )
+
+
+def record_submission(milestone, artist_id):
+    """
+    Counts a milestone's first submission towards the artist's on-time rate (if it had a due date)
+    """
+    if milestone.due_date is None:
+        return
+    on_time = timezone.localdate(milestone.completed_at) <= milestone.due_date
+    bump(artist_id, milestones_delivered=1, milestones_on_time=int(on_time))
+
+
+def record_approval(milestone, artist_id):
+    bump(artist_id, milestones_approved=1, approval_time_total=milestone.approved_at - milestone.completed_at)
+
+
+def overdue_milestones(today):
+    """
+    Milestones past their due date that were never submitted and haven't been flagged yet
+    completed_at is stamped on every submission and never cleared, so a revision keeps a milestone out
+    """
+    # Implies milestone_deadline_scan_idx's condition, so only that (small) partial index is read
+    return CommissionMilestone.objects.filter(
+        completed_at__isnull=True, overdue_at__isnull=True, due_date__lt=today,
+    )
+
+
+def mark_overdue(batch_size, now=None):
+    """
+    Flags every undelivered milestone past its due date, counts it against the artist and queues a notice
+    Returns the number of milestones flagged; each is flagged once, so reruns are harmless
+    """
+    now = now or timezone.now()
+    today = timezone.localdate(now)
+    total = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                overdue_milestones(today)
+                # Work on cancelled or finished commissions isn't owed any more
+                .filter(commission_request__status='in_progress')
+                .select_for_update(skip_locked=True, of=('self',))
+                .order_by('due_date', 'pk')
+                .values_list('pk', 'commission_request__artist_id')[:batch_size]
+            )
+            if not batch:
+                return total
+            CommissionMilestone.objects.filter(pk__in=[pk for pk, _ in batch]).update(overdue_at=now)
+            for artist_id, count in Counter(artist_id for _, artist_id in batch).items():
+                bump(artist_id, milestones_overdue=count)
+            notify_overdue_milestones.enqueue([pk for pk, _ in batch])
+        total += len(batch)
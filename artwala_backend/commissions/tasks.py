@@ -0,0 +1,27 @@
+from django.core.mail import EmailMessage, get_connection
+from django.template.loader import render_to_string
+
+from taskqueue.queue import task
+
+from .models import CommissionMilestone
+
+
+@task
+def notify_overdue_milestones(milestone_ids):
+    """
+    Emails the artist and the client about each overdue milestone, over one backend connection
+    """
+    milestones = CommissionMilestone.objects.filter(pk__in=milestone_ids).select_related(
+        'commission_request__client', 'commission_request__artist__user',
+    )
+    messages = []
+    for milestone in milestones:
+        commission = milestone.commission_request
+        for user, for_artist in ((commission.artist.user, True), (commission.client, False)):
+            body = render_to_string('commissions/email/milestone_overdue.txt', {
+                'milestone': milestone, 'commission': commission, 'for_artist': for_artist,
+            })
+            messages.append(EmailMessage(
+                f'Overdue: {milestone.title}', f'Hi {user.first_name or user.username},\n\n{body}', to=[user.email],
+            ))
+    get_connection().send_messages(messages)
@@ -1,3 +1,530 @@
+import datetime
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from artists.models import ArtistProfile
+from outbox.models import OutboxEvent
+from taskqueue.models import Task
+from .inbox import inbox
+from .models import CommissionContract, CommissionMilestone, CommissionPayment, CommissionProposal, CommissionRequest
+from .reconciliation import reconcile
+from .sla import mark_overdue, overdue_milestones
+from .tasks import notify_overdue_milestones
+
+User = get_user_model()
+
+
+class CommissionWorkflowTests(TestCase):
+    def setUp(self):
+        self.client_user = User.objects.create_user(email='client@example.com', username='client', password='pw12345678')
+        artist_user = User.objects.create_user(email='artist@example.com', username='artist', password='pw12345678')
+        self.artist = ArtistProfile.objects.create(user=artist_user, display_name='Artist')
+        self.as_client = APIClient()
+        self.as_client.force_authenticate(self.client_user)
+        self.as_artist = APIClient()
+        self.as_artist.force_authenticate(artist_user)
+        self.commission = self.create_commission()
+    
+    def create_commission(self, **fields):
+        return CommissionRequest.objects.create(
+            client=self.client_user, artist=self.artist, title='Portrait', description='Oil portrait',
+            commission_type='portrait', budget_min=Decimal('100.00'), budget_max=Decimal('200.00'),
+            deadline=datetime.date(2030, 1, 1), **fields,
+        )
+    
+    def transition(self, api, name, commission=None):
+        commission = commission or self.commission
+        return api.post(f'/api/commissions/requests/{commission.pk}/transition/', {'transition': name})
+    
+    def test_happy_path_through_delivery(self):
+        CommissionProposal.objects.create(
+            commission_request=self.commission, proposed_price=Decimal('150.00'), estimated_completion_time=14,
+            proposal_description='Plan', terms_and_conditions='Terms',
+        )
+        self.assertEqual(self.transition(self.as_artist, 'accept').status_code, 200)
+    
+        contract = CommissionContract.objects.create(
+            commission_request=self.commission, final_price=Decimal('150.00'), start_date=datetime.date(2029, 1, 1),
+            expected_completion_date=datetime.date(2029, 2, 1), terms_agreed='Terms', client_signed=True,
+        )
+        self.assertEqual(self.transition(self.as_artist, 'start').status_code, 409)
+        contract.artist_signed = True
+        contract.save()
+        self.assertEqual(self.transition(self.as_artist, 'start').json()['status'], 'in_progress')
+    
+        milestone = CommissionMilestone.objects.create(
+            commission_request=self.commission, title='Sketch', description='Sketch', order=1,
+            percentage=100, payment_percentage=100,
+        )
+        url = f'/api/commissions/milestones/{milestone.pk}/transition/'
+        self.assertEqual(self.transition(self.as_artist, 'complete').status_code, 409)
+        self.as_artist.post(url, {'transition': 'start'})
+        self.as_artist.post(url, {'transition': 'submit'})
+        response = self.as_client.post(url, {'transition': 'approve'})
+        self.assertEqual(response.json()['status'], 'approved')
+        self.assertIsNotNone(response.json()['approved_at'])
+    
+        self.assertEqual(self.transition(self.as_artist, 'complete').status_code, 200)
+        self.assertEqual(self.transition(self.as_client, 'deliver').json()['status'], 'delivered')
+        statuses = OutboxEvent.objects.filter(
+            event_type='commission_request.status_changed', aggregate_id=str(self.commission.pk),
+        ).order_by('pk').values_list('payload__to', flat=True)
+        self.assertEqual(list(statuses), ['submitted', 'accepted', 'in_progress', 'completed', 'delivered'])
+    
+    def test_each_party_signs_only_for_themselves(self):
+        CommissionProposal.objects.create(
+            commission_request=self.commission, proposed_price=Decimal('150.00'), estimated_completion_time=14,
+            proposal_description='Plan', terms_and_conditions='Terms',
+        )
+        self.transition(self.as_artist, 'accept')
+        response = self.as_artist.post('/api/commissions/contracts/', {
+            'commission_request': self.commission.pk, 'final_price': '150.00', 'start_date': '2029-01-01',
+            'expected_completion_date': '2029-02-01', 'terms_agreed': 'Terms', 'client_signed': True, 'artist_signed': True,
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.json()['client_signed'], response.json()['artist_signed']), (False, False))
+        url = f"/api/commissions/contracts/{response.json()['id']}/"
+    
+        signed = self.as_artist.post(f'{url}sign/').json()
+        self.assertEqual((signed['client_signed'], signed['artist_signed']), (False, True))
+        self.assertIsNone(signed['client_signed_at'])
+        self.as_artist.patch(url, {'client_signed': True, 'client_signed_at': '2029-01-01T00:00:00Z'})
+        self.assertEqual(self.transition(self.as_artist, 'start').status_code, 409)
+    
+        self.as_client.post(f'{url}sign/')
+        # Changing the terms after both signed takes both signatures back
+        edited = self.as_artist.patch(url, {'final_price': '250.00'}).json()
+        self.assertEqual((edited['client_signed'], edited['artist_signed']), (False, False))
+        self.as_client.post(f'{url}sign/')
+        self.as_artist.post(f'{url}sign/')
+        self.assertEqual(self.transition(self.as_artist, 'start').json()['status'], 'in_progress')
+    
+        staff = APIClient()
+        staff.force_authenticate(User.objects.create_user(email='s@example.com', username='s', password='pw12345678', is_staff=True))
+        self.assertEqual(staff.post(f'{url}sign/').status_code, 403)
+    
+    def test_invalid_and_unauthorized_transitions(self):
+        self.assertEqual(self.transition(self.as_artist, 'accept').status_code, 409)  # no proposal yet
+        self.assertEqual(self.transition(self.as_client, 'reject').status_code, 403)
+        self.assertEqual(self.transition(self.as_artist, 'teleport').status_code, 400)
+        self.assertEqual(self.transition(self.as_client, 'cancel').status_code, 200)
+        self.assertEqual(self.transition(self.as_client, 'cancel').status_code, 409)
+    
+    def test_status_is_not_writable_directly(self):
+        milestone = CommissionMilestone.objects.create(
+            commission_request=self.commission, title='Sketch', description='Sketch', order=1,
+            percentage=100, payment_percentage=100,
+        )
+        self.as_client.patch(f'/api/commissions/milestones/{milestone.pk}/', {'status': 'approved'})
+        milestone.refresh_from_db()
+        self.assertEqual(milestone.status, 'pending')
+    
+    def test_bulk_cancels_stale_commissions(self):
+        stale = [self.create_commission() for _ in range(3)]
+        delivered = self.create_commission(status='delivered')
+        CommissionRequest.objects.filter(pk__in=[c.pk for c in stale] + [delivered.pk]).update(
+            updated_at=timezone.now() - datetime.timedelta(days=90),
+        )
+        staff = APIClient()
+        staff.force_authenticate(User.objects.create_superuser(
+            email='staff@example.com', username='staff', password='pw12345678',
+        ))
+        url = '/api/commissions/requests/bulk-transition/'
+        self.assertEqual(self.as_client.post(url, {'transition': 'cancel', 'older_than_days': 30}).status_code, 403)
+        self.assertEqual(staff.post(url, {'transition': 'start', 'older_than_days': 30}).status_code, 400)
+    
+        response = staff.post(url, {'transition': 'cancel', 'older_than_days': 30}, format='json')
+        self.assertEqual(response.json()['changed'], 3)
+        self.assertEqual(CommissionRequest.objects.filter(status='cancelled').count(), 3)
+        self.assertEqual(CommissionRequest.objects.get(pk=self.commission.pk).status, 'submitted')
+        self.assertEqual(CommissionRequest.objects.get(pk=delivered.pk).status, 'delivered')
+        self.assertEqual(OutboxEvent.objects.filter(payload__to='cancelled').count(), 3)
+
+
+class CommissionReadTests(TestCase):
+    """
+    List endpoints run a fixed number of queries however many commissions they return
+    """
+    def setUp(self):
+        for number in range(5):
+            client_user = User.objects.create_user(
+                email=f'client{number}@example.com', username=f'client{number}', password='pw12345678',
+                first_name='Client', last_name=str(number),
+            )
+            artist_user = User.objects.create_user(
+                email=f'artist{number}@example.com', username=f'artist{number}', password='pw12345678',
+            )
+            artist = ArtistProfile.objects.create(user=artist_user, display_name=f'Artist {number}')
+            commission = CommissionRequest.objects.create(
+                client=client_user, artist=artist, title=f'Commission {number}', description='Brief',
+                commission_type='painting', budget_min=Decimal('100.00'), budget_max=Decimal('200.00'),
+                deadline=datetime.date(2030, 1, 1),
+            )
+            CommissionProposal.objects.create(
+                commission_request=commission, proposed_price=Decimal('150.00'), estimated_completion_time=14,
+                proposal_description='Plan', terms_and_conditions='Terms',
+            )
+            CommissionContract.objects.create(
+                commission_request=commission, final_price=Decimal('150.00'), start_date=datetime.date(2029, 1, 1),
+                expected_completion_date=datetime.date(2029, 2, 1), terms_agreed='Terms',
+            )
+            for order in (1, 2):
+                CommissionMilestone.objects.create(
+                    commission_request=commission, title=f'Stage {order}', description='Stage', order=order,
+                    percentage=50 * order, payment_percentage=50,
+                )
+        self.api = APIClient()
+        # Staff see every commission
+        self.api.force_authenticate(User.objects.create_superuser(
+            email='staff@example.com', username='staff', password='pw12345678',
+        ))
+    
+    def get(self, url, queries):
+        # Page count, page, and validators for related rows the page didn't load
+        with self.assertNumQueries(queries):
+            response = self.api.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+    
+    def test_request_list(self):
+        results = self.get('/api/commissions/requests/', 3)['results']
+        self.assertEqual(len(results), 5)
+        self.assertEqual({row['client_name'] for row in results}, {f'Client {number}' for number in range(5)})
+    
+    def test_request_detail(self):
+        commission = CommissionRequest.objects.get(title='Commission 0')
+        with self.assertNumQueries(1):
+            data = self.api.get(f'/api/commissions/requests/{commission.pk}/').json()
+        self.assertEqual((data['client_name'], data['artist_name'], data['has_proposal']), ('Client 0', 'Artist 0', True))
+    
+    def test_included_clients_leave_out_contact_details(self):
+        commission = CommissionRequest.objects.get(title='Commission 0')
+        data = self.api.get(f'/api/commissions/requests/{commission.pk}/', {'include': 'client,artist'}).json()
+        client, = data['included']['client']
+        self.assertEqual((client['id'], client['last_name']), (commission.client_id, '0'))
+        self.assertFalse({'email', 'phone', 'location'} & client.keys())
+        self.assertEqual(data['included']['artist'][0]['display_name'], 'Artist 0')
+    
+    def test_proposal_list(self):
+        results = self.get('/api/commissions/proposals/', 2)['results']
+        self.assertEqual({row['artist_name'] for row in results}, {f'Artist {number}' for number in range(5)})
+        self.assertEqual({row['request_title'] for row in results}, {f'Commission {number}' for number in range(5)})
+    
+    def test_contract_list(self):
+        with self.assertNumQueries(2):
+            results = self.api.get('/api/commissions/contracts/').json()['results']
+        self.assertEqual(
+            {(row['client_name'], row['artist_name']) for row in results},
+            {(f'Client {number}', f'Artist {number}') for number in range(5)},
+        )
+    
+    def test_milestone_list(self):
+        results = self.get('/api/commissions/milestones/', 2)['results']
+        self.assertEqual(len(results), 10)
+        self.assertEqual(results[0]['request_title'].split()[0], 'Commission')
+    
+    def test_related_edits_change_the_etags(self):
+        commission = CommissionRequest.objects.get(title='Commission 0')
+        urls = ['/api/commissions/milestones/', f'/api/commissions/requests/{commission.pk}/']
+        etags = {url: self.api.get(url)['ETag'] for url in urls}
+        for url, etag in etags.items():
+            self.assertEqual(self.api.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        # The milestones render the request's title; the request renders the artist's name
+        commission.title = 'Renamed'
+        commission.save()
+        self.assertEqual(self.api.get(urls[0], HTTP_IF_NONE_MATCH=etags[urls[0]]).status_code, 200)
+        etags[urls[1]] = self.api.get(urls[1])['ETag']
+        commission.artist.display_name = 'Renamed Artist'
+        commission.artist.save()
+        self.assertEqual(self.api.get(urls[1], HTTP_IF_NONE_MATCH=etags[urls[1]]).status_code, 200)
+
+
+class CommissionInboxTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.users = {}
+        for name in ('alice', 'bob', 'carol'):
+            self.users[name] = User.objects.create_user(
+                email=f'{name}@example.com', username=name, password='pw12345678',
+            )
+        self.artists = {
+            name: ArtistProfile.objects.create(user=self.users[name], display_name=name.title())
+            for name in ('bob', 'carol')
+        }
+        # alice -> bob twice, bob -> carol once
+        self.sent = [self.create('alice', 'bob'), self.create('alice', 'bob', status='under_review')]
+        self.received = self.create('bob', 'carol')
+    
+    def create(self, client, artist, **fields):
+        return CommissionRequest.objects.create(
+            client=self.users[client], artist=self.artists[artist], title=f'{client} for {artist}',
+            description='Brief', commission_type='painting', budget_min=Decimal('100.00'),
+            budget_max=Decimal('200.00'), deadline=datetime.date(2030, 1, 1), **fields,
+        )
+    
+    def api(self, name):
+        api = APIClient()
+        api.force_authenticate(self.users[name])
+        return api
+    
+    def titles(self, name, **params):
+        response = self.api(name).get('/api/commissions/requests/', params)
+        return sorted(row['title'] for row in response.json()['results'])
+    
+    def test_users_only_see_their_own_commissions(self):
+        self.assertEqual(self.titles('alice'), ['alice for bob', 'alice for bob'])
+        self.assertEqual(self.titles('bob'), ['alice for bob', 'alice for bob', 'bob for carol'])
+        self.assertEqual(self.titles('bob', role='client'), ['bob for carol'])
+        self.assertEqual(self.titles('bob', role='artist', status='under_review'), ['alice for bob'])
+        self.assertEqual(self.api('bob').get('/api/commissions/requests/', {'role': 'admin'}).status_code, 400)
+        self.assertEqual(self.api('carol').get(f'/api/commissions/requests/{self.sent[0].pk}/').status_code, 404)
+        
+        milestone = CommissionMilestone.objects.create(
+            commission_request=self.received, title='Sketch', description='Sketch', order=1,
+            percentage=100, payment_percentage=100,
+        )
+        self.assertEqual(self.api('alice').get(f'/api/commissions/milestones/{milestone.pk}/').status_code, 404)
+        self.assertEqual(self.api('carol').get(f'/api/commissions/milestones/{milestone.pk}/').status_code, 200)
+    
+    def test_requests_are_sent_as_the_signed_in_user(self):
+        response = self.api('carol').post('/api/commissions/requests/', {
+            'client': self.users['alice'].pk, 'artist': self.artists['bob'].pk, 'title': 'Forged',
+            'description': 'Brief', 'commission_type': 'painting', 'budget_min': '100.00',
+            'budget_max': '200.00', 'deadline': '2030-01-01',
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(CommissionRequest.objects.get(title='Forged').client, self.users['carol'])
+        # Nor can the client be swapped afterwards
+        commission = self.sent[0]
+        self.api('alice').patch(f'/api/commissions/requests/{commission.pk}/', {'client': self.users['carol'].pk})
+        commission.refresh_from_db()
+        self.assertEqual(commission.client, self.users['alice'])
+    
+    def test_milestones_only_attach_to_own_commissions(self):
+        milestone = {
+            'title': 'Sketch', 'description': 'Stage', 'order': 1, 'percentage': 25, 'payment_percentage': 25,
+        }
+        commission = self.sent[0]
+        response = self.api('carol').post('/api/commissions/milestones/', {**milestone, 'commission_request': commission.pk})
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(CommissionMilestone.objects.exists())
+        response = self.api('bob').post('/api/commissions/milestones/', {**milestone, 'commission_request': commission.pk})
+        self.assertEqual(response.status_code, 201)
+        # Moving one onto someone else's commission is refused too
+        elsewhere = self.create('alice', 'carol')
+        response = self.api('bob').patch(
+            f'/api/commissions/milestones/{response.json()["id"]}/', {'commission_request': elsewhere.pk},
+        )
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(CommissionMilestone.objects.get().commission_request, commission)
+    
+    def test_inbox_queries_use_the_composite_indexes(self):
+        plan = inbox(self.users['bob'], 'artist', ['submitted']).explain()
+        self.assertIn('commission_artist_inbox_idx', plan)
+        plan = inbox(self.users['alice'], 'client', ['submitted']).explain()
+        self.assertIn('commission_client_inbox_idx', plan)
+    
+    def test_summary_is_cached_until_a_commission_changes(self):
+        api = self.api('bob')
+        summary = api.get('/api/commissions/requests/summary/').json()
+        self.assertEqual(summary['artist'], {'submitted': 1, 'under_review': 1})
+        self.assertEqual(summary['client'], {'submitted': 1})
+        self.assertEqual((summary['unread'], summary['pending']), (1, 2))
+        with self.assertNumQueries(0):
+            self.assertEqual(api.get('/api/commissions/requests/summary/').json(), summary)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            api.post(f'/api/commissions/requests/{self.sent[0].pk}/transition/', {'transition': 'reject'})
+        summary = api.get('/api/commissions/requests/summary/').json()
+        self.assertEqual(summary['artist'], {'rejected': 1, 'under_review': 1})
+        self.assertEqual((summary['unread'], summary['pending']), (0, 1))
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create('carol', 'bob')
+        self.assertEqual(api.get('/api/commissions/requests/summary/').json()['unread'], 1)
+
+
+class PaymentReconciliationTests(TestCase):
+    def setUp(self):
+        self.client_user = User.objects.create_user(email='client@example.com', username='client', password='pw12345678')
+        artist_user = User.objects.create_user(email='artist@example.com', username='artist', password='pw12345678')
+        self.artist = ArtistProfile.objects.create(user=artist_user, display_name='Artist')
+        self.staff = APIClient()
+        self.staff.force_authenticate(User.objects.create_superuser(
+            email='staff@example.com', username='staff', password='pw12345678',
+        ))
+        
+        # Fully consistent apart from the second milestone, which was paid short
+        split = self.create('split', '1000.00', milestones=[50, 50])
+        self.pay(split, '500.00', milestone=split.milestones.get(order=1))
+        self.pay(split, '450.00', milestone=split.milestones.get(order=2))
+        self.create('short split', '1000.00', milestones=[40, 40])
+        self.pay(self.create('overpaid', '300.00'), '400.00')
+        underpaid = self.create('underpaid', '900.00', status='completed')
+        self.pay(underpaid, '600.00')
+        self.pay(underpaid, '300.00', status='refunded')
+        # 33% of 99.99 is 32.9967; paying 33.00 is within rounding
+        rounding = self.create('rounding', '99.99', milestones=[33, 67])
+        self.pay(rounding, '33.00', milestone=rounding.milestones.get(order=1))
+        # Settled commissions aren't checked
+        self.pay(self.create('delivered', '100.00', status='delivered'), '150.00')
+    
+    def create(self, title, price, status='in_progress', milestones=()):
+        commission = CommissionRequest.objects.create(
+            client=self.client_user, artist=self.artist, title=title, description='Brief',
+            commission_type='painting', budget_min=Decimal('1.00'), budget_max=Decimal('2000.00'),
+            deadline=datetime.date(2030, 1, 1), status=status,
+        )
+        CommissionContract.objects.create(
+            commission_request=commission, final_price=Decimal(price), start_date=datetime.date(2029, 1, 1),
+            expected_completion_date=datetime.date(2029, 2, 1), terms_agreed='Terms',
+            client_signed=True, artist_signed=True,
+        )
+        for order, percentage in enumerate(milestones, 1):
+            CommissionMilestone.objects.create(
+                commission_request=commission, title=f'{title} {order}', description='Stage', order=order,
+                percentage=percentage, payment_percentage=percentage,
+            )
+        return commission
+    
+    def pay(self, commission, amount, milestone=None, status='completed'):
+        return CommissionPayment.objects.create(
+            commission_request=commission, milestone=milestone, amount=Decimal(amount),
+            payment_method='upi', status=status,
+        )
+    
+    def test_reconcile_flags_mismatches_with_a_fixed_number_of_queries(self):
+        # Run row, totals (2), two mismatch scans, one insert per batch, run update, pruning (2)
+        with self.assertNumQueries(10):
+            run = reconcile(batch_size=2)
+        found = set(run.mismatches.values_list('commission_request__title', 'kind', 'expected', 'actual'))
+        self.assertEqual(found, {
+            ('split', 'milestone_amount', Decimal('500.00'), Decimal('450.00')),
+            ('short split', 'milestone_split', Decimal('100.00'), Decimal('80.00')),
+            ('overpaid', 'overpaid', Decimal('300.00'), Decimal('400.00')),
+            ('underpaid', 'underpaid', Decimal('900.00'), Decimal('600.00')),
+        })
+        self.assertEqual(run.contracts_checked, 5)
+        self.assertEqual(run.contract_value, Decimal('3299.99'))
+        self.assertEqual(run.paid, Decimal('1983.00'))
+    
+    def test_report_endpoint(self):
+        url = '/api/commissions/reconciliation/'
+        self.assertEqual(self.staff.get(url).status_code, 404)
+        reconcile()
+        report = self.staff.get(url).json()
+        self.assertEqual(report['run']['mismatches_found'], 4)
+        self.assertEqual(report['run']['outstanding'], '1316.99')
+        self.assertEqual([(row['kind'], row['count']) for row in report['by_kind']], [
+            ('milestone_amount', 1), ('milestone_split', 1), ('overpaid', 1), ('underpaid', 1),
+        ])
+        self.assertEqual(len(report['results']), 4)
+        underpaid = self.staff.get(url, {'kind': 'underpaid'}).json()['results']
+        self.assertEqual([row['request_title'] for row in underpaid], ['underpaid'])
+        self.assertEqual(self.staff.get(url, {'run': report['run']['id']}).status_code, 200)
+        self.assertEqual(self.staff.get(url, {'run': report['run']['id'] + 1}).status_code, 404)
+        self.assertEqual(self.staff.get(url, {'run': 'abc'}).status_code, 400)
+        
+        api = APIClient()
+        api.force_authenticate(self.client_user)
+        self.assertEqual(api.get(url).status_code, 403)
+    
+    def test_ledger_keeps_refunds_and_running_balance(self):
+        commission = CommissionRequest.objects.get(title='underpaid')
+        api = APIClient()
+        api.force_authenticate(self.client_user)
+        ledger = api.get(f'/api/commissions/requests/{commission.pk}/ledger/').json()
+        self.assertEqual([(entry['status'], entry['balance']) for entry in ledger['entries']], [
+            ('completed', '600.00'), ('refunded', '600.00'),
+        ])
+        self.assertEqual((ledger['final_price'], ledger['paid'], ledger['outstanding']), ('900.00', '600.00', '300.00'))
+        
+        outsider = APIClient()
+        outsider.force_authenticate(User.objects.create_user(
+            email='other@example.com', username='other', password='pw12345678',
+        ))
+        self.assertEqual(outsider.get(f'/api/commissions/requests/{commission.pk}/ledger/').status_code, 404)
+
 
-# Create your tests here.
+class MilestoneDeadlineTests(TestCase):
+    def setUp(self):
+        self.client_user = User.objects.create_user(email='client@example.com', username='client', password='pw12345678')
+        artist_user = User.objects.create_user(email='artist@example.com', username='artist', password='pw12345678')
+        self.artist = ArtistProfile.objects.create(user=artist_user, display_name='Artist')
+        self.as_client = APIClient()
+        self.as_client.force_authenticate(self.client_user)
+        self.as_artist = APIClient()
+        self.as_artist.force_authenticate(artist_user)
+        self.today = timezone.localdate()
+        self.commission = self.create_commission('in_progress')
+    
+    def create_commission(self, status):
+        return CommissionRequest.objects.create(
+            client=self.client_user, artist=self.artist, title='Mural', description='Brief',
+            commission_type='mural', budget_min=Decimal('100.00'), budget_max=Decimal('200.00'),
+            deadline=datetime.date(2030, 1, 1), status=status,
+        )
+    
+    def create_milestone(self, due_in_days, commission=None, **fields):
+        commission = commission or self.commission
+        return CommissionMilestone.objects.create(
+            commission_request=commission, title=f'Due in {due_in_days}', description='Stage',
+            order=commission.milestones.count() + 1, percentage=50, payment_percentage=50,
+            due_date=self.today + datetime.timedelta(days=due_in_days), **fields,
+        )
+    
+    def move(self, api, milestone, name):
+        response = api.post(f'/api/commissions/milestones/{milestone.pk}/transition/', {'transition': name})
+        self.assertEqual(response.status_code, 200, response.content)
+    
+    def test_reliability_stats_follow_milestone_transitions(self):
+        on_time = self.create_milestone(3)
+        late = self.create_milestone(-1)
+        for milestone in (on_time, late):
+            self.move(self.as_artist, milestone, 'start')
+            self.move(self.as_artist, milestone, 'submit')
+        self.move(self.as_client, on_time, 'approve')
+        # A resubmission after a revision isn't a second delivery
+        self.move(self.as_client, late, 'request_revision')
+        self.move(self.as_artist, late, 'submit')
+        
+        profile = self.as_client.get(f'/api/artists/profiles/{self.artist.slug}/').json()
+        self.assertEqual((profile['milestones_delivered'], profile['milestones_on_time']), (2, 1))
+        self.assertEqual(profile['on_time_rate'], 50.0)
+        self.assertEqual(profile['milestones_approved'], 1)
+        self.assertIsNotNone(profile['average_approval_hours'])
+        
+        # Editing the profile doesn't write back stale counters
+        stale = ArtistProfile.objects.get(pk=self.artist.pk)
+        ArtistProfile.objects.filter(pk=self.artist.pk).update(milestones_overdue=4)
+        stale.tagline = 'Walls and murals'
+        stale.save()
+        self.assertEqual(ArtistProfile.objects.get(pk=self.artist.pk).milestones_overdue, 4)
+    
+    def test_scanner_flags_each_overdue_milestone_once(self):
+        overdue = [self.create_milestone(-2), self.create_milestone(-1, status='in_progress')]
+        self.create_milestone(-1, status='completed', completed_at=timezone.now())
+        self.create_milestone(1)
+        self.create_milestone(-5, commission=self.create_commission('cancelled'))
+        
+        self.assertEqual(mark_overdue(batch_size=1), 2)
+        self.assertEqual(mark_overdue(batch_size=1), 0)
+        self.assertEqual(
+            set(CommissionMilestone.objects.filter(overdue_at__isnull=False).values_list('pk', flat=True)),
+            {milestone.pk for milestone in overdue},
+        )
+        self.assertEqual(ArtistProfile.objects.get(pk=self.artist.pk).milestones_overdue, 2)
+        
+        tasks = Task.objects.filter(name='commissions.tasks.notify_overdue_milestones')
+        self.assertEqual(sorted(task.args[0][0] for task in tasks), sorted(milestone.pk for milestone in overdue))
+        notify_overdue_milestones(tasks[0].args[0])
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), ['artist@example.com', 'client@example.com'])
+    
+    def test_scan_reads_the_partial_index(self):
+        self.assertIn('milestone_deadline_scan_idx', overdue_milestones(self.today).explain())
@@ -9,5 +9,6 @@ router.register(r'contracts', views.CommissionContractViewSet)
 router.register(r'milestones', views.CommissionMilestoneViewSet)
 
 urlpatterns = [
+    path('reconciliation/', views.ReconciliationReportView.as_view(), name='commission-reconciliation'),
     path('', include(router.urls)),
 ]
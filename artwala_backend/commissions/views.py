@@ -1,24 +1,188 @@
-from rest_framework import viewsets
-from rest_framework.permissions import IsAuthenticated
-from .models import CommissionRequest, CommissionProposal, CommissionContract, CommissionMilestone
-from .serializers import CommissionRequestSerializer, CommissionProposalSerializer, CommissionContractSerializer, CommissionMilestoneSerializer
+from django.db.models import Count, Sum
+from rest_framework import generics, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+from artwala_backend.conditional import ConditionalGetMixin
+from artwala_backend.fieldsets import SparseFieldsetMixin
+from artwala_backend.includes import IncludeMixin
+from artists.models import ArtistProfile
+from artists.serializers import ArtistProfileListSerializer
+from users.models import User
+from users.serializers import PublicUserSerializer
+from .models import CommissionRequest, CommissionProposal, CommissionContract, CommissionMilestone, ReconciliationRun
+from .serializers import CommissionRequestSerializer, CommissionRequestListSerializer, CommissionProposalSerializer, CommissionContractSerializer, CommissionMilestoneSerializer, CommissionLedgerSerializer, ReconciliationRunSerializer, MismatchTotalSerializer, PaymentMismatchSerializer, TransitionSerializer, BulkTransitionSerializer
+from .inbox import ROLES, get_summary, inbox, participant_filter
+from .reconciliation import get_ledger
+from .workflow import bulk_transition_requests, sign_contract, stale_requests, transition_milestone, transition_request
 
-class CommissionRequestViewSet(viewsets.ModelViewSet):
+class ParticipantScopedMixin:
+    """
+    Limits a viewset over a commission's proposal, contract or milestones to the user's own commissions
+    """
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.user.is_staff:
+            return queryset
+        return queryset.filter(participant_filter(self.request.user, prefix='commission_request__'))
+    
+    def check_commission(self, serializer):
+        """
+        Refuses writes that attach the row to a commission the user doesn't take part in
+        """
+        commission = serializer.validated_data.get('commission_request')
+        if commission is None or self.request.user.is_staff:
+            return
+        if not CommissionRequest.objects.filter(participant_filter(self.request.user), pk=commission.pk).exists():
+            raise PermissionDenied('You are not a party to this commission.')
+    
+    def perform_create(self, serializer):
+        self.check_commission(serializer)
+        super().perform_create(serializer)
+    
+    def perform_update(self, serializer):
+        self.check_commission(serializer)
+        super().perform_update(serializer)
+
+class CommissionRequestViewSet(ConditionalGetMixin, SparseFieldsetMixin, IncludeMixin, viewsets.ModelViewSet):
     queryset = CommissionRequest.objects.all()
     serializer_class = CommissionRequestSerializer
+    list_serializer_class = CommissionRequestListSerializer
     permission_classes = [IsAuthenticated]
+    etag_dependencies = ('client', 'artist', 'proposal')
+    includes = {
+        'client': ('client', User.objects.all(), PublicUserSerializer),
+        'artist': ('artist', ArtistProfile.objects.all(), ArtistProfileListSerializer),
+    }
+    
+    def get_queryset(self):
+        """
+        The user's inbox: `?role=client|artist` picks sent or received requests, `?status=a,b` narrows it
+        """
+        role = self.request.query_params.get('role') or None
+        if role not in (None, *ROLES):
+            raise ValidationError({'role': [f'Choose one of: {", ".join(ROLES)}.']})
+        statuses = [status for status in self.request.query_params.get('status', '').split(',') if status]
+        queryset = inbox(self.request.user, role, statuses)
+        # Lists load only what the list serializer reads (SparseFieldsetMixin); the full
+        # serializer also reads the artist and the proposal
+        if self.action != 'list':
+            queryset = queryset.select_related('client', 'artist', 'proposal')
+        return queryset
+    
+    def perform_create(self, serializer):
+        # Requests are always sent by the signed-in user
+        serializer.save(client=self.request.user)
+    
+    @action(detail=False)
+    def summary(self, request):
+        return Response(get_summary(request.user))
+    
+    @action(detail=True)
+    def ledger(self, request, pk=None):
+        """
+        The commission's payments, oldest first, each with the total received up to and including it
+        """
+        return Response(CommissionLedgerSerializer(get_ledger(self.get_object())).data)
+    
+    @action(detail=True, methods=['post'])
+    def transition(self, request, pk=None):
+        """
+        Moves the commission along its workflow: {"transition": "accept"}
+        Answers 409 if the commission is not in a status the transition starts from
+        """
+        commission = self.get_object()
+        params = TransitionSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        commission = transition_request(commission, params.validated_data['transition'], request.user)
+        return Response(self.get_serializer(commission).data)
+    
+    @action(detail=False, methods=['post'], url_path='bulk-transition', permission_classes=[IsAdminUser])
+    def bulk_transition(self, request):
+        params = BulkTransitionSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+        if data.get('older_than_days'):
+            commissions = stale_requests(data['older_than_days'])
+        else:
+            commissions = CommissionRequest.objects.all()
+        if data.get('ids'):
+            commissions = commissions.filter(pk__in=data['ids'])
+        changed = bulk_transition_requests(commissions, data['transition'])
+        return Response({'transition': data['transition'], 'changed': changed})
 
-class CommissionProposalViewSet(viewsets.ModelViewSet):
-    queryset = CommissionProposal.objects.all()
+class CommissionProposalViewSet(ParticipantScopedMixin, ConditionalGetMixin, viewsets.ModelViewSet):
+    queryset = CommissionProposal.objects.select_related('commission_request__artist')
     serializer_class = CommissionProposalSerializer
     permission_classes = [IsAuthenticated]
+    etag_dependencies = ('commission_request', 'commission_request__artist')
 
-class CommissionContractViewSet(viewsets.ModelViewSet):
-    queryset = CommissionContract.objects.all()
+class CommissionContractViewSet(ParticipantScopedMixin, viewsets.ModelViewSet):
+    queryset = CommissionContract.objects.select_related('commission_request__client', 'commission_request__artist')
     serializer_class = CommissionContractSerializer
     permission_classes = [IsAuthenticated]
+    
+    @action(detail=True, methods=['post'])
+    def sign(self, request, pk=None):
+        """
+        Signs the contract as the calling client or artist
+        """
+        contract = sign_contract(self.get_object(), request.user)
+        return Response(self.get_serializer(contract).data)
 
-class CommissionMilestoneViewSet(viewsets.ModelViewSet):
-    queryset = CommissionMilestone.objects.all()
+class CommissionMilestoneViewSet(ParticipantScopedMixin, ConditionalGetMixin, viewsets.ModelViewSet):
+    queryset = CommissionMilestone.objects.select_related('commission_request')
     serializer_class = CommissionMilestoneSerializer
     permission_classes = [IsAuthenticated]
+    etag_dependencies = ('commission_request',)
+    
+    @action(detail=True, methods=['post'])
+    def transition(self, request, pk=None):
+        milestone = self.get_object()
+        params = TransitionSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        milestone = transition_milestone(
+            milestone, params.validated_data['transition'], request.user, params.validated_data['feedback'],
+        )
+        return Response(self.get_serializer(milestone).data)
+
+class ReconciliationReportView(generics.ListAPIView):
+    """
+    Finance view of the latest payment reconciliation (or ?run=<id>): run totals, mismatch counts
+    by kind and a page of the mismatches themselves (?kind= narrows them)
+    """
+    serializer_class = PaymentMismatchSerializer
+    permission_classes = [IsAdminUser]
+    
+    def get_run(self):
+        if not hasattr(self, '_run'):
+            runs = ReconciliationRun.objects.filter(finished_at__isnull=False)
+            if self.request.query_params.get('run'):
+                try:
+                    runs = runs.filter(pk=int(self.request.query_params['run']))
+                except ValueError:
+                    raise ValidationError({'run': ['A valid integer is required.']})
+            self._run = runs.first()
+            if self._run is None:
+                raise NotFound('No finished reconciliation run found.')
+        return self._run
+    
+    def get_queryset(self):
+        mismatches = self.get_run().mismatches.select_related('commission_request', 'milestone')
+        if self.request.query_params.get('kind'):
+            mismatches = mismatches.filter(kind=self.request.query_params['kind'])
+        return mismatches.order_by('kind', 'commission_request_id', 'pk')
+    
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        run = self.get_run()
+        by_kind = run.mismatches.order_by('kind').values('kind').annotate(
+            count=Count('pk'), expected=Sum('expected'), actual=Sum('actual'),
+        )
+        response.data = {
+            'run': ReconciliationRunSerializer(run).data,
+            'by_kind': MismatchTotalSerializer(by_kind, many=True).data,
+            **response.data,
+        }
+        return response
@@ -0,0 +1,229 @@
+import datetime
+
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import APIException, PermissionDenied, ValidationError
+
+from outbox.events import build_status_change, record_status_change
+from outbox.models import OutboxEvent
+
+from .inbox import invalidate_summaries
+from .models import CommissionContract, CommissionMilestone, CommissionRequest
+from .sla import record_approval, record_submission
+
+
+class TransitionConflict(APIException):
+    status_code = 409
+    default_detail = 'This change is not allowed from the current status.'
+    default_code = 'invalid_transition'
+
+
+class Transition:
+    """
+    One allowed status change: from any of `sources` to `target`, made by one of `actors`
+    ('client' or 'artist'; staff may make any transition)
+
+    Transitions with a `guard` depend on other rows (a signed contract, approved milestones...), so
+    they run with the commission request locked by select_for_update. The rest are a single
+    compare-and-set UPDATE ... WHERE status=<status just read>, which takes no lock up front.
+    """
+    def __init__(self, sources, target, actors, guard=None, stamp=None):
+        self.sources = sources
+        self.target = target
+        self.actors = actors
+        self.guard = guard
+        self.stamp = stamp
+
+
+# Guards; each gets the locked commission request and raises TransitionConflict to refuse
+
+def require_proposal(commission):
+    if not hasattr(commission, 'proposal'):
+        raise TransitionConflict('Send a proposal before accepting the request.')
+
+
+def require_signed_contract(commission):
+    contract = getattr(commission, 'contract', None)
+    if contract is None or not (contract.client_signed and contract.artist_signed):
+        raise TransitionConflict('Both parties must sign the contract before work starts.')
+
+
+def require_approved_milestones(commission):
+    if commission.milestones.exclude(status='approved').exists():
+        raise TransitionConflict('Every milestone must be approved first.')
+
+
+def require_settled_payments(commission):
+    if commission.payments.filter(status__in=['pending', 'processing']).exists():
+        raise TransitionConflict('Outstanding payments must be settled before delivery.')
+
+
+def require_request_in_progress(commission):
+    if commission.status != 'in_progress':
+        raise TransitionConflict('Milestones can only move while the commission is in progress.')
+
+
+# request → proposal → contract → milestones → payment → delivery
+REQUEST_TRANSITIONS = {
+    'review': Transition(['submitted'], 'under_review', ['artist']),
+    'accept': Transition(['submitted', 'under_review'], 'accepted', ['artist'], guard=require_proposal),
+    'reject': Transition(['submitted', 'under_review'], 'rejected', ['artist']),
+    'start': Transition(['accepted'], 'in_progress', ['artist'], guard=require_signed_contract),
+    'complete': Transition(['in_progress'], 'completed', ['artist'], guard=require_approved_milestones),
+    'deliver': Transition(['completed'], 'delivered', ['client'], guard=require_settled_payments),
+    'cancel': Transition(['submitted', 'under_review', 'accepted', 'in_progress'], 'cancelled', ['client']),
+}
+
+MILESTONE_TRANSITIONS = {
+    'start': Transition(['pending'], 'in_progress', ['artist'], guard=require_request_in_progress),
+    'submit': Transition(
+        ['in_progress', 'revision_requested'], 'completed', ['artist'],
+        guard=require_request_in_progress, stamp='completed_at',
+    ),
+    'approve': Transition(['completed'], 'approved', ['client'], stamp='approved_at'),
+    'request_revision': Transition(['completed'], 'revision_requested', ['client']),
+}
+
+
+def get_transition(transitions, name):
+    try:
+        return transitions[name]
+    except KeyError:
+        raise ValidationError({'transition': [f'Choose one of: {", ".join(transitions)}.']})
+
+
+def check_actor(transition, commission, user):
+    if user.is_staff:
+        return
+    roles = set()
+    if commission.client_id == user.pk:
+        roles.add('client')
+    if commission.artist.user_id == user.pk:
+        roles.add('artist')
+    if not roles & set(transition.actors):
+        raise PermissionDenied(f'Only the {" or ".join(transition.actors)} can do this.')
+
+
+def apply(model, obj, transition, old_status, **changes):
+    """
+    Compare-and-set write: succeeds only if the row still has the status the caller saw
+    """
+    now = timezone.now()
+    updates = {'status': transition.target, 'updated_at': now, **changes}
+    if transition.stamp:
+        updates[transition.stamp] = now
+    if not model.objects.filter(pk=obj.pk, status=old_status).update(**updates):
+        raise TransitionConflict('The status changed in the meantime; reload and try again.')
+    for field, value in updates.items():
+        setattr(obj, field, value)
+    obj._saved_status = transition.target
+    record_status_change(obj, old_status, transition.target)
+    return obj
+
+
+def transition_request(commission, name, user):
+    transition = get_transition(REQUEST_TRANSITIONS, name)
+    check_actor(transition, commission, user)
+    with transaction.atomic():
+        if transition.guard:
+            commission = CommissionRequest.objects.select_for_update().get(pk=commission.pk)
+        else:
+            commission.refresh_from_db(fields=['status'])
+        if commission.status not in transition.sources:
+            raise TransitionConflict(f'Cannot {name} a commission that is {commission.get_status_display().lower()}.')
+        if transition.guard:
+            transition.guard(commission)
+        commission = apply(CommissionRequest, commission, transition, commission.status)
+        invalidate_summaries([commission])
+        return commission
+
+
+def transition_milestone(milestone, name, user, feedback=''):
+    transition = get_transition(MILESTONE_TRANSITIONS, name)
+    check_actor(transition, milestone.commission_request, user)
+    commission = milestone.commission_request
+    with transaction.atomic():
+        if transition.guard:
+            # Lock the parent so the commission can't be cancelled or completed underneath this change
+            commission = CommissionRequest.objects.select_for_update().get(pk=milestone.commission_request_id)
+            transition.guard(commission)
+            milestone = CommissionMilestone.objects.select_for_update().get(pk=milestone.pk)
+        else:
+            milestone.refresh_from_db(fields=['status'])
+        old_status = milestone.status
+        if old_status not in transition.sources:
+            raise TransitionConflict(f'Cannot {name.replace("_", " ")} a milestone that is {milestone.get_status_display().lower()}.')
+        changes = {'client_feedback': feedback} if name == 'request_revision' else {}
+        milestone = apply(CommissionMilestone, milestone, transition, old_status, **changes)
+        # Reliability stats count a milestone's first delivery and its approval
+        if name == 'submit' and old_status == 'in_progress':
+            record_submission(milestone, commission.artist_id)
+        elif name == 'approve':
+            record_approval(milestone, commission.artist_id)
+        # The client's count of milestones awaiting approval
+        invalidate_summaries([commission])
+        return milestone
+
+
+def sign_contract(contract, user):
+    """
+    Records the caller's own signature; nobody, staff included, can sign for the other party
+    """
+    commission = contract.commission_request
+    if commission.client_id == user.pk:
+        party = 'client'
+    elif commission.artist.user_id == user.pk:
+        party = 'artist'
+    else:
+        raise PermissionDenied('Only the client or the artist can sign this contract.')
+    with transaction.atomic():
+        # Same lock as the start guard, so it never sees half of a signature
+        CommissionRequest.objects.select_for_update().get(pk=commission.pk)
+        contract = CommissionContract.objects.select_for_update().get(pk=contract.pk)
+        if not getattr(contract, f'{party}_signed'):
+            setattr(contract, f'{party}_signed', True)
+            setattr(contract, f'{party}_signed_at', timezone.now())
+            contract.save(update_fields=[f'{party}_signed', f'{party}_signed_at'])
+        return contract
+
+
+def bulk_transition_requests(queryset, name, batch_size=500):
+    """
+    Applies an unguarded transition to every eligible commission in `queryset` (staff only)
+    Works in batches: lock the batch, one UPDATE per source status, one INSERT of outbox events
+    Returns the number of commissions changed
+    """
+    transition = get_transition(REQUEST_TRANSITIONS, name)
+    if transition.guard:
+        raise ValidationError({'transition': [f'{name} has preconditions and cannot be applied in bulk.']})
+
+    changed, last_pk = 0, 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                queryset.filter(status__in=transition.sources, pk__gt=last_pk)
+                .select_for_update(of=('self',))
+                .only('pk', 'status', 'client_id', 'artist_id', 'title')
+                .order_by('pk')[:batch_size]
+            )
+            if not batch:
+                return changed
+            now = timezone.now()
+            events = []
+            for status in {commission.status for commission in batch}:
+                CommissionRequest.objects.filter(
+                    pk__in=[commission.pk for commission in batch if commission.status == status], status=status,
+                ).update(status=transition.target, updated_at=now)
+            for commission in batch:
+                events.append(build_status_change(commission, commission.status, transition.target))
+            OutboxEvent.objects.bulk_create(events)
+            invalidate_summaries(batch)
+        changed += len(batch)
+        last_pk = batch[-1].pk
+
+
+def stale_requests(days):
+    """
+    Commissions that haven't changed for `days` days
+    """
+    return CommissionRequest.objects.filter(updated_at__lt=timezone.now() - datetime.timedelta(days=days))
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("community", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="forum",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True,
+                help_text="Last time forum details were modified (feeds post ETags)",
+            ),
+        ),
+    ]
@@ -30,6 +30,13 @@ class Forum(models.Model):
         auto_now_add=True,
         help_text="When this forum was created"
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        help_text="Last time forum details were modified (feeds post ETags)"
+    )
+    
+    class Meta:
+        db_table = 'forums'
 
 class ForumPost(models.Model):
     """
@@ -174,6 +181,10 @@ class ForumComment(models.Model):
         auto_now=True,
         help_text="Last time comment was edited"
     )
+    
+    class Meta:
+        db_table = 'forum_comments'
+        ordering = ['created_at']
 
 class PostLike(models.Model):
     """
@@ -198,6 +209,10 @@ class PostLike(models.Model):
         auto_now_add=True,
         help_text="When the like was created"
     )
+    
+    class Meta:
+        db_table = 'post_likes'
+        unique_together = ['user', 'post']
 
 class CommentLike(models.Model):
     """
@@ -222,6 +237,10 @@ class CommentLike(models.Model):
         auto_now_add=True,
         help_text="When the like was created"
     )
+    
+    class Meta:
+        db_table = 'comment_likes'
+        unique_together = ['user', 'comment']
 
 class JobPosting(models.Model):
     """
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from artwala_backend.fieldsets import SparseFieldsetSerializerMixin
 from .models import Forum, ForumPost, ForumComment, PostLike
 
 class ForumSerializer(serializers.ModelSerializer):
@@ -11,7 +12,7 @@ class ForumSerializer(serializers.ModelSerializer):
     def get_posts_count(self, obj):
         return obj.posts.count()
 
-class ForumPostSerializer(serializers.ModelSerializer):
+class ForumPostSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     author_name = serializers.CharField(source='author.get_full_name', read_only=True)
     forum_name = serializers.CharField(source='forum.name', read_only=True)
     comments_count = serializers.SerializerMethodField()
@@ -23,6 +24,17 @@ class ForumPostSerializer(serializers.ModelSerializer):
     def get_comments_count(self, obj):
         return obj.comments.count()
 
+class ForumPostListSerializer(ForumPostSerializer):
+    """
+    Compact post summary for forum listings
+    Leaves out the post body and attached images shown on the post page
+    """
+    class Meta:
+        model = ForumPost
+        fields = ['id', 'forum', 'forum_name', 'author', 'author_name', 'title', 'slug', 
+                 'post_type', 'tags', 'is_pinned', 'is_locked', 'views_count', 'likes_count', 
+                 'comments_count', 'created_at', 'updated_at']
+
 class ForumCommentSerializer(serializers.ModelSerializer):
     author_name = serializers.CharField(source='author.get_full_name', read_only=True)
     post_title = serializers.CharField(source='post.title', read_only=True)
@@ -1,3 +1,64 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from .models import Forum, ForumComment, ForumPost
+
+User = get_user_model()
+
+
+class ForumPostFixtureMixin:
+    def setUp(self):
+        self.author = User.objects.create_user(
+            email='author@example.com', username='author', password='pw12345678', phone='+911234567890',
+        )
+        self.forum = Forum.objects.create(name='Techniques', slug='techniques', description='How-tos')
+        self.post = ForumPost.objects.create(
+            forum=self.forum, author=self.author, title='Glazing', slug='glazing', content='Thin layers',
+        )
+        self.api = APIClient()
+
+
+class ForumPostConditionalGetTests(ForumPostFixtureMixin, TestCase):
+    url = '/api/community/posts/glazing/'
+    
+    def test_new_comment_changes_the_post_etag(self):
+        response = self.api.get(self.url)
+        self.assertEqual(response.json()['comments_count'], 0)
+        self.assertEqual(self.api.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        ForumComment.objects.create(post=self.post, author=self.author, content='Nice')
+        response = self.api.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['comments_count'], 1)
+    
+    def test_forum_rename_changes_the_list_etag(self):
+        response = self.api.get('/api/community/posts/')
+        self.forum.name = 'Methods'
+        self.forum.save()
+        self.assertEqual(self.api.get('/api/community/posts/', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+
+class ForumPostIncludeTests(ForumPostFixtureMixin, TestCase):
+    def test_included_authors_leave_out_contact_details(self):
+        response = self.api.get('/api/community/posts/glazing/', {'include': 'author,forum'})
+        self.assertEqual(response.status_code, 200)
+        author, = response.json()['included']['author']
+        self.assertEqual((author['id'], author['username']), (self.author.pk, 'author'))
+        self.assertFalse({'email', 'phone', 'location'} & author.keys())
+        self.assertEqual(response.json()['included']['forum'][0]['slug'], 'techniques')
+    
+    def test_includes_are_loaded_once_per_list(self):
+        for number in range(3):
+            ForumPost.objects.create(forum=self.forum, author=self.author, title=f'Post {number}', slug=f'post-{number}', content='Text')
+        with CaptureQueriesContext(connection) as plain:
+            self.api.get('/api/community/posts/')
+        with CaptureQueriesContext(connection) as included:
+            response = self.api.get('/api/community/posts/', {'include': 'author'})
+        # One batched query however many posts share the author
+        self.assertEqual(len(included), len(plain) + 1)
+        self.assertEqual(len(response.json()['included']['author']), 1)
+    
+    def test_unknown_include_is_refused(self):
+        self.assertEqual(self.api.get('/api/community/posts/', {'include': 'comments'}).status_code, 400)
@@ -1,7 +1,12 @@
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
+from artwala_backend.conditional import ConditionalGetMixin
+from artwala_backend.fieldsets import SparseFieldsetMixin
+from artwala_backend.includes import IncludeMixin
+from users.models import User
+from users.serializers import PublicUserSerializer
 from .models import Forum, ForumPost, JobPosting
-from .serializers import ForumSerializer, ForumPostSerializer
+from .serializers import ForumSerializer, ForumPostSerializer, ForumPostListSerializer
 
 class ForumViewSet(viewsets.ModelViewSet):
     queryset = Forum.objects.all()
@@ -9,17 +14,23 @@ class ForumViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticatedOrReadOnly]
     lookup_field = 'slug'
 
-class ForumPostViewSet(viewsets.ModelViewSet):
+class ForumPostViewSet(ConditionalGetMixin, SparseFieldsetMixin, IncludeMixin, viewsets.ModelViewSet):
     queryset = ForumPost.objects.all()
     serializer_class = ForumPostSerializer
+    list_serializer_class = ForumPostListSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     lookup_field = 'slug'
+    etag_dependencies = ('author', 'forum', 'comments')
+    includes = {
+        'author': ('author', User.objects.all(), PublicUserSerializer),
+        'forum': ('forum', Forum.objects.all(), ForumSerializer),
+    }
 
 # Alias for posts endpoint
 class PostViewSet(ForumPostViewSet):
     pass
 
-class JobPostingViewSet(viewsets.ModelViewSet):
+class JobPostingViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = JobPosting.objects.all()
     permission_classes = [IsAuthenticatedOrReadOnly]
     lookup_field = 'slug'
@@ -0,0 +1,9 @@
+from django.contrib import admin
+from .models import OutboxEvent
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    list_display = ('id', 'event_type', 'aggregate', 'aggregate_id', 'position', 'created_at', 'relayed_at')
+    list_filter = ('event_type', 'aggregate')
+    search_fields = ('aggregate_id',)
+    readonly_fields = ('event_type', 'aggregate', 'aggregate_id', 'payload', 'position', 'created_at', 'relayed_at')
@@ -0,0 +1,75 @@
+from django.db import transaction
+
+from .models import OutboxEvent
+
+
+def build_event(instance, event_type, payload):
+    return OutboxEvent(
+        event_type=event_type,
+        aggregate=instance._meta.label_lower,
+        aggregate_id=str(instance.pk),
+        payload=payload,
+    )
+
+
+def build_status_change(instance, old_status, new_status):
+    return build_event(instance, f'{instance.outbox_topic}.status_changed', {
+        'from': old_status,
+        'to': new_status,
+        **instance.get_outbox_snapshot(),
+    })
+
+
+def record(instance, event_type, payload):
+    """
+    Writes a domain event for `instance`; call it inside the transaction that makes the change
+    """
+    event = build_event(instance, event_type, payload)
+    event.save()
+    return event
+
+
+def record_status_change(instance, old_status, new_status):
+    event = build_status_change(instance, old_status, new_status)
+    event.save()
+    return event
+
+
+class StatusEventsMixin:
+    """
+    Model mixin that records a '<outbox_topic>.status_changed' event whenever save() changes `status`
+    The event is written in the same transaction as the row. Queryset.update() bypasses save(), so
+    code changing status that way must call record_status_change() itself.
+    """
+    outbox_topic = None
+    # Fields copied into every event so consumers rarely need to read the row back
+    outbox_snapshot_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'status' in field_names:
+            instance._saved_status = instance.status
+        return instance
+
+    def get_outbox_snapshot(self):
+        return {field: getattr(self, field) for field in self.outbox_snapshot_fields}
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'status' not in update_fields:
+            return super().save(*args, **kwargs)
+
+        adding = self._state.adding
+        with transaction.atomic(using=kwargs.get('using')):
+            if adding:
+                old_status = None
+            elif '_saved_status' in self.__dict__:
+                old_status = self._saved_status
+            else:
+                # Loaded without its status (e.g. .only()); read the stored value
+                old_status = type(self)._default_manager.filter(pk=self.pk).values_list('status', flat=True).first()
+            super().save(*args, **kwargs)
+            if adding or old_status != self.status:
+                record_status_change(self, old_status, self.status)
+        self._saved_status = self.status
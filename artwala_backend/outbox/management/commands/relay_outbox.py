@@ -0,0 +1,29 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from outbox.relay import prune, relay_pending
+
+
+class Command(BaseCommand):
+    help = 'Publish pending outbox events to the event feed and OUTBOX_HANDLERS in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Events published per transaction')
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep relaying every OUTBOX_RELAY_INTERVAL seconds until interrupted',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            relayed = relay_pending(options['batch_size'])
+            pruned = prune()
+            self.stdout.write(self.style.SUCCESS(f'Relayed {relayed} events, pruned {pruned}'))
+            if not options['loop']:
+                return
+            try:
+                time.sleep(settings.OUTBOX_RELAY_INTERVAL)
+            except KeyboardInterrupt:
+                return
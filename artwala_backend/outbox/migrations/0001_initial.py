@@ -0,0 +1,119 @@
+# Generated by Django 5.2.4 on 2026-10-19 12:36
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="OutboxRelayState",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "last_position",
+                    models.PositiveBigIntegerField(
+                        default=0, help_text="Highest position handed out so far"
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "outbox_relay_state",
+            },
+        ),
+        migrations.CreateModel(
+            name="OutboxEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "event_type",
+                    models.CharField(
+                        help_text="Dotted event name, e.g. 'order.status_changed'",
+                        max_length=100,
+                    ),
+                ),
+                (
+                    "aggregate",
+                    models.CharField(
+                        help_text="Model label of the changed object, e.g. 'products.order'",
+                        max_length=100,
+                    ),
+                ),
+                (
+                    "aggregate_id",
+                    models.CharField(
+                        help_text="Primary key of the changed object", max_length=64
+                    ),
+                ),
+                (
+                    "payload",
+                    models.JSONField(
+                        default=dict,
+                        encoder=django.core.serializers.json.DjangoJSONEncoder,
+                        help_text="Event details: the old and new status plus a snapshot of the object's key fields",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, help_text="When the change was made"
+                    ),
+                ),
+                (
+                    "position",
+                    models.PositiveBigIntegerField(
+                        blank=True,
+                        help_text="Place in the published stream; null until relayed",
+                        null=True,
+                        unique=True,
+                    ),
+                ),
+                (
+                    "relayed_at",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="When the relay published this event",
+                        null=True,
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "outbox_events",
+                "indexes": [
+                    models.Index(
+                        fields=["event_type", "position"],
+                        name="outbox_type_position_idx",
+                    ),
+                    models.Index(
+                        fields=["aggregate", "aggregate_id", "id"],
+                        name="outbox_aggregate_idx",
+                    ),
+                    models.Index(
+                        fields=["relayed_at", "id"], name="outbox_pending_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,75 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+
+class OutboxEvent(models.Model):
+    """
+    A domain event written in the same transaction as the change it describes
+    The relay gives each event a gap-free position in commit order; consumers read the feed by position
+    """
+    # What happened
+    event_type = models.CharField(
+        max_length=100,
+        help_text="Dotted event name, e.g. 'order.status_changed'"
+    )
+    aggregate = models.CharField(
+        max_length=100,
+        help_text="Model label of the changed object, e.g. 'products.order'"
+    )
+    aggregate_id = models.CharField(
+        max_length=64,
+        help_text="Primary key of the changed object"
+    )
+    payload = models.JSONField(
+        default=dict,
+        encoder=DjangoJSONEncoder,
+        help_text="Event details: the old and new status plus a snapshot of the object's key fields"
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        help_text="When the change was made"
+    )
+
+    # Relay state
+    position = models.PositiveBigIntegerField(
+        blank=True,
+        null=True,
+        unique=True,
+        help_text="Place in the published stream; null until relayed"
+    )
+    relayed_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        help_text="When the relay published this event"
+    )
+
+    def __str__(self):
+        return f"{self.event_type} {self.aggregate}#{self.aggregate_id}"
+
+    class Meta:
+        db_table = 'outbox_events'
+        indexes = [
+            # Feed filtered by event type, and per-object history
+            models.Index(fields=['event_type', 'position'], name='outbox_type_position_idx'),
+            models.Index(fields=['aggregate', 'aggregate_id', 'id'], name='outbox_aggregate_idx'),
+            # Relay scans for events not yet published
+            models.Index(fields=['relayed_at', 'id'], name='outbox_pending_idx'),
+        ]
+
+
+class OutboxRelayState(models.Model):
+    """
+    Single row holding the last published position
+    Relays lock it, so only one at a time assigns positions and the stream never has gaps
+    """
+    last_position = models.PositiveBigIntegerField(
+        default=0,
+        help_text="Highest position handed out so far"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Outbox relay at {self.last_position}"
+
+    class Meta:
+        db_table = 'outbox_relay_state'
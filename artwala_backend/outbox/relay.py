@@ -0,0 +1,55 @@
+import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import OutboxEvent, OutboxRelayState
+
+
+def get_handlers():
+    return [import_string(path) for path in settings.OUTBOX_HANDLERS]
+
+
+def relay_batch(batch_size, handlers=None):
+    """
+    Publishes up to `batch_size` unrelayed events: numbers them in id order and passes them to the handlers
+    Runs in one transaction under the relay-state lock, so a failing handler leaves the batch to be retried
+    (delivery is at least once) and concurrent relays never hand out the same position twice
+    """
+    handlers = get_handlers() if handlers is None else handlers
+    with transaction.atomic():
+        state = OutboxRelayState.objects.select_for_update().filter(pk=1).first()
+        if state is None:
+            state = OutboxRelayState.objects.create(pk=1)
+        events = list(OutboxEvent.objects.filter(relayed_at__isnull=True).order_by('pk')[:batch_size])
+        if not events:
+            return 0
+
+        now = timezone.now()
+        for position, event in enumerate(events, start=state.last_position + 1):
+            event.position, event.relayed_at = position, now
+        OutboxEvent.objects.bulk_update(events, ['position', 'relayed_at'])
+        state.last_position = events[-1].position
+        state.save(update_fields=['last_position', 'updated_at'])
+        for handler in handlers:
+            handler(events)
+    return len(events)
+
+
+def relay_pending(batch_size, handlers=None):
+    relayed = 0
+    while True:
+        count = relay_batch(batch_size, handlers)
+        relayed += count
+        if count < batch_size:
+            return relayed
+
+
+def prune(now=None):
+    """
+    Deletes published events older than OUTBOX_RETENTION_DAYS; the feed can be replayed back that far
+    """
+    cutoff = (now or timezone.now()) - datetime.timedelta(days=settings.OUTBOX_RETENTION_DAYS)
+    return OutboxEvent.objects.filter(relayed_at__lt=cutoff).delete()[0]
@@ -0,0 +1,7 @@
+from rest_framework import serializers
+from .models import OutboxEvent
+
+class OutboxEventSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = OutboxEvent
+        fields = ['position', 'event_type', 'aggregate', 'aggregate_id', 'payload', 'created_at']
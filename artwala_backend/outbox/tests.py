@@ -0,0 +1,74 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from products.models import Order
+from .models import OutboxEvent
+from .relay import relay_pending
+
+User = get_user_model()
+
+
+class OutboxTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='buyer@example.com', username='buyer', password='pw12345678')
+    
+    def create_order(self, number='ORD-1'):
+        return Order.objects.create(
+            user=self.user, order_number=number, total_amount=Decimal('120.00'),
+            shipping_address={'city': 'Pune'}, payment_method='upi',
+        )
+    
+    def test_status_changes_are_recorded(self):
+        order = self.create_order()
+        order.status = 'confirmed'
+        order.save()
+        order.total_amount = Decimal('99.00')
+        order.save()
+        Order.objects.get(pk=order.pk).save(update_fields=['payment_status'])
+        
+        events = list(OutboxEvent.objects.order_by('pk').values_list('event_type', 'aggregate_id', 'payload'))
+        self.assertEqual([payload['to'] for _, _, payload in events], ['pending', 'confirmed'])
+        self.assertEqual(events[1][:2], ('order.status_changed', str(order.pk)))
+        self.assertEqual(events[1][2]['from'], 'pending')
+        self.assertEqual(events[1][2]['order_number'], 'ORD-1')
+    
+    def test_rolled_back_changes_leave_no_event(self):
+        order = self.create_order()
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            order.status = 'cancelled'
+            order.save()
+            raise RuntimeError
+        self.assertEqual(OutboxEvent.objects.count(), 1)
+    
+    def test_feed_pages_through_relayed_events(self):
+        for number in range(5):
+            self.create_order(f'ORD-{number}')
+        self.assertEqual(relay_pending(batch_size=2), 5)
+        self.create_order('ORD-unrelayed')
+        
+        client = APIClient()
+        client.force_authenticate(User.objects.create_superuser(
+            email='staff@example.com', username='staff', password='pw12345678',
+        ))
+        first = client.get('/api/events/', {'limit': 3}).json()
+        self.assertEqual([event['position'] for event in first['results']], [1, 2, 3])
+        self.assertTrue(first['has_more'])
+        rest = client.get('/api/events/', {'after': first['next']}).json()
+        self.assertEqual([event['position'] for event in rest['results']], [4, 5])
+        self.assertFalse(rest['has_more'])
+        self.assertEqual(client.get('/api/events/', {'type': 'commission_request.status_changed'}).json()['results'], [])
+    
+    def test_handler_failure_leaves_the_batch_for_a_retry(self):
+        self.create_order()
+        def broken(events):
+            raise ConnectionError
+        with self.assertRaises(ConnectionError):
+            relay_pending(batch_size=10, handlers=[broken])
+        self.assertFalse(OutboxEvent.objects.filter(position__isnull=False).exists())
+        received = []
+        relay_pending(batch_size=10, handlers=[received.extend])
+        self.assertEqual([event.position for event in received], [1])
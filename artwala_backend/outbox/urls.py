@@ -0,0 +1,6 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('', views.EventFeedView.as_view(), name='event-feed'),
+]
@@ -0,0 +1,34 @@
+from django.conf import settings
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from .models import OutboxEvent
+from .serializers import OutboxEventSerializer
+
+class EventFeedView(APIView):
+    """
+    Published domain events in stream order, read with a cursor: ?after=<position>&limit=&type=a,b
+    Pass the returned `next` as `after` to continue; replaying from 0 returns everything still retained
+    """
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request):
+        try:
+            after = int(request.query_params.get('after', 0))
+            limit = min(max(int(request.query_params.get('limit', 100)), 1), settings.OUTBOX_FEED_MAX_LIMIT)
+        except ValueError:
+            raise ValidationError({'detail': 'after and limit must be integers.'})
+        
+        events = OutboxEvent.objects.filter(position__gt=after)
+        if request.query_params.get('type'):
+            events = events.filter(event_type__in=request.query_params['type'].split(','))
+        # One row past the page tells us whether there is more without a COUNT
+        page = list(events.order_by('position')[:limit + 1])
+        has_more = len(page) > limit
+        page = page[:limit]
+        return Response({
+            'results': OutboxEventSerializer(page, many=True).data,
+            'next': page[-1].position if page else after,
+            'has_more': has_more,
+        })
@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import Client
+
+from artwala_backend.middleware import COMPRESSORS
+
+DEFAULT_ENDPOINTS = [
+    '/api/products/products/',
+    '/api/products/categories/',
+    '/api/artists/profiles/',
+    '/api/chapters/chapters/',
+    '/api/community/posts/',
+]
+
+
+class Command(BaseCommand):
+    help = 'Measure bytes saved and CPU cost of each available compression codec per endpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('endpoints', nargs='*', help='API paths to measure (defaults to the main list endpoints)')
+        parser.add_argument('--repeat', type=int, default=50, help='Compressions per endpoint and codec')
+
+    def handle(self, *args, **options):
+        client = Client()
+        self.stdout.write(f"{'endpoint':<34}{'codec':<7}{'bytes':>9}{'compressed':>12}{'saved':>8}{'ms':>8}")
+        for endpoint in options['endpoints'] or DEFAULT_ENDPOINTS:
+            # Fetch uncompressed so every codec sees the same body
+            response = client.get(endpoint, HTTP_ACCEPT_ENCODING='identity')
+            if response.status_code != 200:
+                self.stdout.write(self.style.WARNING(f'{endpoint}: HTTP {response.status_code}, skipped'))
+                continue
+
+            body = response.content
+            for coding, compressor_class in COMPRESSORS.items():
+                start = time.perf_counter()
+                for _ in range(options['repeat']):
+                    compressor = compressor_class()
+                    compressed = compressor.compress(body) + compressor.finish()
+                duration = (time.perf_counter() - start) / options['repeat'] * 1000
+                saved = 100 * (1 - len(compressed) / len(body)) if body else 0
+                self.stdout.write(
+                    f'{endpoint:<34}{coding:<7}{len(body):>9}{len(compressed):>12}{saved:>7.0f}%{duration:>8.2f}'
+                )
+
+        self.stdout.write(self.style.SUCCESS('Benchmark complete'))
@@ -0,0 +1,63 @@
+import io
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from artwala_backend.parsers import ORJSONParser
+from artwala_backend.renderers import ORJSONRenderer, orjson
+from products.models import Product, Cart, Order
+from products.serializers import ProductSerializer, CartSerializer, OrderSerializer
+
+
+class Command(BaseCommand):
+    help = 'Compare stdlib and orjson rendering/parsing on the heaviest API payloads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=200, help='Renders per payload and renderer')
+        parser.add_argument('--limit', type=int, default=20, help='Rows per payload (defaults to one page)')
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(self.style.WARNING('orjson is not installed, ORJSONRenderer falls back to stdlib json'))
+
+        limit = options['limit']
+        payloads = {
+            'products list': ProductSerializer(
+                Product.objects.select_related('artist', 'category').prefetch_related('images')[:limit], many=True
+            ).data,
+            'cart': CartSerializer(
+                Cart.objects.prefetch_related('items__product__images')[:limit], many=True
+            ).data,
+            'orders list': OrderSerializer(
+                Order.objects.prefetch_related('items__product__images')[:limit], many=True
+            ).data,
+        }
+
+        self.stdout.write(f"{'payload':<16}{'bytes':>10}{'json ms':>10}{'orjson ms':>11}{'speedup':>9}"
+                          f"{'parse ms':>10}{'oparse ms':>11}{'speedup':>9}")
+        for name, data in payloads.items():
+            body = JSONRenderer().render(data)
+            render = self.measure(JSONRenderer().render, data, options['repeat'])
+            fast_render = self.measure(ORJSONRenderer().render, data, options['repeat'])
+            parse = self.measure(lambda b: JSONParser().parse(io.BytesIO(b)), body, options['repeat'])
+            fast_parse = self.measure(lambda b: ORJSONParser().parse(io.BytesIO(b)), body, options['repeat'])
+            self.stdout.write(
+                f"{name:<16}{len(body):>10}{render:>10.3f}{fast_render:>11.3f}{render / fast_render:>8.1f}x"
+                f"{parse:>10.3f}{fast_parse:>11.3f}{parse / fast_parse:>8.1f}x"
+            )
+
+        self.stdout.write(self.style.SUCCESS('Benchmark complete'))
+
+    def measure(self, func, arg, repeat):
+        """
+        Best-of-three average milliseconds per call
+        """
+        best = float('inf')
+        for _ in range(3):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                func(arg)
+            best = min(best, (time.perf_counter() - start) / repeat)
+        return best * 1000
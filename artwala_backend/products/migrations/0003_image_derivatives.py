@@ -0,0 +1,36 @@
+# Generated by Django 5.2.4 on 2026-10-19 12:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("artists", "0003_image_derivatives"),
+        ("products", "0002_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="category",
+            name="image_derivatives",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                editable=False,
+                help_text="Resized WebP/AVIF copies of the category image keyed by size and format (generated in the background)",
+            ),
+        ),
+        migrations.AddField(
+            model_name="productimage",
+            name="image_derivatives",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                editable=False,
+                help_text="Resized WebP/AVIF copies of the product image keyed by size and format (generated in the background)",
+            ),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0003_image_derivatives"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="category",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True,
+                help_text="Last time category details were modified (feeds product ETags)",
+            ),
+        ),
+        migrations.AddField(
+            model_name="orderitem",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True,
+                help_text="Last time this line was modified (feeds order ETags)",
+            ),
+        ),
+        migrations.AddField(
+            model_name="productimage",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True,
+                help_text="Last time this image or its details changed (feeds product ETags)",
+            ),
+        ),
+    ]
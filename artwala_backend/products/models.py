@@ -1,6 +1,7 @@
 from django.db import models
 from django.conf import settings
 from artists.models import ArtistProfile
+from outbox.events import StatusEventsMixin
 
 class Category(models.Model):
     """
@@ -29,6 +30,12 @@ class Category(models.Model):
         null=True,
         help_text="Representative image displayed for this category"
     )
+    image_derivatives = models.JSONField(
+        default=dict, 
+        blank=True,
+        editable=False,
+        help_text="Resized WebP/AVIF copies of the category image keyed by size and format (generated in the background)"
+    )
     
     # Hierarchical structure
     parent = models.ForeignKey(
@@ -49,6 +56,10 @@ class Category(models.Model):
         auto_now_add=True,
         help_text="When this category was first created"
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        help_text="Last time category details were modified (feeds product ETags)"
+    )
     
     def __str__(self):
         return self.name
@@ -201,6 +212,12 @@ class ProductImage(models.Model):
         upload_to='product_images/',
         help_text="The actual image file stored on server or CDN"
     )
+    image_derivatives = models.JSONField(
+        default=dict, 
+        blank=True,
+        editable=False,
+        help_text="Resized WebP/AVIF copies of the product image keyed by size and format (generated in the background)"
+    )
     alt_text = models.CharField(
         max_length=200, 
         blank=True,
@@ -216,6 +233,14 @@ class ProductImage(models.Model):
         default=0,
         help_text="Display order for image galleries (lower numbers shown first)"
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        help_text="Last time this image or its details changed (feeds product ETags)"
+    )
+    
+    class Meta:
+        db_table = 'product_images'
+        ordering = ['order']
 
 class ProductLike(models.Model):
     """
@@ -240,6 +265,10 @@ class ProductLike(models.Model):
         auto_now_add=True,
         help_text="When this like was created (for activity tracking)"
     )
+    
+    class Meta:
+        db_table = 'product_likes'
+        unique_together = ['user', 'product']
 
 class Cart(models.Model):
     """
@@ -262,6 +291,9 @@ class Cart(models.Model):
         auto_now=True,
         help_text="Last time items were added/removed from cart"
     )
+    
+    class Meta:
+        db_table = 'carts'
 
 class CartItem(models.Model):
     """
@@ -292,12 +324,19 @@ class CartItem(models.Model):
         auto_now_add=True,
         help_text="When this item was added to the cart"
     )
+    
+    class Meta:
+        db_table = 'cart_items'
+        unique_together = ['cart', 'product']
 
-class Order(models.Model):
+class Order(StatusEventsMixin, models.Model):
     """
     Completed purchase transactions
     Records all order details and tracks fulfillment status
     """
+    outbox_topic = 'order'
+    outbox_snapshot_fields = ('order_number', 'user_id', 'total_amount', 'payment_status')
+    
     # Order status progression
     STATUS_CHOICES = [
         ('pending', 'Pending'),       # Payment processing
@@ -393,3 +432,10 @@ class OrderItem(models.Model):
         decimal_places=2,
         help_text="Price paid for this item at time of purchase (preserves historical pricing)"
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        help_text="Last time this line was modified (feeds order ETags)"
+    )
+    
+    class Meta:
+        db_table = 'order_items'
@@ -1,17 +1,23 @@
 from rest_framework import serializers
+from artwala_backend.fieldsets import SparseFieldsetSerializerMixin
+from assets.serializers import ImageDerivativesField
 from .models import Category, Product, ProductImage, ProductLike, Cart, CartItem, Order, OrderItem
 
 class CategorySerializer(serializers.ModelSerializer):
+    image_derivatives = ImageDerivativesField()
+    
     class Meta:
         model = Category
         fields = '__all__'
 
 class ProductImageSerializer(serializers.ModelSerializer):
+    image_derivatives = ImageDerivativesField()
+    
     class Meta:
         model = ProductImage
         fields = '__all__'
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     images = ProductImageSerializer(many=True, read_only=True)
     artist_name = serializers.CharField(source='artist.display_name', read_only=True)
     category_name = serializers.CharField(source='category.name', read_only=True)
@@ -20,6 +26,21 @@ class ProductSerializer(serializers.ModelSerializer):
         model = Product
         fields = '__all__'
 
+class ProductListSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    """
+    Compact product card for listing pages
+    Leaves out the description and shipping details only the product page shows
+    """
+    images = ProductImageSerializer(many=True, read_only=True)
+    artist_name = serializers.CharField(source='artist.display_name', read_only=True)
+    category_name = serializers.CharField(source='category.name', read_only=True)
+    
+    class Meta:
+        model = Product
+        fields = ['id', 'artist', 'artist_name', 'category', 'category_name', 'title', 'slug', 
+                 'tags', 'price', 'medium', 'dimensions', 'is_original', 'status', 'featured', 
+                 'views_count', 'likes_count', 'images', 'created_at', 'updated_at']
+
 class ProductLikeSerializer(serializers.ModelSerializer):
     class Meta:
         model = ProductLike
@@ -1,3 +1,271 @@
-from django.test import TestCase
+import datetime
+import gzip
+import io
+import uuid
+from decimal import Decimal
+from unittest import skipIf
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from artwala_backend.middleware import CompressionMiddleware, brotli
+from artwala_backend.parsers import ORJSONParser
+from artwala_backend.renderers import ORJSONRenderer
+
+from artists.models import ArtistProfile
+from .models import Category, Order, OrderItem, Product, ProductImage
+
+User = get_user_model()
+
+
+class ProductFixtureMixin:
+    def setUp(self):
+        self.artist_user = User.objects.create_user(email='artist@example.com', username='artist', password='pw12345678')
+        self.artist = ArtistProfile.objects.create(user=self.artist_user, display_name='Artist')
+        self.category = Category.objects.create(name='Paintings', slug='paintings')
+        self.product = Product.objects.create(
+            artist=self.artist, category=self.category, title='Dusk', slug='dusk',
+            description='Oil on canvas', price=Decimal('40.00'), status='active',
+        )
+        self.image = ProductImage.objects.create(product=self.product, image='product_images/dusk.jpg', alt_text='Dusk')
+        self.api = APIClient()
+
+
+class ConditionalGetTests(ProductFixtureMixin, TestCase):
+    detail_url = '/api/products/products/dusk/'
+    list_url = '/api/products/products/'
+    
+    def revalidate(self, url, response):
+        return self.api.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code
+    
+    def assert_invalidated_by(self, change):
+        """
+        Both the detail and the list ETags change when `change` edits a related row
+        """
+        cached = {url: self.api.get(url) for url in (self.detail_url, self.list_url)}
+        for url, response in cached.items():
+            self.assertEqual(self.revalidate(url, response), 304)
+        change()
+        for url, response in cached.items():
+            self.assertEqual(self.revalidate(url, response), 200, url)
+    
+    def test_unchanged_product_is_not_modified(self):
+        response = self.api.get(self.detail_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.revalidate(self.detail_url, response), 304)
+    
+    def test_image_edit_invalidates(self):
+        def change():
+            self.image.alt_text = 'Dusk over the river'
+            self.image.save()
+        self.assert_invalidated_by(change)
+    
+    def test_image_removal_invalidates(self):
+        self.assert_invalidated_by(self.image.delete)
+    
+    def test_artist_and_category_renames_invalidate(self):
+        def rename_artist():
+            self.artist.display_name = 'Renamed'
+            self.artist.save()
+        def rename_category():
+            self.category.name = 'Oils'
+            self.category.save()
+        self.assert_invalidated_by(rename_artist)
+        self.assert_invalidated_by(rename_category)
+    
+    def test_sparse_fieldsets_get_their_own_etag(self):
+        full = self.api.get(self.detail_url)
+        sparse = self.api.get(self.detail_url, {'fields': 'title'})
+        self.assertNotEqual(full['ETag'], sparse['ETag'])
+    
+    def test_order_item_changes_invalidate_the_order(self):
+        customer = User.objects.create_user(email='customer@example.com', username='customer', password='pw12345678')
+        order = Order.objects.create(
+            user=customer, order_number='A-1', total_amount=Decimal('40.00'),
+            shipping_address={'city': 'Pune'}, payment_method='upi',
+        )
+        item = OrderItem.objects.create(order=order, product=self.product, price=Decimal('40.00'))
+        self.api.force_authenticate(customer)
+        url = f'/api/products/orders/{order.pk}/'
+        response = self.api.get(url)
+        self.assertEqual(self.revalidate(url, response), 304)
+        item.quantity = 2
+        item.save()
+        self.assertEqual(self.revalidate(url, response), 200)
+        # The item renders the full product, images included
+        response = self.api.get(url)
+        self.image.delete()
+        self.assertEqual(self.revalidate(url, response), 200)
+    
+    def test_list_validators_cover_only_the_page(self):
+        customer = User.objects.create_user(email='customer@example.com', username='customer', password='pw12345678')
+        orders = []
+        for number in range(21):
+            order = Order.objects.create(
+                user=customer, order_number=f'A-{number}', total_amount=Decimal('40.00'),
+                shipping_address={'city': 'Pune'}, payment_method='upi',
+            )
+            orders.append((order, OrderItem.objects.create(order=order, product=self.product, price=Decimal('40.00'))))
+        self.api.force_authenticate(customer)
+        url = '/api/products/orders/'
+        first, second = self.api.get(url), self.api.get(url, {'page': 2})
+        self.assertEqual([row['id'] for row in second.json()['results']], [orders[0][0].pk])
+    
+        # Each many-valued path is aggregated on its own, over the page's rows only
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.revalidate(url, first), 304)
+        aggregates = [query['sql'] for query in queries if 'COUNT(DISTINCT' in query['sql']]
+        self.assertEqual(len(aggregates), 5)
+        for sql in aggregates:
+            self.assertEqual(sql.count('COUNT(DISTINCT'), 1)
+            self.assertIn('"orders"."id" IN (', sql)
+    
+        item = orders[0][1]
+        item.quantity = 2
+        item.save()
+        self.assertEqual(self.revalidate(url, first), 304)
+        self.assertEqual(self.api.get(url, {'page': 2}, HTTP_IF_NONE_MATCH=second['ETag']).status_code, 200)
+        orders[1][0].delete()
+        self.assertEqual(self.revalidate(url, first), 200)
+
+
+class SparseFieldsetTests(ProductFixtureMixin, TestCase):
+    list_url = '/api/products/products/'
+    
+    def page_query(self, params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.api.get(self.list_url, params)
+        self.assertEqual(response.status_code, 200)
+        sql = next(query['sql'] for query in queries if query['sql'].startswith('SELECT "products"."id"'))
+        return response.json()['results'], sql
+    
+    def test_lists_use_the_compact_serializer(self):
+        row, = self.api.get(self.list_url).json()['results']
+        self.assertNotIn('description', row)
+        self.assertEqual(row['artist_name'], 'Artist')
+        self.assertEqual(self.api.get(f'/api/products/products/{self.product.slug}/').json()['description'], 'Oil on canvas')
+    
+    def test_fields_and_omit(self):
+        row, = self.api.get(self.list_url, {'fields': 'title,price'}).json()['results']
+        self.assertEqual(row, {'title': 'Dusk', 'price': '40.00'})
+        row, = self.api.get(self.list_url, {'omit': 'images,tags'}).json()['results']
+        self.assertFalse({'images', 'tags'} & row.keys())
+        detail = self.api.get(f'/api/products/products/{self.product.slug}/', {'fields': 'title,description'}).json()
+        self.assertEqual(detail, {'title': 'Dusk', 'description': 'Oil on canvas'})
+    
+    def test_lists_only_read_the_columns_they_render(self):
+        rows, sql = self.page_query({'fields': 'title,artist_name'})
+        self.assertEqual(rows, [{'title': 'Dusk', 'artist_name': 'Artist'}])
+        self.assertIn('"artist_profiles"."display_name"', sql)
+        self.assertNotIn('"products"."description"', sql)
+        self.assertNotIn('"products"."price"', sql)
+        _, sql = self.page_query({})
+        self.assertNotIn('"products"."description"', sql)
+
+
+class CompressionTests(SimpleTestCase):
+    body = b'{"title": "Dusk", "description": "Oil on canvas"}' * 100
+    
+    def respond(self, response, accept='br, gzip', request=None):
+        request = request or RequestFactory().get('/api/products/products/', HTTP_ACCEPT_ENCODING=accept)
+        return CompressionMiddleware(lambda request: response)(request)
+    
+    @skipIf(brotli is None, 'brotli is not installed')
+    def test_preferred_coding_is_used(self):
+        response = HttpResponse(self.body, content_type='application/json', headers={'ETag': '"v1"'})
+        response = self.respond(response)
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.content), self.body)
+        self.assertEqual(response['Content-Length'], str(len(response.content)))
+        self.assertEqual((response['ETag'], response['Vary']), ('W/"v1"', 'Accept-Encoding'))
+    
+    def test_gzip_is_padded_with_a_random_file_name(self):
+        lengths = set()
+        for _ in range(20):
+            response = self.respond(HttpResponse(self.body, content_type='application/json'), accept='gzip')
+            self.assertEqual(gzip.decompress(response.content), self.body)
+            lengths.add(len(response.content))
+        self.assertGreater(len(lengths), 1)
+    
+    def test_responses_setting_cookies_only_get_padded_gzip(self):
+        def with_cookie():
+            response = HttpResponse(self.body, content_type='text/html')
+            response.set_cookie('sessionid', 'secret')
+            return response
+        self.assertEqual(self.respond(with_cookie())['Content-Encoding'], 'gzip')
+        self.assertNotIn('Content-Encoding', self.respond(with_cookie(), accept='br'))
+    
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='br, gzip')
+        request.META['CSRF_COOKIE_NEEDS_UPDATE'] = True
+        response = self.respond(HttpResponse(self.body, content_type='text/html'), request=request)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+    
+    def test_streams_are_compressed_chunk_by_chunk(self):
+        response = StreamingHttpResponse(iter([self.body, self.body]), content_type='application/x-ndjson')
+        response = self.respond(response, accept='gzip')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), self.body * 2)
+        self.assertNotIn('Content-Length', response)
+    
+    def test_skipped_responses(self):
+        small = HttpResponse(b'{}', content_type='application/json')
+        image = HttpResponse(self.body, content_type='image/png')
+        partial = HttpResponse(self.body, content_type='application/json', status=206)
+        for response in (small, image, partial):
+            self.assertNotIn('Content-Encoding', self.respond(response))
+        refused = self.respond(HttpResponse(self.body, content_type='application/json'), accept='gzip;q=0, identity')
+        self.assertNotIn('Content-Encoding', refused)
+
+
+class JSONRendererTests(SimpleTestCase):
+    data = {
+        'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        'price': Decimal('40.10'),
+        'created_at': datetime.datetime(2026, 4, 1, 9, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+        'day': datetime.date(2026, 4, 1),
+        'label': gettext_lazy('Paintings'),
+        'title': 'Dusk \u2028 over the Mula–Mutha',
+        'sizes': {1: 'small', 2: 'large'},
+        'tags': ['oil', None, True, 1.5],
+    }
+    
+    def test_output_matches_drf(self):
+        self.assertEqual(ORJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+    
+    def test_cases_left_to_the_stdlib_still_match(self):
+        wide = {'count': 2 ** 70}
+        self.assertEqual(ORJSONRenderer().render(wide), JSONRenderer().render(wide))
+        indented = 'application/json; indent=4'
+        self.assertEqual(
+            ORJSONRenderer().render(self.data, indented, {}), JSONRenderer().render(self.data, indented, {}),
+        )
+    
+    def test_non_finite_floats_are_refused(self):
+        for value in (float('nan'), float('inf'), -float('inf')):
+            data = {'title': 'Dusk', 'ratings': [4.5, {'mean': value}], 'note': None}
+            with self.assertRaises(ValueError):
+                JSONRenderer().render(data)
+            with self.assertRaises(ValueError):
+                ORJSONRenderer().render(data)
+        self.assertEqual(ORJSONRenderer().render({'mean': None}), b'{"mean":null}')
+    
+    def test_parser_matches_drf(self):
+        body = '{"title": "Mula–Mutha", "price": 40.5, "tags": [1, null]}'.encode()
+        parse = lambda parser, encoding='utf-8': parser.parse(io.BytesIO(body), parser_context={'encoding': encoding})
+        self.assertEqual(parse(ORJSONParser()), parse(JSONParser()))
+        self.assertEqual(parse(ORJSONParser(), 'utf_8'), parse(JSONParser()))
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"price": NaN}'), parser_context={})
+    
+    def test_api_refuses_malformed_json(self):
+        response = APIClient().post('/api/auth/login/', b'{"email": ', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('JSON parse error', response.json()['detail'])
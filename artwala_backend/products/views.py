@@ -1,7 +1,13 @@
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
-from .models import Category, Product, Cart, Order
-from .serializers import CategorySerializer, ProductSerializer, CartSerializer, OrderSerializer
+from artwala_backend.conditional import ConditionalGetMixin
+from artwala_backend.fieldsets import SparseFieldsetMixin
+from artwala_backend.includes import IncludeMixin
+from artists.models import ArtistProfile
+from artists.serializers import ArtistProfileListSerializer
+from analytics.pageviews import record_product_view
+from .models import Category, Product, ProductImage, Cart, Order
+from .serializers import CategorySerializer, ProductSerializer, ProductListSerializer, ProductImageSerializer, CartSerializer, OrderSerializer
 
 class CategoryViewSet(viewsets.ModelViewSet):
     queryset = Category.objects.all()
@@ -9,11 +15,25 @@ class CategoryViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticatedOrReadOnly]
     lookup_field = 'slug'
 
-class ProductViewSet(viewsets.ModelViewSet):
-    queryset = Product.objects.all()
+class ProductViewSet(ConditionalGetMixin, SparseFieldsetMixin, IncludeMixin, viewsets.ModelViewSet):
+    queryset = Product.objects.prefetch_related('images')
     serializer_class = ProductSerializer
+    list_serializer_class = ProductListSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     lookup_field = 'slug'
+    etag_dependencies = ('artist', 'category', 'images')
+    includes = {
+        'artist': ('artist', ArtistProfile.objects.all(), ArtistProfileListSerializer),
+        'category': ('category', Category.objects.all(), CategorySerializer),
+        'images': ('images', ProductImage.objects.all(), ProductImageSerializer),
+    }
+    
+    def get_object(self):
+        product = super().get_object()
+        if self.action == 'retrieve':
+            # Counted even when the client's copy is still fresh (304): it is still a page view
+            record_product_view(product)
+        return product
 
 class CartViewSet(viewsets.ModelViewSet):
     queryset = Cart.objects.all()
@@ -23,10 +43,16 @@ class CartViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         return Cart.objects.filter(user=self.request.user)
 
-class OrderViewSet(viewsets.ModelViewSet):
+class OrderViewSet(ConditionalGetMixin, IncludeMixin, viewsets.ModelViewSet):
     queryset = Order.objects.all()
     serializer_class = OrderSerializer
     permission_classes = [IsAuthenticated]
+    # Each item renders its full product
+    etag_dependencies = ('items', 'items__product', 'items__product__artist', 'items__product__category', 'items__product__images')
+    includes = {
+        'products': ('items__product', Product.objects.select_related('artist', 'category').prefetch_related('images'), ProductListSerializer),
+        'artists': ('items__product__artist', ArtistProfile.objects.all(), ArtistProfileListSerializer),
+    }
     
     def get_queryset(self):
         return Order.objects.filter(user=self.request.user)
@@ -0,0 +1,18 @@
+from django.contrib import admin
+from django.utils import timezone
+from .models import Task
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('name', 'queue', 'status', 'attempts', 'max_attempts', 'run_at', 'locked_by', 'finished_at')
+    list_filter = ('status', 'queue')
+    search_fields = ('name',)
+    readonly_fields = ('attempts', 'last_error', 'locked_by', 'locked_at', 'created_at', 'finished_at')
+    actions = ['retry']
+    
+    @admin.action(description='Retry selected failed tasks now')
+    def retry(self, request, queryset):
+        retried = queryset.filter(status='failed').update(
+            status='queued', attempts=0, run_at=timezone.now(), finished_at=None,
+        )
+        self.message_user(request, f'{retried} tasks queued again.')
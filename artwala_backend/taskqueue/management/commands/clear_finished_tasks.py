@@ -0,0 +1,31 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from taskqueue.models import Task
+
+
+class Command(BaseCommand):
+    help = 'Delete finished and failed tasks older than TASK_KEEP_FINISHED_DAYS in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Tasks deleted per batch')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - datetime.timedelta(days=settings.TASK_KEEP_FINISHED_DAYS)
+        deleted = 0
+        for status in ('done', 'failed'):
+            while True:
+                # Oldest first (read off task_finished_idx), so an interrupted run has cleared the oldest tasks
+                batch = list(
+                    Task.objects.filter(status=status, finished_at__lt=cutoff)
+                    .order_by('finished_at', 'pk')
+                    .values_list('pk', flat=True)[:options['batch_size']]
+                )
+                if not batch:
+                    break
+                deleted += Task.objects.filter(pk__in=batch).delete()[0]
+
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} finished tasks'))
@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from taskqueue.worker import run_workers
+
+
+class Command(BaseCommand):
+    help = 'Run background task workers against the database-backed queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency', type=int, default=settings.TASK_WORKER_CONCURRENCY,
+            help='Worker processes, each running one task at a time',
+        )
+        parser.add_argument(
+            '--queue', action='append', dest='queues',
+            help='Only run tasks from this queue (repeat for several; default: all queues)',
+        )
+        parser.add_argument('--burst', action='store_true', help='Exit once no tasks are due (single process)')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Starting {options['concurrency']} task worker(s)")
+        run_workers(max(options['concurrency'], 1), options['queues'], burst=options['burst'])
+        self.stdout.write(self.style.SUCCESS('Task workers stopped'))
@@ -0,0 +1,136 @@
+# Generated by Django 5.2.4 on 2026-10-19 12:33
+
+import django.core.serializers.json
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="Task",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(
+                        help_text="Dotted path of the @task function", max_length=200
+                    ),
+                ),
+                (
+                    "queue",
+                    models.CharField(
+                        default="default",
+                        help_text="Queue name; workers can be limited to some queues",
+                        max_length=50,
+                    ),
+                ),
+                (
+                    "args",
+                    models.JSONField(
+                        default=list,
+                        encoder=django.core.serializers.json.DjangoJSONEncoder,
+                        help_text="Positional arguments",
+                    ),
+                ),
+                (
+                    "kwargs",
+                    models.JSONField(
+                        default=dict,
+                        encoder=django.core.serializers.json.DjangoJSONEncoder,
+                        help_text="Keyword arguments",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("queued", "Queued"),
+                            ("running", "Running"),
+                            ("done", "Done"),
+                            ("failed", "Failed"),
+                        ],
+                        default="queued",
+                        help_text="Where the task is in its lifecycle",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "run_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now,
+                        help_text="Earliest time the task may run (pushed back after each failed attempt)",
+                    ),
+                ),
+                (
+                    "attempts",
+                    models.PositiveSmallIntegerField(
+                        default=0, help_text="Times a worker has started this task"
+                    ),
+                ),
+                (
+                    "max_attempts",
+                    models.PositiveSmallIntegerField(
+                        default=5, help_text="Attempts before the task is marked failed"
+                    ),
+                ),
+                (
+                    "last_error",
+                    models.TextField(
+                        blank=True,
+                        help_text="Traceback of the most recent failed attempt",
+                    ),
+                ),
+                (
+                    "locked_by",
+                    models.CharField(
+                        blank=True,
+                        help_text="Worker currently running the task",
+                        max_length=100,
+                    ),
+                ),
+                (
+                    "locked_at",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="When the current attempt started; stale locks are released after TASK_LOCK_TIMEOUT",
+                        null=True,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "finished_at",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="When the task finished or was given up on",
+                        null=True,
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "task_queue",
+                "indexes": [
+                    models.Index(
+                        fields=["status", "queue", "run_at"], name="task_claim_idx"
+                    ),
+                    models.Index(fields=["status", "locked_at"], name="task_lock_idx"),
+                    models.Index(
+                        fields=["status", "finished_at"], name="task_finished_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
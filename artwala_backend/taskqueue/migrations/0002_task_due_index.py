@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-19 13:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("taskqueue", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(fields=["status", "run_at"], name="task_due_idx"),
+        ),
+    ]
@@ -0,0 +1,94 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+
+
+class Task(models.Model):
+    """
+    A deferred function call waiting for, running on, or finished by a task worker
+    The table is the broker: workers claim rows with conditional UPDATEs, so no external service is needed
+    """
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),       # Waiting for run_at and a free worker
+        ('running', 'Running'),     # Claimed by the worker in locked_by
+        ('done', 'Done'),           # Returned without raising
+        ('failed', 'Failed'),       # Raised on every one of max_attempts tries
+    ]
+
+    # What to run
+    name = models.CharField(
+        max_length=200,
+        help_text="Dotted path of the @task function"
+    )
+    queue = models.CharField(
+        max_length=50,
+        default='default',
+        help_text="Queue name; workers can be limited to some queues"
+    )
+    args = models.JSONField(
+        default=list,
+        encoder=DjangoJSONEncoder,
+        help_text="Positional arguments"
+    )
+    kwargs = models.JSONField(
+        default=dict,
+        encoder=DjangoJSONEncoder,
+        help_text="Keyword arguments"
+    )
+
+    # Scheduling and retries
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='queued',
+        help_text="Where the task is in its lifecycle"
+    )
+    run_at = models.DateTimeField(
+        default=timezone.now,
+        help_text="Earliest time the task may run (pushed back after each failed attempt)"
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        help_text="Times a worker has started this task"
+    )
+    max_attempts = models.PositiveSmallIntegerField(
+        default=5,
+        help_text="Attempts before the task is marked failed"
+    )
+    last_error = models.TextField(
+        blank=True,
+        help_text="Traceback of the most recent failed attempt"
+    )
+
+    # Worker bookkeeping
+    locked_by = models.CharField(
+        max_length=100,
+        blank=True,
+        help_text="Worker currently running the task"
+    )
+    locked_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        help_text="When the current attempt started; stale locks are released after TASK_LOCK_TIMEOUT"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        help_text="When the task finished or was given up on"
+    )
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+    class Meta:
+        db_table = 'task_queue'
+        indexes = [
+            # Workers polling for due tasks
+            models.Index(fields=['status', 'queue', 'run_at'], name='task_claim_idx'),
+            # Workers taking every queue, already in claim order
+            models.Index(fields=['status', 'run_at'], name='task_due_idx'),
+            # Releasing stale locks and clearing out finished tasks
+            models.Index(fields=['status', 'locked_at'], name='task_lock_idx'),
+            models.Index(fields=['status', 'finished_at'], name='task_finished_idx'),
+        ]
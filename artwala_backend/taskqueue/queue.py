@@ -0,0 +1,71 @@
+import datetime
+import functools
+import json
+import random
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Task
+
+
+class TaskFunction:
+    """
+    A function that can run now (call it) or on a task worker (`.enqueue()` / `.enqueue_in()`)
+    """
+    def __init__(self, func, queue, max_attempts):
+        functools.update_wrapper(self, func)
+        self.func = func
+        self.name = f'{func.__module__}.{func.__qualname__}'
+        self.queue = queue
+        self.max_attempts = max_attempts
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def enqueue(self, *args, **kwargs):
+        return enqueue(self, args, kwargs)
+
+    def enqueue_in(self, delay, *args, **kwargs):
+        return enqueue(self, args, kwargs, run_at=timezone.now() + datetime.timedelta(seconds=delay))
+
+
+def task(func=None, *, queue='default', max_attempts=None):
+    """
+    Marks a module-level function as a task; arguments must be JSON-serializable (pass ids, not instances)
+    """
+    def decorate(func):
+        return TaskFunction(func, queue, max_attempts or settings.TASK_MAX_ATTEMPTS)
+    return decorate(func) if func is not None else decorate
+
+
+def enqueue(task_function, args, kwargs, run_at=None):
+    """
+    Queues a task to run once the current transaction commits
+    The row is written inside the caller's transaction, so workers only see it after commit and a
+    rollback discards it along with the data it was about
+    """
+    # Round-trip now so unserializable arguments fail in the caller, not on the worker
+    args, kwargs = json.loads(json.dumps([list(args), kwargs], cls=DjangoJSONEncoder))
+    if settings.TASKS_EAGER:
+        transaction.on_commit(lambda: task_function(*args, **kwargs))
+        return None
+    return Task.objects.create(
+        name=task_function.name,
+        queue=task_function.queue,
+        args=args,
+        kwargs=kwargs,
+        max_attempts=task_function.max_attempts,
+        run_at=run_at or timezone.now(),
+    )
+
+
+def retry_delay(attempts):
+    """
+    Exponential backoff with jitter: about TASK_RETRY_BACKOFF seconds after the first failure, doubling after each
+    """
+    delay = min(settings.TASK_RETRY_BACKOFF * 2 ** (attempts - 1), settings.TASK_RETRY_BACKOFF_MAX)
+    # Jitter keeps tasks that failed together (e.g. during an outage) from retrying together
+    return datetime.timedelta(seconds=delay * random.uniform(0.5, 1.0))
@@ -0,0 +1,119 @@
+import datetime
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db.models import QuerySet
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .models import Task
+from .queue import task
+from .worker import Worker, release_stale_locks
+
+calls = []
+
+
+@task
+def record(value):
+    calls.append(value)
+
+
+@task(queue='flaky', max_attempts=2)
+def explode():
+    raise RuntimeError('boom')
+
+
+# Workers drop connections between tasks, which would close the test case's transaction
+@mock.patch('taskqueue.worker.close_old_connections', lambda: None)
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+    
+    def test_enqueued_task_runs_on_a_worker(self):
+        queued = record.enqueue({'id': 7})
+        self.assertEqual((queued.name, queued.queue, queued.status), ('taskqueue.tests.record', 'default', 'queued'))
+        Worker(burst=True).run()
+        queued.refresh_from_db()
+        self.assertEqual(calls, [{'id': 7}])
+        self.assertEqual((queued.status, queued.attempts), ('done', 1))
+    
+    def test_failures_back_off_then_give_up(self):
+        queued = explode.enqueue()
+        with self.assertLogs('taskqueue.worker', 'ERROR'):
+            Worker(burst=True).run()
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts), ('queued', 1))
+        self.assertIn('RuntimeError: boom', queued.last_error)
+        self.assertGreater(queued.run_at, timezone.now())
+        
+        Task.objects.filter(pk=queued.pk).update(run_at=timezone.now())
+        with self.assertLogs('taskqueue.worker', 'ERROR'):
+            Worker(burst=True).run()
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts), ('failed', 2))
+    
+    def test_workers_only_take_their_queues(self):
+        explode.enqueue()
+        Worker(queues=['default'], burst=True).run()
+        self.assertEqual(Task.objects.get().status, 'queued')
+    
+    def test_claims_read_due_tasks_in_index_order(self):
+        for queues, index in ((None, 'task_due_idx'), (['images'], 'task_claim_idx')):
+            plan = Worker(queues=queues).due_tasks(timezone.now()).values_list('pk', flat=True)[:10].explain()
+            self.assertIn(f'INDEX {index} ', plan)
+            self.assertNotIn('TEMP B-TREE', plan)
+    
+    def test_tasks_of_dead_workers_are_released(self):
+        queued = record.enqueue(1)
+        Task.objects.filter(pk=queued.pk).update(
+            status='running', attempts=1, locked_by='gone:1', locked_at=timezone.now() - datetime.timedelta(days=1),
+        )
+        self.assertEqual(release_stale_locks(), 1)
+        Worker(burst=True).run()
+        self.assertEqual(calls, [1])
+    
+    @override_settings(TASKS_EAGER=True)
+    def test_eager_tasks_run_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertIsNone(record.enqueue(datetime.date(2026, 1, 2)))
+            self.assertEqual(calls, [])
+        self.assertEqual(calls, ['2026-01-02'])
+        self.assertFalse(Task.objects.exists())
+
+
+class ClearFinishedTasksTests(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        self.tasks = {}
+        for name, status, age in (
+            ('old-done', 'done', 30), ('older-done', 'done', 40), ('old-failed', 'failed', 20),
+            ('recent-done', 'done', 1), ('queued', 'queued', None),
+        ):
+            self.tasks[name] = Task.objects.create(
+                name=name, status=status, finished_at=age and now - datetime.timedelta(days=age),
+            )
+    
+    def remaining(self):
+        return set(Task.objects.values_list('name', flat=True))
+    
+    def test_deletes_only_expired_finished_tasks(self):
+        out = StringIO()
+        call_command('clear_finished_tasks', batch_size=1, stdout=out)
+        self.assertEqual(self.remaining(), {'recent-done', 'queued'})
+        self.assertIn('Deleted 3 finished tasks', out.getvalue())
+    
+    def test_oldest_tasks_go_first(self):
+        delete = QuerySet.delete
+        
+        def delete_one_batch(queryset):
+            if delete_one_batch.done:
+                raise KeyboardInterrupt
+            delete_one_batch.done = True
+            return delete(queryset)
+        delete_one_batch.done = False
+        
+        with mock.patch.object(QuerySet, 'delete', delete_one_batch), self.assertRaises(KeyboardInterrupt):
+            call_command('clear_finished_tasks', batch_size=1, stdout=StringIO())
+        self.assertNotIn('older-done', self.remaining())
+        self.assertIn('old-done', self.remaining())
@@ -0,0 +1,151 @@
+import datetime
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import time
+import traceback
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Task
+from .queue import TaskFunction, retry_delay
+
+logger = logging.getLogger(__name__)
+
+# Due tasks looked at per claim; a worker that loses the race for one tries the next
+CLAIM_CANDIDATES = 10
+# Seconds between an idle worker's sweeps for tasks left running by dead workers
+RELEASE_INTERVAL = 60
+
+
+class Worker:
+    """
+    Runs queued tasks one at a time until stopped (or, with burst=True, until none are due)
+    """
+    def __init__(self, queues=None, burst=False):
+        self.queues = queues
+        self.burst = burst
+        self.name = f'{socket.gethostname()}:{os.getpid()}'
+        self.stopping = False
+
+    def stop(self, *args):
+        # Finish the task in hand, then exit
+        self.stopping = True
+
+    def due_tasks(self, now):
+        tasks = Task.objects.filter(status='queued', run_at__lte=now)
+        if self.queues:
+            tasks = tasks.filter(queue__in=self.queues)
+        return tasks.order_by('run_at', 'pk')
+
+    def claim(self):
+        now = timezone.now()
+        for pk in self.due_tasks(now).values_list('pk', flat=True)[:CLAIM_CANDIDATES]:
+            # Only one worker's UPDATE can see the row still queued
+            claimed = Task.objects.filter(pk=pk, status='queued').update(
+                status='running', locked_by=self.name, locked_at=now, attempts=F('attempts') + 1,
+            )
+            if claimed:
+                return Task.objects.get(pk=pk)
+        return None
+
+    def execute(self, task):
+        try:
+            function = import_string(task.name)
+            if not isinstance(function, TaskFunction):
+                raise TypeError(f'{task.name} is not a @task function')
+            function.func(*task.args, **task.kwargs)
+        except Exception:
+            logger.exception('Task %s failed (attempt %s of %s)', task, task.attempts, task.max_attempts)
+            self.fail(task, traceback.format_exc())
+        else:
+            Task.objects.filter(pk=task.pk, locked_by=self.name).update(
+                status='done', finished_at=timezone.now(), locked_by='', locked_at=None,
+            )
+
+    def fail(self, task, error):
+        now = timezone.now()
+        if task.attempts < task.max_attempts:
+            updates = {'status': 'queued', 'run_at': now + retry_delay(task.attempts)}
+        else:
+            updates = {'status': 'failed', 'finished_at': now}
+        # Filtered on the lock, in case the task was released as stale and claimed elsewhere meanwhile
+        Task.objects.filter(pk=task.pk, locked_by=self.name).update(
+            last_error=error, locked_by='', locked_at=None, **updates,
+        )
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        released = 0
+        while not self.stopping:
+            close_old_connections()
+            if time.monotonic() - released >= RELEASE_INTERVAL:
+                release_stale_locks()
+                released = time.monotonic()
+            task = self.claim()
+            if task is not None:
+                self.execute(task)
+            elif self.burst:
+                break
+            else:
+                time.sleep(settings.TASK_POLL_INTERVAL)
+        close_old_connections()
+
+
+def release_stale_locks():
+    """
+    Requeues tasks whose worker died mid-run (or gives up on them if they are out of attempts)
+    """
+    cutoff = timezone.now() - datetime.timedelta(seconds=settings.TASK_LOCK_TIMEOUT)
+    stale = Task.objects.filter(status='running', locked_at__lt=cutoff)
+    stale.filter(attempts__gte=F('max_attempts')).update(
+        status='failed', finished_at=timezone.now(), locked_by='', locked_at=None,
+        last_error='Worker stopped responding during the final attempt',
+    )
+    return stale.update(status='queued', locked_by='', locked_at=None)
+
+
+def _run_child(queues):
+    Worker(queues).run()
+
+
+def run_workers(concurrency, queues=None, burst=False):
+    """
+    Runs `concurrency` worker processes, restarting any that die, until SIGTERM/SIGINT
+    """
+    if concurrency == 1 or burst:
+        Worker(queues, burst=burst).run()
+        return
+
+    # Children must not share the parent's database connections
+    connections.close_all()
+    context = multiprocessing.get_context('fork')
+    children = {}
+    stopping = False
+
+    def stop(*args):
+        nonlocal stopping
+        stopping = True
+        for child in children.values():
+            child.terminate()  # SIGTERM: the child finishes its current task first
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    while not stopping:
+        for slot in range(concurrency):
+            child = children.get(slot)
+            if child is None or not child.is_alive():
+                if child is not None:
+                    logger.warning('Task worker %s exited with %s, restarting', child.pid, child.exitcode)
+                children[slot] = child = context.Process(target=_run_child, args=(queues,), daemon=False)
+                child.start()
+        time.sleep(1)
+    for child in children.values():
+        child.join()
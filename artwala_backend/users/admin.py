@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import User
+from .models import AuthToken, User
 
 @admin.register(User)
 class CustomUserAdmin(UserAdmin):
@@ -20,3 +20,10 @@ class CustomUserAdmin(UserAdmin):
             'fields': ('user_type', 'email', 'phone')
         }),
     )
+
+@admin.register(AuthToken)
+class AuthTokenAdmin(admin.ModelAdmin):
+    list_display = ('key_prefix', 'user', 'device', 'created_at', 'expires_at')
+    list_select_related = ('user',)
+    search_fields = ('key_prefix', 'user__email', 'device')
+    readonly_fields = ('digest', 'key_prefix', 'user', 'device', 'created_at')
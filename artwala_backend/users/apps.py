@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "users"
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+
+        from artwala_backend.authentication import token_deleted, user_saved
+
+        # Keep CachedTokenAuthentication from serving revoked tokens or stale users
+        post_delete.connect(token_deleted, sender=self.get_model("AuthToken"), dispatch_uid="token-cache-token-deleted")
+        post_save.connect(user_saved, sender=self.get_model("User"), dispatch_uid="token-cache-user-saved")
@@ -0,0 +1,198 @@
+import codecs
+import csv
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils.text import slugify
+
+from artists.models import ArtistProfile
+from artwala_backend.geo import geocode_text
+from .models import User
+from .serializers import UserImportSerializer
+
+USER_FIELDS = ['email', 'username', 'first_name', 'last_name', 'user_type', 'phone', 'location', 'bio', 'website']
+ARTIST_FIELDS = ['display_name', 'tagline', 'specializations', 'experience_years', 'artist_statement',
+                 'commission_available']
+
+
+def read_rows(stream, fmt):
+    """
+    Yields (line number, row dict) from a text stream of CSV or NDJSON without loading it whole
+    Unparseable NDJSON lines come back as the exception instead of a dict
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as error:
+            yield line_number, error
+            continue
+        yield line_number, row if isinstance(row, dict) else ValueError('Each line must be a JSON object.')
+
+
+def open_text(file, encoding='utf-8-sig'):
+    """
+    Decodes a binary file, upload or request stream line by line for read_rows()
+    """
+    return codecs.iterdecode(file, encoding)
+
+
+def _init_worker():
+    # Spawned (non-forked) workers start without Django configured
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'artwala_backend.settings')
+    django.setup()
+
+
+class UserImporter:
+    """
+    Validates, hashes and inserts users (and artist profiles) batch by batch
+    A bad row is reported with its line number and skipped; the rest of the file still imports
+    """
+
+    def __init__(self, batch_size=500, dry_run=False, max_errors=None, processes=True):
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.max_errors = max_errors
+        # Without processes passwords are hashed in this process (web requests shouldn't fork workers)
+        self.processes = processes
+        self.executor = None
+        self.created = 0
+        self.error_count = 0
+        self.errors = []
+        self.seen = set()
+
+    def run(self, rows):
+        if self.processes:
+            workers = settings.BULK_IMPORT_HASH_WORKERS
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as self.executor:
+                self.import_rows(rows)
+            self.executor = None
+        else:
+            self.import_rows(rows)
+        self.errors.sort(key=lambda error: error['line'])
+        return self
+
+    def import_rows(self, rows):
+        rows = iter(rows)
+        while batch := list(itertools.islice(rows, self.batch_size)):
+            self.import_batch(batch)
+
+    def hash_passwords(self, passwords):
+        if self.executor is None:
+            return map(make_password, passwords)
+        # PBKDF2 for a few hundred rows is the slow part, so it runs across processes
+        return self.executor.map(make_password, passwords, chunksize=max(1, len(passwords) // 32))
+
+    def add_error(self, line, errors):
+        self.error_count += 1
+        if self.max_errors is None or len(self.errors) < self.max_errors:
+            self.errors.append({'line': line, 'errors': errors})
+
+    def validate_batch(self, batch):
+        valid = []
+        for line, row in batch:
+            if isinstance(row, Exception):
+                self.add_error(line, {'non_field_errors': [str(row)]})
+                continue
+            serializer = UserImportSerializer(data=row)
+            if serializer.is_valid():
+                valid.append((line, serializer.validated_data))
+            else:
+                self.add_error(line, serializer.errors)
+
+        # One query per batch for emails and usernames that are already taken
+        emails = {data['email'] for _, data in valid}
+        usernames = {data['username'] for _, data in valid}
+        taken_emails = set(User.objects.filter(email__in=emails).values_list('email', flat=True))
+        taken_usernames = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+
+        unique = []
+        for line, data in valid:
+            errors = {}
+            if data['email'] in taken_emails or ('email', data['email']) in self.seen:
+                errors['email'] = ['A user with this email already exists.']
+            if data['username'] in taken_usernames or ('username', data['username']) in self.seen:
+                errors['username'] = ['A user with this username already exists.']
+            if errors:
+                self.add_error(line, errors)
+                continue
+            self.seen.update((('email', data['email']), ('username', data['username'])))
+            unique.append((line, data))
+        return unique
+
+    def assign_slugs(self, artists):
+        """
+        Gives each new artist profile a unique slug, checking existing slugs with one query per batch
+        """
+        bases = {slugify(artist.display_name)[:90] or 'artist' for artist in artists}
+        if not bases:
+            return
+        prefixes = Q()
+        for base in bases:
+            prefixes |= Q(slug__startswith=base)
+        taken = set(ArtistProfile.objects.filter(prefixes).values_list('slug', flat=True))
+        for artist in artists:
+            base = slugify(artist.display_name)[:90] or 'artist'
+            slug, suffix = base, 2
+            while slug in taken:
+                slug, suffix = f'{base}-{suffix}', suffix + 1
+            taken.add(slug)
+            artist.slug = slug
+
+    def import_batch(self, batch):
+        rows = self.validate_batch(batch)
+        if self.dry_run:
+            self.created += len(rows)
+            return
+        if not rows:
+            return
+
+        hashes = self.hash_passwords([data.get('password') or None for _, data in rows])
+
+        users, artists = [], []
+        for (line, data), password in zip(rows, hashes):
+            user = User(password=password, **{field: data[field] for field in USER_FIELDS if field in data})
+            # bulk_create skips User.save(), which normally geocodes the location
+            user.latitude, user.longitude = geocode_text(user.location) or (None, None)
+            users.append((line, user))
+            if data['user_type'] == 'artist':
+                artists.append((line, ArtistProfile(
+                    user=user, **{field: data[field] for field in ARTIST_FIELDS if field in data}
+                )))
+        self.assign_slugs([artist for _, artist in artists])
+
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create([user for _, user in users])
+                ArtistProfile.objects.bulk_create([artist for _, artist in artists])
+            self.created += len(users)
+        except IntegrityError:
+            # Someone else took an email, username or slug since validation: find the rows one by one
+            self.insert_one_by_one(users, dict(artists))
+
+    def insert_one_by_one(self, users, artists):
+        for line, user in users:
+            try:
+                with transaction.atomic():
+                    user.pk = None
+                    user.save()
+                    if line in artists:
+                        artist = artists[line]
+                        artist.user = user
+                        artist.save()
+                self.created += 1
+            except IntegrityError as error:
+                self.add_error(line, {'non_field_errors': [str(error)]})
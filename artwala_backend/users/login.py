@@ -0,0 +1,84 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import user_login_failed
+from django.contrib.auth.hashers import check_password, get_hasher, identify_hasher
+from rest_framework.exceptions import APIException
+
+from .models import User
+
+_workers = settings.LOGIN_HASH_WORKERS
+_executor = ThreadPoolExecutor(max_workers=_workers, thread_name_prefix='login-hash')
+# Verifications running or waiting; anything beyond this is shed instead of queued
+_slots = threading.BoundedSemaphore(_workers + settings.LOGIN_HASH_QUEUE_SIZE)
+
+# Moving average of a password check, used to pad rejections of unknown emails
+_average_duration = None
+
+
+class LoginUnavailable(APIException):
+    status_code = 503
+    default_detail = 'Too many sign-ins in progress, please try again shortly.'
+    default_code = 'login_unavailable'
+    wait = 1
+
+
+def _record(duration):
+    global _average_duration
+    _average_duration = duration if _average_duration is None else 0.8 * _average_duration + 0.2 * duration
+
+
+def _check(password, encoded):
+    start = time.perf_counter()
+    valid = check_password(password, encoded)
+    _record(time.perf_counter() - start)
+    return valid
+
+
+def _calibrate():
+    # One throwaway hash per process so the first unknown email is padded correctly too
+    hasher = get_hasher()
+    start = time.perf_counter()
+    hasher.encode('', hasher.salt())
+    _record(time.perf_counter() - start)
+
+
+def verify_credentials(request, email, password):
+    """
+    Checks an email/password pair on the bounded hashing pool, returning the user or None
+    PBKDF2 releases the GIL, so at most LOGIN_HASH_WORKERS cores ever go to password hashing
+    """
+    try:
+        user = User._default_manager.get_by_natural_key(email)
+    except User.DoesNotExist:
+        user = None
+
+    # Unknown emails take a slot too, so shedding under load doesn't reveal which emails exist
+    if not _slots.acquire(blocking=False):
+        raise LoginUnavailable()
+    try:
+        if user is None:
+            # No hashing for unknown emails, but the answer comes no faster than a real check
+            if _average_duration is None:
+                _executor.submit(_calibrate).result()
+            else:
+                time.sleep(_average_duration)
+            valid = False
+        else:
+            valid = _executor.submit(_check, password, user.password).result()
+    finally:
+        _slots.release()
+
+    if not valid or not user.is_active:
+        user_login_failed.send(sender=__name__, credentials={'username': email}, request=request)
+        return None
+
+    # Re-hash with the current hasher settings, as authenticate() would (rare; once after an upgrade)
+    hasher = get_hasher()
+    if hasher.algorithm != identify_hasher(user.password).algorithm or hasher.must_update(user.password):
+        user.set_password(password)
+        user.save(update_fields=['password'])
+    user.backend = settings.AUTHENTICATION_BACKENDS[0]
+    return user
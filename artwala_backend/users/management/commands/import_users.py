@@ -0,0 +1,37 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from users.bulk_import import UserImporter, open_text, read_rows
+
+
+class Command(BaseCommand):
+    help = 'Bulk import users and artist profiles from a CSV or NDJSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or NDJSON file to import')
+        parser.add_argument('--format', choices=['csv', 'ndjson'], help='Defaults to the file extension')
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows validated and inserted per batch')
+        parser.add_argument('--errors', help='Write per-row errors to this NDJSON file instead of the console')
+        parser.add_argument('--dry-run', action='store_true', help='Validate every row without inserting')
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or ('csv' if options['path'].lower().endswith('.csv') else 'ndjson')
+        if not os.path.exists(options['path']):
+            raise CommandError(f"File not found: {options['path']}")
+
+        with open(options['path'], 'rb') as file:
+            importer = UserImporter(batch_size=options['batch_size'], dry_run=options['dry_run'])
+            importer.run(read_rows(open_text(file), fmt))
+
+        if options['errors']:
+            with open(options['errors'], 'w') as errors_file:
+                for error in importer.errors:
+                    errors_file.write(json.dumps(error) + '\n')
+        else:
+            for error in importer.errors:
+                self.stderr.write(f"Line {error['line']}: {json.dumps(error['errors'])}")
+
+        verb = 'Would create' if options['dry_run'] else 'Created'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {importer.created} users, {importer.error_count} rows rejected'))
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-19 12:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="profile_image_derivatives",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                editable=False,
+                help_text="Resized WebP/AVIF copies of the profile picture keyed by size and format (generated in the background)",
+            ),
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.2.4 on 2026-10-19 12:13
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0002_image_derivatives"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AuthToken",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "digest",
+                    models.CharField(
+                        help_text="Hex SHA-256 of the token key (the key itself is never stored)",
+                        max_length=64,
+                        unique=True,
+                    ),
+                ),
+                (
+                    "key_prefix",
+                    models.CharField(
+                        help_text="First characters of the key so users can tell their tokens apart",
+                        max_length=8,
+                    ),
+                ),
+                (
+                    "device",
+                    models.CharField(
+                        blank=True,
+                        help_text="Device or client the token was issued to",
+                        max_length=100,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "expires_at",
+                    models.DateTimeField(
+                        db_index=True,
+                        help_text="Token stops working after this time and is removed by clear_expired_tokens",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        help_text="User this token authenticates as",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="auth_tokens",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "auth_tokens",
+                "indexes": [
+                    models.Index(
+                        fields=["user", "expires_at"], name="auth_token_user_idx"
+                    )
+                ],
+            },
+        ),
+    ]
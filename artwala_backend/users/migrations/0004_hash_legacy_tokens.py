@@ -0,0 +1,43 @@
+import datetime
+import hashlib
+
+from django.conf import settings
+from django.db import migrations
+from django.utils import timezone
+
+
+def hash_legacy_tokens(apps, schema_editor):
+    """
+    Moves plaintext rest_framework tokens into AuthToken so existing clients stay signed in until expiry
+    """
+    Token = apps.get_model("authtoken", "Token")
+    AuthToken = apps.get_model("users", "AuthToken")
+    expires_at = timezone.now() + datetime.timedelta(days=settings.AUTH_TOKEN_TTL_DAYS)
+    batch = []
+    for key, user_id in Token.objects.values_list("key", "user_id").iterator(chunk_size=1000):
+        batch.append(
+            AuthToken(
+                user_id=user_id,
+                digest=hashlib.sha256(key.encode()).hexdigest(),
+                key_prefix=key[:8],
+                device="legacy token",
+                expires_at=expires_at,
+            )
+        )
+        if len(batch) == 1000:
+            AuthToken.objects.bulk_create(batch)
+            batch = []
+    AuthToken.objects.bulk_create(batch)
+    Token.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authtoken", "0004_alter_tokenproxy_options"),
+        ("users", "0003_auth_tokens"),
+    ]
+
+    operations = [
+        migrations.RunPython(hash_legacy_tokens, migrations.RunPython.noop),
+    ]
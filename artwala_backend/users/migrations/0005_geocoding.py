@@ -0,0 +1,31 @@
+# Generated by Django 5.2.4 on 2026-10-19 12:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0004_hash_legacy_tokens"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="latitude",
+            field=models.FloatField(
+                blank=True,
+                help_text="Latitude geocoded from location using the offline gazetteer",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="longitude",
+            field=models.FloatField(
+                blank=True,
+                help_text="Longitude geocoded from location using the offline gazetteer",
+                null=True,
+            ),
+        ),
+    ]
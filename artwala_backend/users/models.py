@@ -1,5 +1,39 @@
-from django.contrib.auth.models import AbstractUser
-from django.db import models
+import datetime
+import hashlib
+import secrets
+
+from django.conf import settings
+from django.contrib.auth.models import AbstractUser, UserManager as BaseUserManager
+from django.db import models, transaction
+from django.utils import timezone
+
+from artwala_backend.geo import geocode_text
+
+# User fields cached alongside a token; token authentication and permission checks read them
+TOKEN_CACHED_USER_FIELDS = ('is_active', 'is_staff', 'is_superuser')
+# Changing any of these evicts the user's cached tokens
+TOKEN_EVICTING_USER_FIELDS = (*TOKEN_CACHED_USER_FIELDS, 'password')
+
+
+class UserQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        """
+        Bulk updates skip post_save, so the affected users' cached tokens are evicted here
+        Otherwise a deactivation through update() would keep authenticating from the token cache
+        """
+        from artwala_backend.authentication import invalidate_tokens
+
+        if not set(TOKEN_EVICTING_USER_FIELDS) & kwargs.keys():
+            return super().update(**kwargs)
+        digests = list(AuthToken.objects.filter(user__in=self.values('pk')).values_list('digest', flat=True))
+        rows = super().update(**kwargs)
+        invalidate_tokens(digests)
+        return rows
+
+
+class UserManager(BaseUserManager.from_queryset(UserQuerySet)):
+    pass
+
 
 class User(AbstractUser):
     """
@@ -37,6 +71,12 @@ class User(AbstractUser):
         null=True,
         help_text="User's profile picture displayed throughout the platform"
     )
+    profile_image_derivatives = models.JSONField(
+        default=dict, 
+        blank=True,
+        editable=False,
+        help_text="Resized WebP/AVIF copies of the profile picture keyed by size and format (generated in the background)"
+    )
     bio = models.TextField(
         blank=True,
         help_text="Personal description or artist statement for public profile"
@@ -46,6 +86,16 @@ class User(AbstractUser):
         blank=True,
         help_text="User's city/location for local chapter assignment and shipping"
     )
+    latitude = models.FloatField(
+        blank=True,
+        null=True,
+        help_text="Latitude geocoded from location using the offline gazetteer"
+    )
+    longitude = models.FloatField(
+        blank=True,
+        null=True,
+        help_text="Longitude geocoded from location using the offline gazetteer"
+    )
     
     # External links and social presence
     website = models.URLField(
@@ -74,9 +124,30 @@ class User(AbstractUser):
         help_text="Last profile update timestamp"
     )
     
+    objects = UserManager()
+    
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username', 'first_name', 'last_name']
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if set(TOKEN_EVICTING_USER_FIELDS) <= set(field_names):
+            instance._saved_token_state = instance.get_token_state()
+        return instance
+    
+    def get_token_state(self):
+        return tuple(getattr(self, field) for field in TOKEN_EVICTING_USER_FIELDS)
+    
+    def save(self, *args, **kwargs):
+        # Keep coordinates in step with the free-text location (a dict lookup, no network)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'location' in update_fields:
+            self.latitude, self.longitude = geocode_text(self.location) or (None, None)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'latitude', 'longitude'}
+        super().save(*args, **kwargs)
+    
     def __str__(self):
         return f"{self.email} ({self.user_type})"
     
@@ -84,3 +155,79 @@ class User(AbstractUser):
         db_table = 'users'
         verbose_name = 'User'
         verbose_name_plural = 'Users'
+
+
+class AuthTokenManager(models.Manager):
+    def create_token(self, user, device=''):
+        """
+        Issues a new token for one device and returns (token, key)
+        Signing in again on a named device replaces its previous token; tokens without a device name
+        are never replaced, since unrelated clients would share it
+        Only the hash is stored, so the key must be handed to the client now or never
+        """
+        key = secrets.token_hex(20)
+        device = device[:100]
+        with transaction.atomic():
+            if device:
+                # post_delete still fires per token (a receiver is connected), evicting it from the auth cache
+                self.filter(user=user, device=device).delete()
+            token = self.create(
+                user=user,
+                digest=AuthToken.hash_key(key),
+                key_prefix=key[:8],
+                device=device,
+                expires_at=timezone.now() + datetime.timedelta(days=settings.AUTH_TOKEN_TTL_DAYS),
+            )
+        return token, key
+
+
+class AuthToken(models.Model):
+    """
+    Expiring API token, one per signed-in device
+    Stored as a SHA-256 hash so a leaked table doesn't leak working credentials
+    """
+    # Identity
+    digest = models.CharField(
+        max_length=64,
+        unique=True,
+        help_text="Hex SHA-256 of the token key (the key itself is never stored)"
+    )
+    key_prefix = models.CharField(
+        max_length=8,
+        help_text="First characters of the key so users can tell their tokens apart"
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='auth_tokens',
+        help_text="User this token authenticates as"
+    )
+    device = models.CharField(
+        max_length=100,
+        blank=True,
+        help_text="Device or client the token was issued to"
+    )
+
+    # Lifetime
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(
+        db_index=True,
+        help_text="Token stops working after this time and is removed by clear_expired_tokens"
+    )
+
+    objects = AuthTokenManager()
+
+    @staticmethod
+    def hash_key(key):
+        # Keys are 160 random bits, so a plain hash is enough (no salt or stretching)
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def __str__(self):
+        return f"{self.key_prefix}… ({self.user.email}, {self.device or 'unknown device'})"
+
+    class Meta:
+        db_table = 'auth_tokens'
+        indexes = [
+            # Listing and revoking one user's tokens
+            models.Index(fields=['user', 'expires_at'], name='auth_token_user_idx'),
+        ]
@@ -1,15 +1,41 @@
 from rest_framework import serializers
-from django.contrib.auth import authenticate
-from .models import User
+from assets.serializers import ImageDerivativesField
+from .login import verify_credentials
+from .models import AuthToken, User
 
 class UserSerializer(serializers.ModelSerializer):
+    profile_image_derivatives = ImageDerivativesField()
+    
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'first_name', 'last_name', 'user_type', 
-                 'phone', 'profile_image', 'bio', 'location', 'website', 'social_links', 
-                 'is_verified', 'date_joined']
+                 'phone', 'profile_image', 'profile_image_derivatives', 'bio', 'location', 'website', 
+                 'social_links', 'is_verified', 'date_joined']
         read_only_fields = ['id', 'date_joined', 'is_verified']
 
+class PublicUserSerializer(serializers.ModelSerializer):
+    """
+    What anyone may see of another user: no email, phone or location
+    """
+    profile_image_derivatives = ImageDerivativesField()
+    
+    class Meta:
+        model = User
+        fields = ['id', 'username', 'first_name', 'last_name', 'user_type', 'profile_image',
+                 'profile_image_derivatives', 'bio', 'website', 'social_links', 'is_verified']
+        read_only_fields = fields
+
+class AuthTokenSerializer(serializers.ModelSerializer):
+    is_current = serializers.SerializerMethodField()
+
+    class Meta:
+        model = AuthToken
+        fields = ['id', 'key_prefix', 'device', 'created_at', 'expires_at', 'is_current']
+
+    def get_is_current(self, obj):
+        request = self.context.get('request')
+        return getattr(request and request.auth, 'pk', None) == obj.pk
+
 class UserRegistrationSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, min_length=8)
     password_confirm = serializers.CharField(write_only=True)
@@ -38,7 +64,7 @@ class UserLoginSerializer(serializers.Serializer):
         password = attrs.get('password')
         
         if email and password:
-            user = authenticate(username=email, password=password)
+            user = verify_credentials(self.context.get('request'), email, password)
             if user:
                 if user.is_active:
                     attrs['user'] = user
@@ -50,3 +76,41 @@ class UserLoginSerializer(serializers.Serializer):
             raise serializers.ValidationError('Must include email and password.')
         
         return attrs
+
+class UserImportSerializer(serializers.Serializer):
+    """
+    One row of a bulk user/artist import
+    Uniqueness is checked per batch by users.bulk_import, not per row here
+    """
+    email = serializers.EmailField(max_length=254)
+    username = serializers.CharField(max_length=150, required=False, allow_blank=True)
+    first_name = serializers.CharField(max_length=150)
+    last_name = serializers.CharField(max_length=150)
+    password = serializers.CharField(min_length=8, required=False, allow_blank=True)
+    user_type = serializers.ChoiceField(choices=['artist', 'buyer'], default='artist')
+    phone = serializers.CharField(max_length=15, required=False, allow_blank=True)
+    location = serializers.CharField(max_length=100, required=False, allow_blank=True)
+    bio = serializers.CharField(required=False, allow_blank=True)
+    website = serializers.URLField(required=False, allow_blank=True)
+
+    # Artist profile, used when user_type is artist
+    display_name = serializers.CharField(max_length=100, required=False, allow_blank=True)
+    tagline = serializers.CharField(max_length=200, required=False, allow_blank=True)
+    specializations = serializers.ListField(child=serializers.CharField(max_length=100), required=False)
+    experience_years = serializers.IntegerField(min_value=0, required=False)
+    artist_statement = serializers.CharField(required=False, allow_blank=True)
+    commission_available = serializers.BooleanField(required=False)
+
+    def to_internal_value(self, data):
+        # CSV cells are strings: blank means "not given" and lists are separated by semicolons
+        data = {key: value for key, value in data.items() if value not in ('', None)}
+        if isinstance(data.get('specializations'), str):
+            data['specializations'] = [item.strip() for item in data['specializations'].split(';') if item.strip()]
+        return super().to_internal_value(data)
+
+    def validate(self, attrs):
+        attrs['email'] = User.objects.normalize_email(attrs['email'])
+        attrs['username'] = attrs.get('username') or attrs['email']
+        if attrs['user_type'] == 'artist' and not attrs.get('display_name'):
+            attrs['display_name'] = f"{attrs['first_name']} {attrs['last_name']}"
+        return attrs
@@ -1,3 +1,297 @@
-from django.test import TestCase
+import datetime
+import json
+import os
+import tempfile
+import threading
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import user_login_failed
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, get_hasher
+from django.core.cache import cache
+from django.db.models.signals import post_delete
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from artists.models import ArtistProfile
+from artwala_backend.authentication import CachedTokenAuthentication, get_token_cache_key, local_tokens
+from . import login
+from .bulk_import import UserImporter
+from .models import AuthToken, User
+
+
+class TokenFixtureMixin:
+    def setUp(self):
+        cache.clear()
+        local_tokens.clear()
+        self.user = User.objects.create_user(email='ana@example.com', username='ana', password='pw12345678')
+    
+    def login(self, device='phone'):
+        response = APIClient().post('/api/auth/login/', {'email': 'ana@example.com', 'password': 'pw12345678', 'device': device})
+        self.assertEqual(response.status_code, 200)
+        return response.json()['token']
+    
+    def client_for(self, key):
+        api = APIClient()
+        api.credentials(HTTP_AUTHORIZATION=f'Token {key}')
+        return api
+    
+    def profile_status(self, key):
+        return self.client_for(key).get('/api/auth/profile/').status_code
+
+
+class AuthTokenTests(TokenFixtureMixin, TestCase):
+    def test_tokens_are_stored_hashed(self):
+        key = self.login()
+        token = AuthToken.objects.get()
+        self.assertEqual((token.digest, token.key_prefix, token.device), (AuthToken.hash_key(key), key[:8], 'phone'))
+        self.assertEqual(self.profile_status(key), 200)
+        self.assertEqual(self.profile_status('0' * 40), 403)
+    
+    def test_signing_in_again_replaces_the_device_token(self):
+        first = self.login('phone')
+        self.assertEqual(self.profile_status(first), 200)
+        second = self.login('phone')
+        laptop = self.login('laptop')
+        self.assertEqual(sorted(AuthToken.objects.values_list('device', flat=True)), ['laptop', 'phone'])
+        # The replaced token was cached by the request above and must stop working at once
+        self.assertEqual(self.profile_status(first), 403)
+        self.assertEqual((self.profile_status(second), self.profile_status(laptop)), (200, 200))
+    
+    def test_unnamed_devices_keep_their_own_tokens(self):
+        first, second = self.login(''), self.login('')
+        self.assertEqual(AuthToken.objects.count(), 2)
+        self.assertEqual((self.profile_status(first), self.profile_status(second)), (200, 200))
+    
+    def test_expired_tokens_are_refused_and_cleared(self):
+        key = self.login()
+        self.assertEqual(self.profile_status(key), 200)
+        later = timezone.now() + datetime.timedelta(days=31)
+        # Still cached, but past its expiry
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            self.assertEqual(self.profile_status(key), 403)
+            call_command('clear_expired_tokens', stdout=StringIO())
+        self.assertFalse(AuthToken.objects.exists())
+    
+    def test_expired_tokens_are_cleared_in_bulk(self):
+        keys = [self.login(device) for device in ('phone', 'laptop', 'tablet')]
+        for key in keys:
+            self.assertEqual(self.profile_status(key), 200)
+        AuthToken.objects.filter(device='tablet').update(expires_at=timezone.now() + datetime.timedelta(days=60))
+        deleted = []
+        receiver = lambda instance, **kwargs: deleted.append(instance)
+        post_delete.connect(receiver, sender=AuthToken)
+        self.addCleanup(post_delete.disconnect, receiver, sender=AuthToken)
+        later = timezone.now() + datetime.timedelta(days=31)
+        with mock.patch('django.utils.timezone.now', return_value=later), self.assertNumQueries(3):
+            call_command('clear_expired_tokens', batch_size=2, stdout=StringIO())
+        self.assertEqual(deleted, [])
+        self.assertEqual(list(AuthToken.objects.values_list('device', flat=True)), ['tablet'])
+        for key in keys[:2]:
+            cache_key = get_token_cache_key(AuthToken.hash_key(key))
+            self.assertIsNone(cache.get(cache_key))
+            self.assertIsNone(local_tokens.get(cache_key))
+    
+    def test_logout_revokes_only_this_device(self):
+        phone, laptop = self.login('phone'), self.login('laptop')
+        self.assertEqual(self.profile_status(phone), 200)
+        self.assertEqual(self.client_for(phone).post('/api/auth/logout/').status_code, 200)
+        self.assertEqual((self.profile_status(phone), self.profile_status(laptop)), (403, 200))
+    
+    def test_logout_all_revokes_every_device(self):
+        phone, laptop = self.login('phone'), self.login('laptop')
+        self.assertEqual((self.profile_status(phone), self.profile_status(laptop)), (200, 200))
+        self.assertEqual(self.client_for(phone).post('/api/auth/logout/', {'all': True}).status_code, 200)
+        self.assertEqual((self.profile_status(phone), self.profile_status(laptop)), (403, 403))
+        self.assertFalse(AuthToken.objects.exists())
+    
+    def test_devices_are_listed_and_revoked(self):
+        phone, laptop = self.login('phone'), self.login('laptop')
+        api = self.client_for(phone)
+        devices = api.get('/api/auth/tokens/').json()['results']
+        self.assertEqual({(device['device'], device['is_current']) for device in devices}, {('phone', True), ('laptop', False)})
+        self.assertEqual(self.profile_status(laptop), 200)
+        laptop_id = next(device['id'] for device in devices if device['device'] == 'laptop')
+        self.assertEqual(api.delete(f'/api/auth/tokens/{laptop_id}/').status_code, 204)
+        self.assertEqual(self.profile_status(laptop), 403)
+
+
+class CachedTokenAuthenticationTests(TokenFixtureMixin, TestCase):
+    def test_cached_tokens_skip_the_database(self):
+        key = self.login()
+        api = self.client_for(key)
+        self.assertEqual(api.get('/api/auth/profile/').status_code, 200)
+        with self.assertNumQueries(0):
+            user, token = CachedTokenAuthentication().authenticate_credentials(key)
+            self.assertTrue(user and user.is_authenticated)
+            self.assertEqual((user.pk, user.id, user.is_active, user.is_staff), (self.user.pk, self.user.pk, True, False))
+        # The rest of the user is read when the view needs it
+        with self.assertNumQueries(1):
+            self.assertEqual(user.email, 'ana@example.com')
+        # Later requests in this process are served by the local LRU alone
+        cache.clear()
+        with self.assertNumQueries(1):
+            self.assertEqual(api.get('/api/auth/profile/').status_code, 200)
+    
+    def test_cache_holds_no_password_hash(self):
+        key = self.login()
+        self.assertEqual(self.profile_status(key), 200)
+        fields, token = cache.get(get_token_cache_key(AuthToken.hash_key(key)))
+        self.assertEqual(fields, {'pk': self.user.pk, 'is_active': True, 'is_staff': False, 'is_superuser': False})
+        self.assertNotIn('user', token._state.fields_cache)
+    
+    def test_routine_saves_keep_the_cache(self):
+        key = self.login()
+        cache_key = get_token_cache_key(AuthToken.hash_key(key))
+        self.assertEqual(self.profile_status(key), 200)
+        user = User.objects.get(pk=self.user.pk)
+        user.first_name = 'Ana'
+        user.save()
+        User.objects.filter(pk=user.pk).update(last_login=timezone.now())
+        self.assertIsNotNone(cache.get(cache_key))
+        self.assertIsNotNone(local_tokens.get(cache_key))
+        # The next sign-in's last_login update doesn't flush the other devices' tokens either
+        self.login('laptop')
+        self.assertIsNotNone(cache.get(cache_key))
+        user.is_staff = True
+        user.save()
+        self.assertIsNone(cache.get(cache_key))
+    
+    def test_deactivation_through_save_is_seen_at_once(self):
+        key = self.login()
+        self.assertEqual(self.profile_status(key), 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.profile_status(key), 403)
+    
+    def test_deactivation_through_a_bulk_update_is_seen_at_once(self):
+        key = self.login()
+        self.assertEqual(self.profile_status(key), 200)
+        User.objects.filter(email='ana@example.com').update(is_active=False)
+        self.assertEqual(self.profile_status(key), 403)
+    
+    def test_profile_changes_are_not_served_stale(self):
+        key = self.login()
+        api = self.client_for(key)
+        self.assertEqual(api.get('/api/auth/profile/').json()['first_name'], '')
+        User.objects.filter(pk=self.user.pk).update(first_name='Ana')
+        self.assertEqual(api.get('/api/auth/profile/').json()['first_name'], 'Ana')
+
+
+class LoginThroughputTests(TokenFixtureMixin, TestCase):
+    def attempt(self, email='ana@example.com', password='pw12345678', ip='10.0.0.1'):
+        return APIClient().post('/api/auth/login/', {'email': email, 'password': password}, REMOTE_ADDR=ip)
+    
+    @override_settings(THROTTLE_BUCKETS={'login_ip': (20, 10), 'login_account': (2, 2)})
+    def test_guessing_one_account_is_throttled_from_any_address(self):
+        self.assertEqual(self.attempt(password='wrong', ip='10.0.0.1').status_code, 400)
+        self.assertEqual(self.attempt(password='wrong', ip='10.0.0.2').status_code, 400)
+        response = self.attempt(email=' ANA@example.com', ip='10.0.0.3')
+        self.assertEqual(response.status_code, 429)
+        # Refilled at two a minute
+        self.assertIn(int(response['Retry-After']), range(25, 31))
+        self.assertEqual(self.attempt(email='ben@example.com').status_code, 400)
+    
+    @override_settings(THROTTLE_BUCKETS={'login_ip': (2, 10), 'login_account': (5, 2)})
+    def test_one_address_is_throttled_across_accounts(self):
+        for email in ('ben@example.com', 'cy@example.com'):
+            self.assertEqual(self.attempt(email=email).status_code, 400)
+        self.assertEqual(self.attempt(email='dee@example.com').status_code, 429)
+        self.assertEqual(self.attempt(ip='10.0.0.2').status_code, 200)
+    
+    def test_unknown_emails_are_rejected_without_hashing(self):
+        failures = []
+        receiver = lambda credentials, **kwargs: failures.append(credentials['username'])
+        user_login_failed.connect(receiver)
+        self.addCleanup(user_login_failed.disconnect, receiver)
+        with mock.patch('users.login.check_password') as check:
+            self.assertEqual(self.attempt(email='nobody@example.com').status_code, 400)
+        check.assert_not_called()
+        self.assertEqual(self.attempt(password='wrong').status_code, 400)
+        self.assertEqual(failures, ['nobody@example.com', 'ana@example.com'])
+    
+    def test_logins_beyond_the_queue_are_shed(self):
+        with mock.patch.object(login, '_slots', threading.BoundedSemaphore(1)) as slots:
+            slots.acquire()
+            response = self.attempt()
+            self.assertEqual((response.status_code, response['Retry-After']), (503, '1'))
+            # Unknown emails are shed alike, so a 503 says nothing about which accounts exist
+            self.assertEqual(self.attempt(email='nobody@example.com').status_code, 503)
+            slots.release()
+            self.assertEqual(self.attempt().status_code, 200)
+    
+    def test_disabled_accounts_are_refused(self):
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self.attempt().status_code, 400)
+    
+    def test_outdated_hashes_are_upgraded(self):
+        self.user.password = PBKDF2PasswordHasher().encode('pw12345678', 'seasalt', iterations=1000)
+        self.user.save(update_fields=['password'])
+        self.assertEqual(self.attempt().status_code, 200)
+        self.user.refresh_from_db()
+        self.assertFalse(get_hasher().must_update(self.user.password))
+        self.assertTrue(self.user.check_password('pw12345678'))
+
+
+class BulkImportTests(TestCase):
+    rows = [
+        {'email': 'ana@example.com', 'first_name': 'Ana', 'last_name': 'Rao', 'password': 'pw12345678', 'location': 'Pune'},
+        {'email': 'ben@example.com', 'first_name': 'Ben', 'last_name': 'Das', 'user_type': 'buyer'},
+        {'email': 'ana@example.com', 'first_name': 'Ana', 'last_name': 'Again'},
+        {'email': 'not-an-email', 'first_name': 'Cy', 'last_name': 'Roy'},
+    ]
+    
+    def ndjson(self):
+        return ''.join(json.dumps(row) + '\n' for row in self.rows) + '{broken\n'
+    
+    def assert_imported(self):
+        self.assertEqual(set(User.objects.values_list('email', flat=True)), {'ana@example.com', 'ben@example.com'})
+        ana = User.objects.get(email='ana@example.com')
+        self.assertTrue(ana.check_password('pw12345678'))
+        self.assertIsNotNone(ana.latitude)
+        self.assertFalse(User.objects.get(email='ben@example.com').has_usable_password())
+        self.assertEqual(list(ArtistProfile.objects.values_list('display_name', 'slug')), [('Ana Rao', 'ana-rao')])
+    
+    @override_settings(BULK_IMPORT_HASH_WORKERS=2)
+    def test_command_imports_and_reports_bad_lines(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'users.ndjson')
+            with open(path, 'w') as file:
+                file.write(self.ndjson())
+            stderr = StringIO()
+            call_command('import_users', path, stdout=StringIO(), stderr=stderr)
+        self.assert_imported()
+        self.assertEqual([line.split(':')[0] for line in stderr.getvalue().splitlines()], ['Line 3', 'Line 4', 'Line 5'])
+    
+    def test_http_import_hashes_in_process(self):
+        api = APIClient()
+        api.force_authenticate(User.objects.create_superuser(email='staff@example.com', username='staff', password='pw12345678'))
+        with mock.patch('users.bulk_import.ProcessPoolExecutor', side_effect=AssertionError('no process pool per request')):
+            response = api.post('/api/auth/import/?dry_run=1', self.ndjson(), content_type='application/x-ndjson')
+            self.assertEqual((response.status_code, response.json()['created']), (200, 2))
+            response = api.post('/api/auth/import/', self.ndjson(), content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.json()['created'], response.json()['rejected']), (2, 3))
+        self.assertEqual([error['line'] for error in response.json()['errors']], [3, 4, 5])
+        self.assertEqual(response.json()['errors'][0]['errors']['email'], ['A user with this email already exists.'])
+        User.objects.filter(email='staff@example.com').delete()
+        self.assert_imported()
+    
+    @override_settings(BULK_IMPORT_MAX_REQUEST_ROWS=4)
+    def test_http_import_refuses_large_files(self):
+        api = APIClient()
+        api.force_authenticate(User.objects.create_superuser(email='staff@example.com', username='staff', password='pw12345678'))
+        response = api.post('/api/auth/import/', self.ndjson(), content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 413)
+        self.assertIn('import_users', response.json()['detail'])
+        self.assertEqual(User.objects.count(), 1)
+    
+    def test_slugs_are_checked_with_one_query_per_batch(self):
+        user = User.objects.create_user(email='x@example.com', username='x', password='pw12345678')
+        ArtistProfile.objects.create(user=user, display_name='Ana Rao', slug='ana-rao')
+        artists = [ArtistProfile(display_name=name) for name in ('Ana Rao', 'Ana Rao', 'Ben Das', '')]
+        with self.assertNumQueries(1):
+            UserImporter().assign_slugs(artists)
+        self.assertEqual([artist.slug for artist in artists], ['ana-rao-2', 'ana-rao-3', 'ben-das', 'artist'])
@@ -4,6 +4,7 @@ from . import views
 
 router = DefaultRouter()
 router.register(r'users', views.UserViewSet)
+router.register(r'tokens', views.AuthTokenViewSet, basename='auth-token')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -11,4 +12,5 @@ urlpatterns = [
     path('login/', views.UserLoginView.as_view(), name='user-login'),
     path('logout/', views.UserLogoutView.as_view(), name='user-logout'),
     path('profile/', views.UserProfileView.as_view(), name='user-profile'),
+    path('import/', views.UserImportView.as_view(), name='user-import'),
 ]
@@ -1,14 +1,24 @@
-from rest_framework import viewsets, status
+import itertools
+
+from rest_framework import mixins, viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework.permissions import IsAuthenticated, AllowAny
-from rest_framework.authtoken.models import Token
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAdminUser, IsAuthenticated, AllowAny
+from artwala_backend.conditional import ConditionalGetMixin
+from artwala_backend.throttling import LoginAccountThrottle, LoginIPThrottle
+from django.conf import settings
 from django.contrib.auth import login, logout
-from .models import User
-from .serializers import UserSerializer, UserRegistrationSerializer, UserLoginSerializer
+from django.utils import timezone
+from .bulk_import import UserImporter, open_text, read_rows
+from .models import AuthToken, User
+from .serializers import AuthTokenSerializer, UserSerializer, UserRegistrationSerializer, UserLoginSerializer
+
+def get_device(request):
+    return request.data.get('device') or request.headers.get('User-Agent', '')
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
@@ -27,25 +37,28 @@ class UserRegistrationView(APIView):
         serializer = UserRegistrationSerializer(data=request.data)
         if serializer.is_valid():
             user = serializer.save()
-            token, created = Token.objects.get_or_create(user=user)
+            token, key = AuthToken.objects.create_token(user, get_device(request))
             return Response({
                 'user': UserSerializer(user).data,
-                'token': token.key
+                'token': key,
+                'expires_at': token.expires_at,
             }, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 class UserLoginView(APIView):
     permission_classes = [AllowAny]
+    throttle_classes = [LoginIPThrottle, LoginAccountThrottle]
     
     def post(self, request):
-        serializer = UserLoginSerializer(data=request.data)
+        serializer = UserLoginSerializer(data=request.data, context={'request': request})
         if serializer.is_valid():
             user = serializer.validated_data['user']
             login(request, user)
-            token, created = Token.objects.get_or_create(user=user)
+            token, key = AuthToken.objects.create_token(user, get_device(request))
             return Response({
                 'user': UserSerializer(user).data,
-                'token': token.key
+                'token': key,
+                'expires_at': token.expires_at,
             })
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -53,10 +66,13 @@ class UserLogoutView(APIView):
     permission_classes = [IsAuthenticated]
     
     def post(self, request):
-        try:
-            request.user.auth_token.delete()
-        except:
-            pass
+        # Signs out this device only, or every device with {"all": true}. A queryset delete still sends
+        # post_delete per token because a receiver is connected; it evicts the token from the shared cache
+        # and this process's LRU, while other processes drop their copy within TOKEN_CACHE_LOCAL_TIMEOUT
+        tokens = AuthToken.objects.filter(user=request.user)
+        if not request.data.get('all'):
+            tokens = tokens.filter(pk=getattr(request.auth, 'pk', None))
+        tokens.delete()
         logout(request)
         return Response({'message': 'Logged out successfully'})
 
@@ -73,3 +89,54 @@ class UserProfileView(APIView):
             serializer.save()
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+class AuthTokenViewSet(mixins.ListModelMixin, mixins.DestroyModelMixin, viewsets.GenericViewSet):
+    """
+    Lists the signed-in devices of the current user and revokes them one at a time
+    """
+    serializer_class = AuthTokenSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return AuthToken.objects.filter(user=self.request.user, expires_at__gt=timezone.now()).order_by('-created_at')
+
+class UserImportView(APIView):
+    """
+    Staff-only bulk import of users and artist profiles
+    Accepts a multipart `file` or a raw text/csv or application/x-ndjson body, read as a stream
+    """
+    permission_classes = [IsAdminUser]
+    parser_classes = [MultiPartParser]
+    
+    def post(self, request):
+        if request.content_type.startswith('multipart/'):
+            upload = request.FILES.get('file')
+            if upload is None:
+                return Response({'file': ['No file was submitted.']}, status=status.HTTP_400_BAD_REQUEST)
+            stream, is_csv = upload, upload.name.lower().endswith('.csv')
+        else:
+            # A raw body is read straight from the request stream, never buffered whole
+            stream, is_csv = request.stream, 'csv' in request.content_type
+        if stream is None:
+            return Response({'detail': 'Empty request body.'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Hashed in this process: a request must not start a process pool per call, so only small
+        # files are taken here and the rest belong in `manage.py import_users`
+        limit = settings.BULK_IMPORT_MAX_REQUEST_ROWS
+        rows = list(itertools.islice(read_rows(open_text(stream), 'csv' if is_csv else 'ndjson'), limit + 1))
+        if len(rows) > limit:
+            return Response(
+                {'detail': f'Files over {limit} rows must be imported with `manage.py import_users`.'},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+        importer = UserImporter(
+            dry_run=request.query_params.get('dry_run') in ('1', 'true'),
+            max_errors=1000,
+            processes=False,
+        )
+        importer.run(rows)
+        return Response({
+            'created': importer.created,
+            'rejected': importer.error_count,
+            'errors': importer.errors,
+        }, status=status.HTTP_200_OK if importer.dry_run else status.HTTP_201_CREATED)